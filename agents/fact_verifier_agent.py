@@ -1,14 +1,8 @@
-from crewai import Agent, LLM
-import os
-from dotenv import load_dotenv
+from crewai import Agent
+from utils.llm_cache import create_llm
 
-# Load environment variables
-load_dotenv()
-
-llm = LLM(
-    model=os.getenv("OPENAI_MODEL_NAME"),
-    temperature=0
-)
+# Repeated prompts are answered from the LLM response cache
+llm = create_llm("fact_verifier", temperature=0)
 
 verifier_agent = Agent(
     role='Fact Verification Expert',
@@ -1,4 +1,5 @@
 from crewai import Agent
+from utils.llm_cache import create_llm
 
 # Create input analyzer agent
 input_analyzer_agent = Agent(
@@ -12,5 +13,6 @@ input_analyzer_agent = Agent(
     the language of any input text and processing it accordingly. You alsways provide your answer in JSON format, using the required models.""",
     verbose=True,
     allow_delegation=False,
+    llm=create_llm("input_analyzer"),
     tools=[],  # The agent will use its own intelligence for analysis
 )
\ No newline at end of file
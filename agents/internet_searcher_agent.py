@@ -1,4 +1,5 @@
 from crewai import Agent
+from utils.llm_cache import create_llm
 
 
 # Create searcher agent
@@ -8,5 +9,6 @@ internet_searcher = Agent(
     backstory="""You are an expert at searching through verified or highly reliable sources in internet and effectively scrape the sources find relevant information.""",
     verbose=True,
     allow_delegation=False,
+    llm=create_llm("internet_searcher"),
     
 )
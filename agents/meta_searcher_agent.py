@@ -1,4 +1,5 @@
 from crewai import Agent
+from utils.llm_cache import create_llm
 
 # Create meta searcher agent
 meta_searcher = Agent(
@@ -10,4 +11,5 @@ meta_searcher = Agent(
     different language variations.""",
     verbose=True,
     allow_delegation=False,
+    llm=create_llm("meta_searcher"),
 )
@@ -1,4 +1,5 @@
 from crewai import Agent
+from utils.llm_cache import create_llm
 
 # Create summarizer agent
 summarizer = Agent(
@@ -9,4 +10,5 @@ summarizer = Agent(
     eliminating redundant information and maintaining factual accuracy. You don't use tools.""",
     verbose=True,
     allow_delegation=False,
+    llm=create_llm("summarizer"),
 )
\ No newline at end of file
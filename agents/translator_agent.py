@@ -1,4 +1,5 @@
 from crewai import Agent
+from utils.llm_cache import create_llm
 
 # Create translator agent
 translator = Agent(
@@ -9,4 +10,5 @@ translator = Agent(
     cultural contexts and ensure translations are both accurate and culturally appropriate.""",
     verbose=True,
     allow_delegation=False,
+    llm=create_llm("translator"),
 )
@@ -0,0 +1,110 @@
+# ANN Benchmark: recall@k vs. latency of the approximate index variants
+# Builds IVF-Flat, HNSW and IVF-PQ indexes over the vectors of the unified
+# index (or synthetic vectors) and compares them against the exact flat index
+# on a held-out query set: chunks sampled out of the corpus are used as
+# queries and excluded from the indexed vectors.
+#
+# Usage: python benchmarks/ann_benchmark.py [--index-path PATH] [--queries N] [--k K]
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.faiss_index import apply_search_params, create_index, make_index_meta, training_sample_size
+from utils.index_store import IndexReader
+
+DEFAULT_INDEX_PATH = os.path.join(str(Path(__file__).parent.parent), "corpus", "embeddings", "unified_index")
+
+
+def load_vectors(index_path: str, max_vectors: int, synthetic: int) -> np.ndarray:
+    """Read the vectors of the unified index, or generate clustered synthetic ones."""
+    if synthetic:
+        rng = np.random.default_rng(0)
+        centers = rng.standard_normal((max(synthetic // 1000, 1), 384)).astype(np.float32)
+        vectors = centers[rng.integers(0, len(centers), synthetic)]
+        vectors += 0.5 * rng.standard_normal(vectors.shape).astype(np.float32)
+    else:
+        reader = IndexReader(index_path)
+        vectors = np.array(reader.vectors[:max_vectors])
+    faiss.normalize_L2(vectors)  # all-MiniLM-L6-v2 vectors are unit length
+    return vectors
+
+
+def split_queries(vectors: np.ndarray, count: int) -> tuple[np.ndarray, np.ndarray]:
+    """Hold out `count` random vectors as queries; the rest is the indexed base."""
+    rng = np.random.default_rng(1)
+    mask = np.zeros(len(vectors), dtype=bool)
+    mask[rng.choice(len(vectors), count, replace=False)] = True
+    return np.ascontiguousarray(vectors[~mask]), np.ascontiguousarray(vectors[mask])
+
+
+def build(base: np.ndarray, meta: dict) -> tuple[faiss.Index, float]:
+    start = time.perf_counter()
+    index = create_index(base.shape[1], meta, count=len(base))
+    if not index.is_trained:
+        sample_size = training_sample_size(meta, len(base))
+        sample = base[np.random.default_rng(0).choice(len(base), sample_size, replace=False)]
+        index.train(sample)
+    index.add(base)
+    return index, time.perf_counter() - start
+
+
+def measure(index: faiss.Index, queries: np.ndarray, truth: np.ndarray, k: int) -> tuple[float, float]:
+    """Return recall@k against the exact results and mean per-query latency in ms."""
+    start = time.perf_counter()
+    results = np.vstack([index.search(query[None, :], k)[1] for query in queries])
+    latency_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+    hits = sum(len(set(found) & set(expected)) for found, expected in zip(results, truth))
+    return hits / truth.size, latency_ms
+
+
+def index_size_mib(index: faiss.Index) -> float:
+    return faiss.serialize_index(index).nbytes / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark approximate FAISS indexes against the flat index")
+    parser.add_argument("--index-path", default=DEFAULT_INDEX_PATH, help="Unified index directory")
+    parser.add_argument("--max-vectors", type=int, default=1_000_000, help="Vectors read from the index")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Use N clustered synthetic vectors instead of the unified index")
+    parser.add_argument("--queries", type=int, default=1000, help="Held-out queries")
+    parser.add_argument("--k", type=int, default=5, help="Neighbors per query (recall@k)")
+    args = parser.parse_args()
+
+    base, queries = split_queries(load_vectors(args.index_path, args.max_vectors, args.synthetic), args.queries)
+    print(f"{len(base)} indexed vectors, {len(queries)} held-out queries, k={args.k}\n")
+
+    flat, flat_build = build(base, make_index_meta(index_type="flat"))
+    _, truth = flat.search(queries, args.k)
+
+    variants = [("flat", make_index_meta(index_type="flat"), [{}])]
+    variants.append(("ivf-flat", make_index_meta(index_type="ivf-flat"),
+                     [{"nprobe": n} for n in (1, 4, 16, 64)]))
+    variants.append(("hnsw", make_index_meta(index_type="hnsw"),
+                     [{"ef_search": ef} for ef in (16, 32, 64, 128)]))
+    variants.append(("ivf-pq", make_index_meta(index_type="ivf-pq"),
+                     [{"nprobe": n} for n in (4, 16, 64)]))
+
+    print(f"{'index':>9} {'params':>16} {'build s':>8} {'size MiB':>9} {'recall@k':>9} {'ms/query':>9}")
+    for name, meta, sweeps in variants:
+        index, build_seconds = (flat, flat_build) if name == "flat" else build(base, meta)
+        for params in sweeps:
+            meta.update(params)
+            apply_search_params(index, meta)
+            recall, latency_ms = measure(index, queries, truth, args.k)
+            label = ", ".join(f"{key}={value}" for key, value in params.items()) or "exact"
+            print(f"{name:>9} {label:>16} {build_seconds:>8.1f} {index_size_mib(index):>9.1f} "
+                  f"{recall:>9.3f} {latency_ms:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
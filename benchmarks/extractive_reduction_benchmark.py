@@ -0,0 +1,63 @@
+# Extractive Reduction Benchmark: summarizer prompt size before and after
+# Samples articles from the unified index, joins their chunks as the
+# metadata search tool returns them, and reduces them with the extractive
+# stage that runs before the summarizer LLM, reporting for several token
+# budgets the prompt tokens before and after, the overlap duplicates dropped
+# and the reduction latency. Long articles are reported separately, as they
+# are the ones that dominate LLM latency and cost.
+#
+# Usage: python benchmarks/extractive_reduction_benchmark.py [--samples N] [--budgets 1500 3000 6000]
+
+import argparse
+import os
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.embeddings import embeddings
+from utils.extractive import reduce_text
+from utils.index_store import IndexReader
+
+DEFAULT_INDEX_PATH = os.path.join(str(Path(__file__).parent.parent), "corpus", "embeddings", "unified_index")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the extractive reduction of articles")
+    parser.add_argument("--index-path", default=DEFAULT_INDEX_PATH, help="Unified index directory")
+    parser.add_argument("--samples", type=int, default=200, help="Articles sampled")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[1500, 3000, 6000], help="Token budgets")
+    args = parser.parse_args()
+
+    reader = IndexReader(args.index_path)
+    titles = list(reader.iter_titles())
+    rng = random.Random(0)
+    sample = rng.sample(titles, min(args.samples, len(titles)))
+    articles = ["\n".join(doc.page_content for doc in reader.get_article(normalized)) for normalized, _ in sample]
+    articles = [article for article in articles if article]
+
+    # Warm up the model, so the first article doesn't pay for loading it
+    reduce_text(articles[0], embeddings)
+
+    print(f"{len(articles)} articles\n")
+    print(f"{'budget':>7} {'articles':>9} {'tokens in':>10} {'tokens out':>11} {'reduction':>10} "
+          f"{'duplicates':>11} {'mean ms':>8} {'p99 ms':>8}")
+    for budget in args.budgets:
+        for label, subset in (("all", articles), ("long", [a for a in articles if len(a) // 4 > budget])):
+            if not subset:
+                continue
+            reports = [reduce_text(article, embeddings, token_budget=budget)[1] for article in subset]
+            tokens_in = np.array([report["input_tokens"] for report in reports])
+            tokens_out = np.array([report["output_tokens"] for report in reports])
+            duplicates = np.array([report["duplicates"] / max(report["input_sentences"], 1) for report in reports])
+            latency = np.array([report["seconds"] * 1000 for report in reports])
+            print(f"{budget:>7} {label + ' ' + str(len(subset)):>9} {tokens_in.mean():>10.0f} {tokens_out.mean():>11.0f} "
+                  f"{1 - tokens_out.sum() / tokens_in.sum():>10.1%} {duplicates.mean():>11.1%} "
+                  f"{latency.mean():>8.1f} {np.percentile(latency, 99):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
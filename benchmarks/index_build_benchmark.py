@@ -0,0 +1,121 @@
+# Index Build Benchmark: merge_from loop vs. single-pass IndexBuilder
+# Compares build time and peak memory of the previous index construction
+# (one FAISS.from_documents store per 100 chunks, merged with merge_from)
+# against IndexBuilder writing to an index directory (memory-mapped vectors
+# and a SQLite docstore).
+# Each variant runs in a fresh process so peak RSS is measured separately.
+#
+# Usage: python benchmarks/index_build_benchmark.py [--chunks N] [--real-model]
+
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def make_documents(count: int, seed: int = 0):
+    """Generate synthetic ~1000 character chunks."""
+    from langchain_core.documents import Document
+
+    rng = random.Random(seed)
+    words = [f"word{i}" for i in range(5000)]
+    return [
+        Document(
+            page_content=" ".join(rng.choice(words) for _ in range(140)),
+            metadata={"title": f"Article {i // 10}", "sources": []}
+        )
+        for i in range(count)
+    ]
+
+
+def get_embeddings(real_model: bool):
+    if real_model:
+        from utils.embeddings import embeddings
+        return embeddings
+    # Deterministic fake vectors isolate the cost of building the index
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    return DeterministicFakeEmbedding(size=384)
+
+
+def build_merge_from(documents, embeddings, batch_size: int):
+    from langchain_community.vectorstores import FAISS
+
+    vector_store = None
+    for i in range(0, len(documents), 100):
+        batch = documents[i:i + 100]
+        if vector_store is None:
+            vector_store = FAISS.from_documents(batch, embeddings)
+        else:
+            vector_store.merge_from(FAISS.from_documents(batch, embeddings))
+    return vector_store.index.ntotal
+
+
+def build_index_builder(documents, embeddings, batch_size: int):
+    from corpus.index_builder import IndexBuilder
+    from utils.index_store import IndexWriter
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        writer = IndexWriter(os.path.join(tmp_dir, "index"))
+        builder = IndexBuilder(embeddings, writer, batch_size=batch_size, report_interval=float("inf"))
+        builder.add_documents(documents)
+        builder.build()
+        writer.close()
+        return builder.count
+
+
+VARIANTS = {
+    "merge_from": build_merge_from,
+    "index_builder": build_index_builder,
+}
+
+
+def run_variant(name: str, chunks: int, batch_size: int, real_model: bool, results) -> None:
+    documents = make_documents(chunks)
+    embeddings = get_embeddings(real_model)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    ntotal = VARIANTS[name](documents, embeddings, batch_size)
+    elapsed = time.perf_counter() - start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results[name] = (elapsed, ntotal, baseline_rss, peak_rss)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FAISS index construction")
+    parser.add_argument("--chunks", type=int, default=20000, help="Number of synthetic chunks")
+    parser.add_argument("--batch-size", type=int, default=1024, help="IndexBuilder batch size")
+    parser.add_argument("--real-model", action="store_true",
+                        help="Encode with all-MiniLM-L6-v2 instead of fake vectors")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Manager().dict()
+    for name in VARIANTS:
+        process = context.Process(target=run_variant,
+                                  args=(name, args.chunks, args.batch_size, args.real_model, results))
+        process.start()
+        process.join()
+
+    # ru_maxrss is reported in KiB on Linux and in bytes on macOS
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    print(f"{'variant':>22} {'chunks':>8} {'time s':>8} {'chunks/s':>10} {'peak RSS MiB':>13} {'build MiB':>10}")
+    for name in VARIANTS:
+        if name not in results:
+            print(f"{name:>22} failed")
+            continue
+        elapsed, ntotal, baseline_rss, peak_rss = results[name]
+        print(f"{name:>22} {ntotal:>8} {elapsed:>8.2f} {ntotal / elapsed:>10.1f} "
+              f"{peak_rss / unit:>13.1f} {(peak_rss - baseline_rss) / unit:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
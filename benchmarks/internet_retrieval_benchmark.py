@@ -0,0 +1,167 @@
+# Internet Retrieval Benchmark: concurrent search and fetch against a local stub
+# Starts a local HTTP server that answers Serper-style searches and serves
+# pages with a fixed latency (plus a page that never finishes in time and
+# one larger than the size cap), then compares fetching the results one at a
+# time with InternetSearchTool's concurrent fan-out. Then repeats the
+# retrieval to measure the page cache: fresh pages are served from it, and
+# stale ones are revalidated with the stub's ETags. Runs offline: no API key
+# or network access is needed.
+#
+# Usage: python benchmarks/internet_retrieval_benchmark.py [--latency S] [--pages N]
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency: float, pages: int):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.latency = latency
+        self.pages = pages
+        self.lock = threading.Lock()
+        self.in_flight: dict[str, int] = {}
+        self.max_in_flight: dict[str, int] = {}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        """Serper-style search: every query returns links to all stub pages."""
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        hosts = [self.server.base_url, self.server.base_url.replace("127.0.0.1", "localhost")]
+        organic = [{"title": f"Page {n}", "link": f"{hosts[n % 2]}/page/{n}",
+                    "snippet": f"Snippet of page {n} about {request['q']}"}
+                   for n in range(self.server.pages)]
+        organic += [{"title": "Slow page", "link": f"{hosts[0]}/slow", "snippet": "Slow page snippet"},
+                    {"title": "Huge page", "link": f"{hosts[1]}/huge", "snippet": "Huge page snippet"}]
+        self._send(200, "application/json", json.dumps({"organic": organic}).encode())
+
+    def do_GET(self):
+        host = self.headers["Host"]
+        with self.server.lock:
+            self.server.in_flight[host] = self.server.in_flight.get(host, 0) + 1
+            self.server.max_in_flight[host] = max(self.server.max_in_flight.get(host, 0), self.server.in_flight[host])
+        try:
+            if self.path == "/slow":
+                time.sleep(30)
+                self._send(200, "text/html", b"<p>too late</p>")
+            elif self.path == "/huge":
+                self._send(200, "text/html", b"<p>" + b"eiffel tower paris " * 200000 + b"</p>")
+            elif self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("ETag", '"v1"')
+                self.end_headers()
+            else:
+                time.sleep(self.server.latency)
+                body = (f"<html><head><title>{self.path}</title><script>var x = 1;</script></head><body>"
+                        f"<nav>Menu</nav><p>The Eiffel Tower is a wrought-iron lattice tower in Paris, France.</p>"
+                        f"<p>Unrelated text about cooking recipes and gardening tips for the spring.</p>"
+                        f"<p>It was completed in 1889 as the entrance to the World's Fair.</p></body></html>")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", str(len(body.encode())))
+                self.end_headers()
+                self.wfile.write(body.encode())
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with self.server.lock:
+                self.server.in_flight[host] -= 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds each stub page takes")
+    parser.add_argument("--pages", type=int, default=8, help="Stub pages returned per search")
+    args = parser.parse_args()
+
+    server = StubServer(args.latency, args.pages)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ["SERPER_SEARCH_URL"] = f"{server.base_url}/search"
+    os.environ.setdefault("SERPER_API_KEY", "stub")
+    os.environ["INTERNET_MAX_PAGES"] = str(args.pages + 2)
+    os.environ.setdefault("FETCH_TIMEOUT", "2")
+    os.environ.setdefault("INTERNET_FETCH_DEADLINE", "5")
+    os.environ["PAGE_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "pages.sqlite")
+
+    from tools.internet_tools import InternetSearchTool
+    from utils.http_client import create_fetch_pool
+    from utils.page_cache import get_page_cache
+
+    analysis = {
+        "original_request": "The Eiffel Tower is in Paris",
+        "request_in_english": "The Eiffel Tower is in Paris",
+        "verification_facts": ["The Eiffel Tower is in Paris", "The Eiffel Tower was completed in 1889"],
+        "possible_questions": ["Where is the Eiffel Tower?"],
+        "original_language": "English",
+    }
+
+    # One search and one fetch at a time, as the agent did with its tools
+    pool = create_fetch_pool()
+    start = time.perf_counter()
+    results = pool.post_json(os.environ["SERPER_SEARCH_URL"], {"q": analysis["request_in_english"]})["organic"]
+    for result in results[:args.pages]:
+        pool.fetch(result["link"])
+    sequential = time.perf_counter() - start
+
+    tool = InternetSearchTool()
+    start = time.perf_counter()
+    output = json.loads(tool._run(**analysis))
+    concurrent = time.perf_counter() - start
+
+    print(f"Sequential search and {args.pages} fetches: {sequential:.2f}s")
+    print(f"InternetSearchTool ({len(output)} sources, incl. slow and huge pages): {concurrent:.2f}s "
+          f"({sequential / concurrent:.1f}x)")
+    print(f"Max concurrent requests per host: {server.max_in_flight} "
+          f"(limit {os.getenv('FETCH_PER_HOST', '4')})")
+
+    by_source = {item["internet_article_source"]: item["content"] for item in output}
+    assert any("Slow page snippet" == content for content in by_source.values()), "slow page should fall back to its snippet"
+    assert all("cooking" not in content for content in by_source.values()), "irrelevant passages should be dropped"
+    assert all(len(content) <= int(os.getenv("INTERNET_PAGE_CHARS", "3000")) for content in by_source.values())
+    print("Checks passed: timeouts fall back to snippets, passages are filtered and capped")
+
+    # Repeat: fresh pages come from the page cache, then stale ones are revalidated
+    start = time.perf_counter()
+    cached_output = json.loads(tool._run(**analysis))
+    cached = time.perf_counter() - start
+    get_page_cache().ttl = 0.001
+    time.sleep(0.01)
+    start = time.perf_counter()
+    revalidated_output = json.loads(tool._run(**analysis))
+    revalidated = time.perf_counter() - start
+    print(f"Repeated with fresh cached pages: {cached:.2f}s; after revalidation: {revalidated:.2f}s "
+          f"(both include the slow page timing out again, as failures aren't cached)")
+    print(f"Page cache: {get_page_cache().stats()}")
+    assert cached_output == output and revalidated_output == output, "cached pages should give the same result"
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
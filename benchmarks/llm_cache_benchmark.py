@@ -0,0 +1,81 @@
+# LLM Cache Benchmark: memoized agent LLM calls against a local stub LLM
+# Replays a prompt workload with repeated prompts through memoize_llm around
+# a stub LLM with a fixed latency, so the cache can be checked offline (no
+# API key or network): responses served from the cache must equal the
+# stub's, and the per-agent counters report the latency and tokens saved.
+#
+# Usage: python benchmarks/llm_cache_benchmark.py [--prompts N] [--repeat-ratio R]
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.llm_cache import llm_cache_stats, memoize_llm
+from utils.result_cache import ResultCache
+
+
+class StubLLM:
+    """Deterministic stand-in for crewai.LLM with a fixed latency."""
+
+    def __init__(self, latency: float):
+        self.model = "stub-model"
+        self.temperature = 0
+        self.latency = latency
+        self.calls = 0
+
+    def call(self, messages, callbacks=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        return f"Answer to: {messages[-1]['content']}"
+
+
+def make_workload(count: int, repeat_ratio: float, seed: int = 0) -> list[list[dict]]:
+    """Prompts where about repeat_ratio of them repeat an earlier prompt."""
+    rng = random.Random(seed)
+    prompts = []
+    for i in range(count):
+        if prompts and rng.random() < repeat_ratio:
+            prompts.append(rng.choice(prompts))
+        else:
+            prompts.append([
+                {"role": "system", "content": "You are a translator."},
+                {"role": "user", "content": f"Translate summary {i} to Spanish"},
+            ])
+    return prompts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LLM response cache with a stub LLM")
+    parser.add_argument("--prompts", type=int, default=200, help="Prompts in the workload")
+    parser.add_argument("--repeat-ratio", type=float, default=0.5, help="Fraction of repeated prompts")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub LLM latency in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ResultCache(os.path.join(tmp_dir, "llm.sqlite"), ttl=3600, max_entries=100000)
+        expected = StubLLM(0)
+        llm = memoize_llm(StubLLM(args.latency), "stub_agent", cache=cache)
+
+        workload = make_workload(args.prompts, args.repeat_ratio)
+        start = time.perf_counter()
+        for messages in workload:
+            response = llm.call(messages, callbacks=[object()])  # Callbacks don't affect the key
+            assert response == expected.call(messages), "cached response differs from the LLM's"
+        elapsed = time.perf_counter() - start
+
+        uncached = len(workload) * args.latency
+        stats = llm_cache_stats()["agents"]["stub_agent"]
+        print(f"{len(workload)} prompts, {stats['hits']} served from the cache ({stats['hit_rate']:.1%})")
+        print(f"Time: {elapsed:.2f}s with the cache vs. {uncached:.2f}s without")
+        print(f"Saved: {stats['saved_seconds']:.2f}s of LLM latency, ~{stats['saved_tokens']} tokens")
+        print(f"Store: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# Rerank Evaluation: evidence recall vs. verifier prompt tokens
+# Runs the RAG retrieval of RAGSearchTool (the request, its facts and its
+# questions, top 5 hits each) for a set of claims and compares the prompt the
+# verifier receives without reranking (the former indented JSON of every
+# unique hit) against the reranked passages for several top-N and token
+# budgets. Evidence recall is the share of claims whose evidence survives:
+# for labeled claims, all their evidence articles are among the sources; for
+# claims sampled from the index, the sampled sentence is in a passage.
+# Facts and questions come from the local analysis of short claims, or are
+# the claim itself.
+#
+# Usage: python benchmarks/rerank_eval.py [--claims claims.jsonl] [--samples N]
+#            [--top-n 4 8 12] [--budgets 1000 2000 4000]
+# Each line of claims.jsonl: {"claim": "...", "titles": ["Evidence article", ...]}
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.search_manager import SearchManager
+from utils.extractive import estimate_tokens, split_sentences
+from utils.fast_analysis import fast_analyze
+from utils.reranking import rerank
+
+# Built-in labeled claims: the articles holding their evidence
+DEFAULT_CLAIMS = [
+    ("Marie Curie was born in Warsaw in 1867", ["Marie Curie"]),
+    ("Albert Einstein received the Nobel Prize in Physics in 1921", ["Albert Einstein"]),
+    ("The Eiffel Tower was completed in 1889 for the World's Fair", ["Eiffel Tower"]),
+    ("Mount Everest is the highest mountain above sea level", ["Mount Everest"]),
+    ("William Shakespeare was born in Stratford-upon-Avon", ["William Shakespeare"]),
+    ("The Amazon River flows through Brazil, Peru and Colombia", ["Amazon River"]),
+    ("Barack Obama was the 44th president of the United States", ["Barack Obama"]),
+    ("Isaac Newton was born in 1643 and wrote the Principia", ["Isaac Newton"]),
+    ("The Great Wall of China was built over many centuries", ["Great Wall of China"]),
+    ("Leonardo da Vinci painted the Mona Lisa", ["Leonardo da Vinci", "Mona Lisa"]),
+]
+
+
+def load_claims(path: str) -> list[tuple[str, list[str]]]:
+    with open(path, encoding="utf-8") as f:
+        return [(item["claim"], item["titles"]) for item in map(json.loads, filter(str.strip, f))]
+
+
+def sample_claims(search_manager: SearchManager, count: int) -> list[tuple[str, str]]:
+    """Claims taken from a sentence of random indexed chunks, with that sentence."""
+    claims = []
+    for doc in search_manager.index_store.sample_documents(count * 2, seed=1):
+        sentences = [s for s in split_sentences(doc.page_content) if 40 <= len(s) <= 200]
+        if sentences:
+            claims.append((sentences[len(sentences) // 2], " ".join(sentences[len(sentences) // 2].split())))
+        if len(claims) == count:
+            break
+    return claims
+
+
+def analysis(claim: str) -> tuple[list[str], list[str]]:
+    """Verification facts and questions of a claim."""
+    result, _ = fast_analyze(claim)
+    if result is None:
+        return [claim], []
+    return result["verification_facts"], result["possible_questions"]
+
+
+def candidates(search_manager: SearchManager, claim: str, facts: list[str], questions: list[str]) -> list:
+    search = search_manager.hybrid_search_batch if search_manager.hybrid_enabled else search_manager.similarity_search_batch
+    seen, unique = set(), []
+    for docs in search([claim, *facts, *questions], k=5):
+        for doc in docs:
+            if doc.page_content not in seen:
+                seen.add(doc.page_content)
+                unique.append(doc)
+    return unique
+
+
+def found(docs: list, evidence) -> bool:
+    if isinstance(evidence, str):
+        return any(evidence in " ".join(doc.page_content.split()) for doc in docs)
+    titles = {doc.metadata.get("title", "").lower() for doc in docs}
+    return all(title.lower() in titles for title in evidence)
+
+
+def prompt_tokens(docs: list, indent=None) -> int:
+    results = [{"wikipedia_article_source": doc.metadata.get("title"), "content": doc.page_content} for doc in docs]
+    return estimate_tokens(json.dumps(results, indent=indent, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate evidence recall vs. prompt tokens of the reranking")
+    parser.add_argument("--claims", help="JSONL file of labeled claims (default: built-in claims)")
+    parser.add_argument("--samples", type=int, default=100, help="Claims sampled from the index")
+    parser.add_argument("--top-n", type=int, nargs="+", default=[4, 8, 12], help="Passages kept")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[1000, 2000, 4000], help="Token budgets")
+    args = parser.parse_args()
+
+    search_manager = SearchManager()
+    labeled = load_claims(args.claims) if args.claims else DEFAULT_CLAIMS
+    claims = labeled + sample_claims(search_manager, args.samples)
+
+    pools = []
+    for claim, evidence in claims:
+        facts, questions = analysis(claim)
+        docs = candidates(search_manager, claim, facts, questions)
+        targets = [claim, *facts]
+        query_vectors = np.asarray(search_manager.embeddings.embed_queries(targets), dtype=np.float32)
+        pools.append((targets, docs, query_vectors, search_manager.document_vectors(docs), evidence))
+    print(f"{len(labeled)} labeled and {len(claims) - len(labeled)} sampled claims\n")
+
+    def report(label: str, outputs: list, seconds: list[float], indent=None):
+        for name, subset in (("labeled", slice(0, len(labeled))), ("sampled", slice(len(labeled), None))):
+            rows = list(zip(outputs, pools))[subset]
+            if not rows:
+                continue
+            recall = np.mean([found(docs, pool[4]) for docs, pool in rows])
+            tokens = np.array([prompt_tokens(docs, indent) for docs, _ in rows])
+            print(f"{label:>18} {name:>8} {recall:>8.1%} {tokens.mean():>12.0f} {np.percentile(tokens, 95):>10.0f} "
+                  f"{np.mean(seconds[subset]) * 1000:>8.1f}")
+
+    print(f"{'setting':>18} {'claims':>8} {'recall':>8} {'mean tokens':>12} {'p95 tokens':>10} {'ms':>8}")
+    report("no reranking", [pool[1] for pool in pools], [0.0] * len(pools), indent=2)
+    for top_n in args.top_n:
+        for budget in args.budgets:
+            outputs, seconds = [], []
+            for targets, docs, query_vectors, doc_vectors, _ in pools:
+                start = time.perf_counter()
+                kept, _ = rerank(targets, docs, query_vectors, doc_vectors, top_n=top_n, token_budget=budget)
+                seconds.append(time.perf_counter() - start)
+                outputs.append(kept)
+            report(f"top {top_n}, {budget} tok", outputs, seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Retrieval Benchmark: serial vs. batched RAG retrieval
+# Measures the per-statement retrieval latency of RAGSearchTool as the number
+# of verification facts and questions grows, comparing one similarity_search
+# call per query against a single batched embedding pass + FAISS search.
+#
+# Usage: python benchmarks/retrieval_benchmark.py [--repeats N]
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.search_manager import SearchManager
+
+
+def sample_queries(search_manager: SearchManager, count: int, seed: int = 0) -> list[str]:
+    """Build synthetic queries from the first sentence of random indexed chunks."""
+    queries = []
+    for doc in search_manager.index_store.sample_documents(count, seed=seed):
+        sentence = doc.page_content.split('.')[0].strip()
+        queries.append(sentence[:200] or doc.metadata.get('title', ''))
+    return queries
+
+
+def time_serial(search_manager: SearchManager, queries: list[str], k: int) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        search_manager.similarity_search(query, k=k)
+    return time.perf_counter() - start
+
+
+def time_batched(search_manager: SearchManager, queries: list[str], k: int) -> float:
+    start = time.perf_counter()
+    search_manager.similarity_search_batch(queries, k=k)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serial vs. batched RAG retrieval")
+    parser.add_argument("--repeats", type=int, default=5, help="Statements simulated per size")
+    parser.add_argument("--k", type=int, default=5, help="Hits per query")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 3, 5, 10, 15, 20],
+                        help="Number of queries per statement (request + facts + questions)")
+    args = parser.parse_args()
+
+    search_manager = SearchManager()
+    # Warm up the model so the first measurement does not pay for lazy initialization
+    search_manager.similarity_search_batch(["warm up"], k=args.k)
+
+    print(f"{'queries':>8} {'serial ms':>12} {'batched ms':>12} {'speedup':>8}")
+    for size in args.sizes:
+        serial_total, batched_total = 0.0, 0.0
+        for repeat in range(args.repeats):
+            queries = sample_queries(search_manager, size, seed=repeat)
+            serial_total += time_serial(search_manager, queries, args.k)
+            batched_total += time_batched(search_manager, queries, args.k)
+
+        serial_ms = serial_total / args.repeats * 1000
+        batched_ms = batched_total / args.repeats * 1000
+        print(f"{size:>8} {serial_ms:>12.1f} {batched_ms:>12.1f} {serial_ms / batched_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
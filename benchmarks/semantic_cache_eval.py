@@ -0,0 +1,87 @@
+# Semantic Cache Evaluation: hit rate vs. false-hit rate by threshold
+# Scores labeled claim pairs with the shared embedding model: paraphrases of
+# the same claim should hit the semantic cache, while claims that differ in
+# a name, number or negation must not (a false hit serves a wrong verdict).
+# Reports both rates for a range of similarity thresholds, with and without
+# the number/negation check of utils.semantic_cache.
+#
+# Usage: python benchmarks/semantic_cache_eval.py [--pairs pairs.jsonl]
+# Each line of pairs.jsonl: {"a": "...", "b": "...", "same": true|false}
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.embeddings import embeddings
+from utils.semantic_cache import claim_signature
+
+# Built-in pairs: paraphrases (same claim) and hard negatives (different claim)
+DEFAULT_PAIRS = [
+    ("The Eiffel Tower is in Paris", "Paris is home to the Eiffel Tower", True),
+    ("The Eiffel Tower is in Paris", "The Eiffel Tower is located in Paris, France", True),
+    ("Albert Einstein was born in Germany", "Einstein was born in Germany", True),
+    ("Water boils at 100 degrees Celsius at sea level", "At sea level, water boils at 100 °C", True),
+    ("The Great Wall of China is visible from space", "You can see the Great Wall of China from space", True),
+    ("Barack Obama was the 44th president of the United States", "Obama served as the 44th US president", True),
+    ("Mount Everest is the tallest mountain on Earth", "The highest mountain on Earth is Mount Everest", True),
+    ("The Amazon is the longest river in the world", "The world's longest river is the Amazon", True),
+    ("Marie Curie won two Nobel Prizes", "Marie Curie was awarded the Nobel Prize twice", True),
+    ("Shakespeare wrote Hamlet", "Hamlet was written by William Shakespeare", True),
+    ("The Eiffel Tower is in Paris", "The Eiffel Tower is not in Paris", False),
+    ("The Eiffel Tower is in Paris", "The Eiffel Tower is in Rome", False),
+    ("Marie Curie was born in 1867", "Marie Curie was born in 1868", False),
+    ("Albert Einstein was born in Germany", "Albert Einstein died in Germany", False),
+    ("Barack Obama was the 44th president of the United States",
+     "Barack Obama was the 45th president of the United States", False),
+    ("Mount Everest is the tallest mountain on Earth", "K2 is the tallest mountain on Earth", False),
+    ("Shakespeare wrote Hamlet", "Shakespeare wrote Don Quixote", False),
+    ("Water boils at 100 degrees Celsius at sea level", "Water freezes at 0 degrees Celsius at sea level", False),
+    ("The Amazon is the longest river in the world", "The Nile is the longest river in the world", False),
+    ("Marie Curie won two Nobel Prizes", "Marie Curie never won a Nobel Prize", False),
+]
+
+
+def load_pairs(path: str) -> list[tuple[str, str, bool]]:
+    with open(path, encoding="utf-8") as f:
+        return [(row["a"], row["b"], bool(row["same"])) for row in map(json.loads, f) if row]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate semantic cache thresholds on labeled claim pairs")
+    parser.add_argument("--pairs", help="JSONL file of labeled pairs (default: built-in pairs)")
+    parser.add_argument("--thresholds", type=float, nargs="+",
+                        default=[0.80, 0.85, 0.90, 0.92, 0.94, 0.95, 0.96, 0.98])
+    args = parser.parse_args()
+
+    pairs = load_pairs(args.pairs) if args.pairs else DEFAULT_PAIRS
+    vectors_a = np.asarray(embeddings.embed_queries([a for a, _, _ in pairs]), dtype=np.float32)
+    vectors_b = np.asarray(embeddings.embed_queries([b for _, b, _ in pairs]), dtype=np.float32)
+    vectors_a /= np.linalg.norm(vectors_a, axis=1, keepdims=True)
+    vectors_b /= np.linalg.norm(vectors_b, axis=1, keepdims=True)
+    similarities = (vectors_a * vectors_b).sum(axis=1)
+
+    same = np.array([label for _, _, label in pairs])
+    compatible = np.array([claim_signature(a) == claim_signature(b) for a, b, _ in pairs])
+    print(f"{same.sum()} paraphrase pairs, {(~same).sum()} different-claim pairs\n")
+
+    print(f"{'threshold':>9} {'hit rate':>9} {'false hits':>11} {'hit rate*':>10} {'false hits*':>12}")
+    for threshold in args.thresholds:
+        above = similarities >= threshold
+        guarded = above & compatible
+        print(f"{threshold:>9.2f} {above[same].mean():>9.3f} {above[~same].mean():>11.3f} "
+              f"{guarded[same].mean():>10.3f} {guarded[~same].mean():>12.3f}")
+    print("\n* with the number/negation check")
+
+    print("\nHardest different-claim pairs:")
+    for i in np.argsort(-np.where(same, -np.inf, similarities))[:5]:
+        a, b, _ = pairs[i]
+        print(f"  {similarities[i]:.3f}  {a!r} / {b!r}")
+
+
+if __name__ == "__main__":
+    main()
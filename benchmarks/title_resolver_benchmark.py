@@ -0,0 +1,82 @@
+# Title Resolver Benchmark: latency and accuracy of approximate title matching
+# Samples indexed titles, derives the kind of variants the agents cite
+# (different case and punctuation, a qualifier between parentheses, a typo,
+# a truncated title) and resolves them with the trigram title index built
+# over the full title set, reporting per-lookup latency and how often the
+# original title is recovered or a different one is returned instead.
+#
+# Usage: python benchmarks/title_resolver_benchmark.py [--samples N] [--rebuild]
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.index_store import IndexReader
+from utils.titles import TITLE_INDEX_DIR, TitleResolver, normalize_title
+
+DEFAULT_INDEX_PATH = os.path.join(str(Path(__file__).parent.parent), "corpus", "embeddings", "unified_index")
+
+
+def make_variants(title: str, rng: random.Random) -> dict[str, str]:
+    """Return cited-title variants of an indexed title, by kind."""
+    variants = {
+        "exact": title,
+        "recased": title.upper() if rng.random() < 0.5 else title.lower(),
+        "qualifier": f"{title} ({rng.choice(['Wikipedia', 'article', 'history', 'overview'])})",
+    }
+    if len(title) > 4:
+        i = rng.randrange(1, len(title) - 1)
+        variants["typo"] = title[:i] + title[i + 1:]
+    words = title.split()
+    if len(words) > 2:
+        variants["truncated"] = " ".join(words[:-1])
+    return variants
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark approximate title resolution")
+    parser.add_argument("--index-path", default=DEFAULT_INDEX_PATH, help="Unified index directory")
+    parser.add_argument("--samples", type=int, default=2000, help="Indexed titles sampled")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the title index and time it")
+    args = parser.parse_args()
+
+    reader = IndexReader(args.index_path)
+    titles = [title for _, title in reader.iter_titles()]
+    resolver_path = os.path.join(args.index_path, TITLE_INDEX_DIR)
+    if args.rebuild or not os.path.exists(resolver_path):
+        start = time.perf_counter()
+        TitleResolver.build(titles, resolver_path)
+        print(f"Built the title index over {len(titles)} titles in {time.perf_counter() - start:.1f}s")
+    resolver = TitleResolver(resolver_path)
+    print(f"{len(resolver)} indexed titles\n")
+
+    rng = random.Random(0)
+    sample = rng.sample(titles, min(args.samples, len(titles)))
+    latencies: dict[str, list[float]] = {}
+    correct: dict[str, int] = {}
+    wrong: dict[str, int] = {}
+    for title in sample:
+        for kind, variant in make_variants(title, rng).items():
+            start = time.perf_counter()
+            match = resolver.resolve(variant)
+            latencies.setdefault(kind, []).append((time.perf_counter() - start) * 1000)
+            right = match is not None and normalize_title(match) == normalize_title(title)
+            correct[kind] = correct.get(kind, 0) + right
+            wrong[kind] = wrong.get(kind, 0) + (match is not None and not right)
+
+    print(f"{'variant':>10} {'lookups':>8} {'accuracy':>9} {'wrong':>7} {'mean ms':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for kind, values in latencies.items():
+        values = np.array(values)
+        print(f"{kind:>10} {len(values):>8} {correct[kind] / len(values):>9.3f} {wrong[kind] / len(values):>7.3f} {values.mean():>8.3f} "
+              f"{np.percentile(values, 50):>8.3f} {np.percentile(values, 99):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,183 +1,558 @@
 from langchain_openai import OpenAIEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.documents import Document
+from collections import deque
+from multiprocessing import Pool
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+import argparse
+import hashlib
+import json
 import os
+import shutil
+import sys
+import time
 import xml.etree.ElementTree as ET
 import re
-import torch
 
-def extract_article_info(xml_path: str) -> list[dict]:
+# Allow imports from the project root when run as a script
+sys.path.append(str(Path(__file__).parent.parent))
+from utils.faiss_index import DEFAULT_INDEX_META, INDEX_TYPES, make_index_meta
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+# Pages sent to a worker process per task
+PAGES_PER_TASK = 64
+
+# Share of deleted positions above which an incremental update compacts the
+# index: searches of flat and HNSW indexes oversample to skip them
+COMPACT_DELETED_SHARE = 0.2
+
+def _namespace(tag: str) -> str:
+    """Return the '{uri}' namespace prefix of an XML tag, or '' if it has none."""
+    return tag[:tag.index('}') + 1] if tag.startswith('{') else ''
+
+def iter_pages(xml_path: str) -> Iterator[tuple[str, str]]:
     """
-    Extract title, text, and sources from Wikipedia XML file.
+    Stream (title, raw wikitext) pairs from a Wikipedia XML file.
+    Uses iterparse and clears every processed page, so memory usage does not
+    depend on the size of the dump.
+    """
+    context = ET.iterparse(xml_path, events=('start', 'end'))
+    _, root = next(context)
+    ns = _namespace(root.tag)  # The export schema version varies between dumps
+
+    for event, elem in context:
+        if event != 'end' or elem.tag != f'{ns}page':
+            continue
+
+        title = elem.findtext(f'{ns}title')
+        text = elem.findtext(f'{ns}revision/{ns}text')
+        yield title, text
+
+        # Free the page and drop the reference the root keeps to it
+        elem.clear()
+        root.clear()
+
+def clean_wikitext(text: str) -> tuple[str, list[str]]:
+    """
+    Remove Wiki markup from an article's text.
+    Returns the cleaned text and the content of its reference tags.
     """
-    
-    # Register the namespace
-    namespaces = {
-        'mw': 'http://www.mediawiki.org/xml/export-0.11/'
+    # Remove reference tags but capture their content first
+    sources = []
+    if '<ref' in text:
+        ref_pattern = r'<ref[^>]*>(.*?)</ref>'
+        sources = re.findall(ref_pattern, text, re.DOTALL)
+        # Clean up sources
+        sources = [s.strip() for s in sources if s.strip()]
+
+    # Remove Wiki markup
+    text = re.sub(r'<ref.*?</ref>', '', text, flags=re.DOTALL)  # Remove reference tags
+    text = re.sub(r'\{\{[^\}]*\}\}', '', text, flags=re.DOTALL)  # Remove templates
+    text = re.sub(r'\[\[(?:[^|\]]*\|)?([^\]]+)\]\]', r'\1', text)  # Convert [[link|text]] to text
+    text = re.sub(r'\[https?://[^\]]*\]', '', text)  # Remove external links
+    text = re.sub(r"''+", '', text)  # Remove bold/italic markers
+    text = re.sub(r'={2,}.*?={2,}', '', text)  # Remove section headers
+    text = re.sub(r'__[A-Z]+__', '', text)  # Remove magic words
+
+    # Clean up whitespace
+    text = '\n'.join(line.strip() for line in text.splitlines() if line.strip())
+
+    return text, sources
+
+def prepare_article(title: Optional[str], text: Optional[str]) -> Optional[dict]:
+    """
+    Turn a raw page into an article with its title, cleaned content and sources.
+    Returns None for pages that should be skipped (no title, short or empty text).
+    """
+    if not title or not title.strip():
+        return None
+    title = title.strip()
+
+    if not text or len(text) < 500:
+        return None
+
+    text, sources = clean_wikitext(text)
+
+    # Skip empty articles
+    if not text:
+        return None
+
+    return {
+        "title": title,
+        "content": text,
+        "sources": sources[:5]  # Keep only first 5 sources to save memory
     }
-    
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
-    articles = []
-    total_articles = 0
-    valid_articles = 0
-    
-    # Use the namespace in findall
-    for page in root.findall('.//mw:page', namespaces):
-        total_articles += 1
-        
+
+def extract_article_info(xml_path: str) -> Iterator[dict]:
+    """
+    Extract title, text, and sources from Wikipedia XML file.
+    Articles are yielded one at a time, as the file is parsed.
+    """
+    for title, text in iter_pages(xml_path):
         try:
-            # Extract title
-            title_elem = page.find('.//mw:title', namespaces)
-            if title_elem is None or not title_elem.text:
-                continue
-            title = title_elem.text.strip()
-            
-            # Extract text content
-            text_elem = page.find('.//mw:revision/mw:text', namespaces)
-            if text_elem is None or not text_elem.text:
-                continue
-            
-            text = text_elem.text
-
-            if len(text) < 500:
-                continue
-            
-            # Clean up the text by removing Wiki markup
-            # Remove reference tags but capture their content first
-            sources = []
-            if '<ref' in text:
-                ref_pattern = r'<ref[^>]*>(.*?)</ref>'
-                sources = re.findall(ref_pattern, text, re.DOTALL)
-                # Clean up sources
-                sources = [s.strip() for s in sources if s.strip()]
-            
-            # Remove Wiki markup
-            text = re.sub(r'<ref.*?</ref>', '', text, flags=re.DOTALL)  # Remove reference tags
-            text = re.sub(r'\{\{[^\}]*\}\}', '', text, flags=re.DOTALL)  # Remove templates
-            text = re.sub(r'\[\[(?:[^|\]]*\|)?([^\]]+)\]\]', r'\1', text)  # Convert [[link|text]] to text
-            text = re.sub(r'\[https?://[^\]]*\]', '', text)  # Remove external links
-            text = re.sub(r"''+", '', text)  # Remove bold/italic markers
-            text = re.sub(r'={2,}.*?={2,}', '', text)  # Remove section headers
-            text = re.sub(r'__[A-Z]+__', '', text)  # Remove magic words
-            
-            # Clean up whitespace
-            text = '\n'.join(line.strip() for line in text.splitlines() if line.strip())
-            
-            # Skip empty articles
-            if not text:
-                continue
-            
-            articles.append({
-                "title": title,
-                "content": text,
-                "sources": sources[:5]  # Keep only first 5 sources to save memory
-            })
-            valid_articles += 1
-            
-            # Print progress every 100 valid articles
-            if valid_articles % 100 == 0:
-                print(f"Processed {valid_articles} valid articles out of {total_articles} total articles...")
-        
+            article = prepare_article(title, text)
         except Exception as e:
             print(f"Error processing article: {str(e)}")
             continue
-    
-    print(f"\nFile summary:")
-    print(f"Total articles found: {total_articles}")
-    print(f"Valid articles: {valid_articles}")
-    print(f"Articles skipped: {total_articles - valid_articles}")
-    
-    return articles
-
-def process_xml_file(xml_path: str) -> list[Document]:
-    """Process a single XML file and return document chunks."""
-    # Extract articles from XML
-    articles = extract_article_info(xml_path)
-    
-    if not articles:
-        print(f"Warning: No valid articles found in {Path(xml_path).name}")
-        return []
-    
-    # Split text into chunks
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=100,
+        if article is not None:
+            yield article
+
+def article_hash(article: dict) -> str:
+    """Hash an article's title, content and sources to detect changes between builds."""
+    payload = json.dumps([article["title"], article["content"], article["sources"]], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+def split_article(article: dict, text_splitter: RecursiveCharacterTextSplitter,
+                  content_hash: Optional[str] = None) -> list[Document]:
+    """
+    Split a single article into document chunks.
+    When content_hash is given, chunks get deterministic ids derived from it,
+    so rebuilding an unchanged article yields the same ids.
+    """
+    # Create metadata
+    metadata = {
+        "title": article["title"],
+        "sources": article["sources"][:5]  # Store up to 5 sources in metadata
+    }
+
+    # Split the content into chunks
+    splits = text_splitter.create_documents(
+        texts=[article["content"]],
+        metadatas=[metadata]
     )
-    
-    all_splits = []
-    for article in articles:
-        # Create metadata
-        metadata = {
-            "title": article["title"],
-            "sources": article["sources"][:5]  # Store up to 5 sources in metadata
-        }
-        
-        # Split the content into chunks
-        splits = text_splitter.create_documents(
-            texts=[article["content"]],
-            metadatas=[metadata]
+    if content_hash is not None:
+        for i, split in enumerate(splits):
+            split.id = f"{content_hash[:20]}-{i}"
+    return splits
+
+_text_splitter: Optional[RecursiveCharacterTextSplitter] = None
+
+def _get_text_splitter() -> RecursiveCharacterTextSplitter:
+    """Return this process' text splitter, creating it on first use."""
+    global _text_splitter
+    if _text_splitter is None:
+        _text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=1000,
+            chunk_overlap=100,
         )
-        all_splits.extend(splits)
-    
-    print(f"Created {len(all_splits)} chunks from {len(articles)} articles in {Path(xml_path).name}")
-    return all_splits
-
-def create_unified_embeddings(xml_dir: str, save_path: str) -> None:
-    """Create and save a single FAISS index for all XML files."""
-    # Initialize embeddings with sentence-transformers, using GPU if available
-    embeddings = HuggingFaceEmbeddings(
-        model_name="all-MiniLM-L6-v2",
-        model_kwargs={'device': 'cuda' if torch.cuda.is_available() else 'cpu'}
-    )
-    all_splits = []
-    
-    # Process each XML file
-    xml_files = [f for f in os.listdir(xml_dir) if 'xml' in f.lower()]
+    return _text_splitter
+
+def process_pages(pages: list[tuple[str, str]]) -> list[Optional[tuple[str, list[Document]]]]:
+    """
+    Clean, hash and split a group of raw pages.
+    Runs in the worker processes; returns the content hash and chunks of each
+    page, or None for skipped pages, in the same order as the pages.
+    """
+    results = []
+    for title, text in pages:
+        try:
+            article = prepare_article(title, text)
+        except Exception as e:
+            print(f"Error processing article: {str(e)}")
+            article = None
+
+        if article is None:
+            results.append(None)
+            continue
+        content_hash = article_hash(article)
+        results.append((content_hash, split_article(article, _get_text_splitter(), content_hash)))
+    return results
+
+def iter_batches(items: Iterable[T], batch_size: int) -> Iterator[list[T]]:
+    """Group a stream of items into lists of at most batch_size."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def ordered_pool_map(pool: Pool, func: Callable[[T], R], items: Iterable[T], window: int) -> Iterator[R]:
+    """
+    Like Pool.imap, but with at most `window` tasks in flight.
+    Pool.imap consumes its whole input up front, which would load the entire
+    dump into the task queue; this keeps memory bounded. Results are yielded
+    in input order, so the output is the same for any number of workers.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(pool.apply_async(func, (item,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+class ThroughputReport:
+    """Track and periodically print articles/s and chunks/s of the index build."""
+
+    def __init__(self, interval: float = 10.0):
+        self.interval = interval
+        self.start = time.perf_counter()
+        self.last_report = self.start
+        self.pages = 0
+        self.articles = 0
+        self.chunks = 0
+
+    def update(self, pages: int = 0, articles: int = 0, chunks: int = 0) -> None:
+        self.pages += pages
+        self.articles += articles
+        self.chunks += chunks
+        now = time.perf_counter()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            print(self.summary())
+
+    def summary(self) -> str:
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return (f"{self.articles} articles ({self.articles / elapsed:.1f} articles/s), "
+                f"{self.chunks} chunks ({self.chunks / elapsed:.1f} chunks/s), "
+                f"{self.pages - self.articles} pages skipped, {elapsed:.1f}s elapsed")
+
+def iter_corpus_articles(xml_paths: list[str], workers: int = 1,
+                         report: Optional[ThroughputReport] = None) -> Iterator[tuple[str, list[Document]]]:
+    """
+    Stream the (content hash, chunks) of every article of all XML files, in
+    file and article order.
+    With workers > 1, cleaning and splitting fan out to a process pool. The
+    pages of all files feed a single ordered stream, so the pool stays busy
+    across file boundaries and the merged output is deterministic.
+    """
+    report = report or ThroughputReport()
+
+    def all_pages() -> Iterator[tuple[str, str]]:
+        for xml_path in xml_paths:
+            print(f"Reading {Path(xml_path).name}...")
+            yield from iter_pages(xml_path)
+
+    page_groups = iter_batches(all_pages(), PAGES_PER_TASK)
+
+    if workers > 1:
+        pool = Pool(workers)
+        results = ordered_pool_map(pool, process_pages, page_groups, window=workers * 4)
+    else:
+        pool = None
+        results = map(process_pages, page_groups)
+
+    try:
+        for group in results:
+            articles = [article for article in group if article is not None]
+            report.update(
+                pages=len(group),
+                articles=len(articles),
+                chunks=sum(len(chunks) for _, chunks in articles)
+            )
+            yield from articles
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+def recover_index_directory(save_path: str) -> None:
+    """Restore the previous index if a directory swap was interrupted."""
+    if not os.path.exists(save_path) and os.path.exists(f"{save_path}.old"):
+        os.rename(f"{save_path}.old", save_path)
+
+def replace_directory(tmp_path: str, save_path: str) -> None:
+    """
+    Swap a finished index directory in place of the previous one. The new
+    index is written next to the old one and swapped in by renaming
+    directories, so an interruption never leaves a half-written index.
+    """
+    if os.path.exists(save_path):
+        shutil.rmtree(f"{save_path}.old", ignore_errors=True)
+        os.rename(save_path, f"{save_path}.old")
+    os.rename(tmp_path, save_path)
+    shutil.rmtree(f"{save_path}.old", ignore_errors=True)
+
+def get_xml_paths(xml_dir: str) -> list[str]:
+    xml_files = sorted(f for f in os.listdir(xml_dir) if 'xml' in f.lower())
     print(f"\nFound {len(xml_files)} XML files to process")
-    
-    for file in xml_files:
-        xml_path = os.path.join(xml_dir, file)
-        splits = process_xml_file(xml_path)
-        all_splits.extend(splits)
-    
-    if not all_splits:
-        raise ValueError("No valid articles found in any XML files. Cannot create embeddings.")
-    
-    print(f"\nTotal chunks across all files: {len(all_splits)}")
-    
-    # Create unified vector store with progress tracking
+    return [os.path.join(xml_dir, file) for file in xml_files]
+
+def create_unified_embeddings(xml_dir: str, save_path: str, batch_size: int = 1024, workers: int = 1,
+                              index_meta: Optional[dict] = None) -> None:
+    """
+    Create and save a single FAISS index for all XML files.
+    Articles are streamed through cleaning, splitting and embedding, and the
+    chunks are encoded in batches of batch_size straight into the vectors
+    file of the new index directory. With workers > 1, cleaning and splitting
+    run on a process pool. index_meta selects the FAISS index type and its
+    parameters; see utils.faiss_index. The manifest of the indexed articles,
+    used by later incremental updates, is stored in the index's docstore,
+    together with the BM25 keyword index of the same chunks.
+    """
+    # Imported here so pool workers, which re-import this module on platforms
+    # that spawn processes, don't load the embedding model
+    from utils.embeddings import embeddings
+    from utils.index_store import IndexWriter
+    from corpus.index_builder import IndexBuilder
+    from corpus.manifest import IndexManifest
+
+    xml_paths = get_xml_paths(xml_dir)
+
+    # The new index is built next to the current one, which keeps serving
+    tmp_path = f"{save_path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    writer = IndexWriter(tmp_path, index_meta)
+    manifest = IndexManifest(writer.connection)
+    run = manifest.start_run()
+
     print("\nCreating FAISS index...")
-    total_chunks = len(all_splits)
-    batch_size = 100  # Process in batches to show progress
-    vector_store = None
-    
-    for i in range(0, total_chunks, batch_size):
-        batch = all_splits[i:i + batch_size]
-        print(f"Processing embeddings batch {i//batch_size + 1}/{(total_chunks + batch_size - 1)//batch_size} ({i}/{total_chunks} documents)")
-        
-        # Create or extend the vector store
-        if vector_store is None:
-            vector_store = FAISS.from_documents(batch, embeddings)
-        else:
-            batch_vectorstore = FAISS.from_documents(batch, embeddings)
-            vector_store.merge_from(batch_vectorstore)
-    
-    # Create save directory if it doesn't exist
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    
-    # Save vector store
-    vector_store.save_local(save_path)
+    report = ThroughputReport()
+    builder = IndexBuilder(embeddings, writer, batch_size=batch_size)
+    for content_hash, chunks in iter_corpus_articles(xml_paths, workers=workers, report=report):
+        manifest.record(chunks[0].metadata["title"], content_hash, [chunk.id for chunk in chunks], run)
+        builder.add_documents(chunks)
+
+    builder.build()  # Raises ValueError if no valid articles were found
+    manifest.finish_run(run)
+    print(f"Indexed {writer.build_title_index()} titles for approximate title matching")
+    writer.optimize_sparse_index()
+    print("Optimized the BM25 keyword index")
+    writer.close()
+
+    print(f"\nTotal chunks across all files: {builder.count}")
+    print(f"Throughput: {report.summary()}")
+
+    replace_directory(tmp_path, save_path)
     print(f"\nSaved unified embeddings to {save_path}")
 
+def update_unified_embeddings(xml_dir: str, save_path: str, batch_size: int = 1024, workers: int = 1,
+                              checkpoint_every: int = 50000,
+                              compact_deleted_share: Optional[float] = COMPACT_DELETED_SHARE) -> None:
+    """
+    Incrementally update the unified FAISS index from the XML files, in place.
+    Only new or changed articles (by content hash) are embedded, and the
+    chunks of changed and deleted articles are removed. Changes are committed
+    every checkpoint_every embedded chunks; an interrupted update resumes from
+    its last checkpoint when run again. Once more than compact_deleted_share
+    of the positions are deleted, the index is compacted (None: never).
+    """
+    from utils.embeddings import embeddings
+    from utils.index_store import IndexWriter, is_index_store
+    from corpus.manifest import IndexManifest
+
+    recover_index_directory(save_path)
+    if not is_index_store(save_path):
+        print("No existing index with a manifest found. Running a full build...")
+        create_unified_embeddings(xml_dir, save_path, batch_size=batch_size, workers=workers)
+        return
+
+    xml_paths = get_xml_paths(xml_dir)
+    writer = IndexWriter(save_path)
+    manifest = IndexManifest(writer.connection)
+    run = manifest.start_run()
+
+    report = ThroughputReport()
+    pending_chunks: list[Document] = []
+    pending_deletes: list[str] = []
+    seen_titles: list[str] = []
+    stats = {"unchanged": 0, "changed": 0, "new": 0, "deleted": 0, "embedded": 0}
+    since_checkpoint = 0
+
+    def apply_pending() -> None:
+        """Embed the pending chunks and append them to the index."""
+        # Chunk ids are derived from the article's content hash, so a chunk that
+        # is already stored (e.g. added before an interruption) is unchanged
+        existing = writer.existing_ids([chunk.id for chunk in pending_chunks])
+        new_chunks = [chunk for chunk in pending_chunks if chunk.id not in existing]
+        if new_chunks:
+            vectors = embeddings.encode_documents([chunk.page_content for chunk in new_chunks])
+            writer.add(new_chunks, vectors)
+            stats["embedded"] += len(new_chunks)
+        pending_chunks.clear()
+
+    def checkpoint() -> None:
+        """Remove replaced chunks and commit them with the manifest entries."""
+        apply_pending()
+        # New chunks of a changed article have new ids, so deleting the old
+        # ones never removes a chunk that is still current
+        writer.delete(set(pending_deletes))
+        pending_deletes.clear()
+        manifest.mark_seen(seen_titles, run)
+        seen_titles.clear()
+        writer.commit()
+        print(f"Checkpoint saved: {stats}")
+
+    for content_hash, chunks in iter_corpus_articles(xml_paths, workers=workers, report=report):
+        title = chunks[0].metadata["title"]
+        previous = manifest.get(title)
+
+        if previous is not None and previous[0] == content_hash:
+            stats["unchanged"] += 1
+            seen_titles.append(title)
+            continue
+
+        if previous is not None:
+            stats["changed"] += 1
+            pending_deletes.extend(previous[1])
+        else:
+            stats["new"] += 1
+        manifest.record(title, content_hash, [chunk.id for chunk in chunks], run)
+        pending_chunks.extend(chunks)
+        since_checkpoint += len(chunks)
+
+        if len(pending_chunks) >= batch_size:
+            apply_pending()
+        if since_checkpoint >= checkpoint_every:
+            checkpoint()
+            since_checkpoint = 0
+
+    # Articles that are no longer in the dump
+    manifest.mark_seen(seen_titles, run)
+    seen_titles.clear()
+    stale = manifest.stale_articles(run)
+    for title, chunk_ids in stale:
+        pending_deletes.extend(chunk_ids)
+    stats["deleted"] = len(stale)
+    manifest.remove(title for title, _ in stale)
+
+    checkpoint()
+    manifest.finish_run(run)
+    print(f"Indexed {writer.build_title_index()} titles for approximate title matching")
+    writer.optimize_sparse_index()
+    print("Optimized the BM25 keyword index")
+    writer.close()
+
+    print(f"Throughput: {report.summary()}")
+    print(f"\nUpdated unified embeddings in {save_path}: {stats}")
+
+    deleted = writer.meta.get("deleted", 0)
+    if compact_deleted_share is not None and deleted > writer.ntotal * compact_deleted_share:
+        compact_unified_embeddings(save_path)
+
+def compact_unified_embeddings(save_path: str, batch_size: int = 65536) -> None:
+    """
+    Rewrite the index without its deleted positions. The live chunks are
+    copied in position order with their stored vectors (nothing is
+    re-embedded), the approximate index is rebuilt from them, and the
+    manifest is carried over. The compacted index is built next to the
+    current one and swapped in like a full build.
+    """
+    from utils.index_store import DOCSTORE_FILE, IndexReader, IndexWriter
+    from corpus.manifest import IndexManifest
+
+    recover_index_directory(save_path)
+    reader = IndexReader(save_path)
+    deleted = reader.meta.get("deleted", 0)
+    print(f"\nCompacting the index: {deleted} of {reader.ntotal} positions are deleted")
+
+    tmp_path = f"{save_path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    writer = IndexWriter(tmp_path, make_index_meta(**{key: reader.meta[key] for key in DEFAULT_INDEX_META}))
+    IndexManifest(writer.connection)
+
+    documents, positions = [], []
+    for position, document in reader.iter_documents():
+        documents.append(document)
+        positions.append(position)
+        if len(documents) == batch_size:
+            writer.add(documents, reader.vectors[positions])
+            documents, positions = [], []
+    if documents:
+        writer.add(documents, reader.vectors[positions])
+    writer.build_index()
+
+    writer.connection.commit()
+    writer.connection.execute("ATTACH DATABASE ? AS previous", (os.path.join(save_path, DOCSTORE_FILE),))
+    writer.connection.execute("INSERT INTO articles SELECT * FROM previous.articles")
+    writer.connection.execute("INSERT INTO state SELECT * FROM previous.state")
+    writer.connection.commit()
+    writer.connection.execute("DETACH DATABASE previous")
+    writer.commit()
+    print(f"Indexed {writer.build_title_index()} titles for approximate title matching")
+    writer.optimize_sparse_index()
+    writer.close()
+
+    replace_directory(tmp_path, save_path)
+    print(f"Compacted {save_path} to {writer.ntotal} positions")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Create the unified FAISS index from Wikipedia XML dumps")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes used to clean and split articles (default: 1, no pool)")
+    parser.add_argument("--batch-size", type=int, default=1024,
+                        help="Chunks encoded per batch (default: 1024)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only embed new or changed articles and remove deleted ones; resumes interrupted updates")
+    parser.add_argument("--checkpoint-every", type=int, default=50000,
+                        help="Chunks embedded between checkpoints of an incremental update (default: 50000)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Rewrite the index without the positions of deleted chunks, then exit")
+    parser.add_argument("--compact-deleted-share", type=float, default=COMPACT_DELETED_SHARE,
+                        help="Deleted share of the positions above which an incremental update compacts "
+                             f"the index (default: {COMPACT_DELETED_SHARE})")
+
+    index = parser.add_argument_group("index type", "FAISS index variant built by a full build")
+    index.add_argument("--index-type", choices=INDEX_TYPES, default="flat",
+                       help="flat (exact), ivf-flat, hnsw or ivf-pq (default: flat)")
+    index.add_argument("--nlist", type=int, help="IVF clusters (default: 4 * sqrt(number of chunks))")
+    index.add_argument("--nprobe", type=int, help="IVF clusters visited per query (default: 16)")
+    index.add_argument("--hnsw-m", type=int, help="HNSW neighbors per node (default: 32)")
+    index.add_argument("--ef-construction", type=int, help="HNSW build candidate list size (default: 200)")
+    index.add_argument("--ef-search", type=int, help="HNSW search candidate list size (default: 64)")
+    index.add_argument("--pq-m", type=int, help="PQ sub-quantizers, the code size in bytes (default: 48)")
+    index.add_argument("--pq-bits", type=int, help="PQ bits per sub-quantizer (default: 8)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
+
     # Get the absolute path to the corpus directory
     corpus_dir = os.path.dirname(os.path.abspath(__file__))
     unzipped_dir = os.path.join(corpus_dir, "unzipped")
     embeddings_dir = os.path.join(corpus_dir, "embeddings", "unified_index")
-    
+
     # Create and save embeddings
-    create_unified_embeddings(unzipped_dir, embeddings_dir)
+    if args.compact:
+        compact_unified_embeddings(embeddings_dir)
+    elif args.incremental:
+        update_unified_embeddings(
+            unzipped_dir,
+            embeddings_dir,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            checkpoint_every=args.checkpoint_every,
+            compact_deleted_share=args.compact_deleted_share
+        )
+    else:
+        create_unified_embeddings(
+            unzipped_dir,
+            embeddings_dir,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            index_meta=make_index_meta(
+                index_type=args.index_type,
+                nlist=args.nlist,
+                nprobe=args.nprobe,
+                hnsw_m=args.hnsw_m,
+                ef_construction=args.ef_construction,
+                ef_search=args.ef_search,
+                pq_m=args.pq_m,
+                pq_bits=args.pq_bits
+            )
+        )
@@ -0,0 +1,102 @@
+# IndexBuilder: Single-pass FAISS index construction
+# Encodes document chunks in large batches straight into float32 matrices and
+# appends them to an IndexWriter, instead of building a vector store per batch
+# and merging it into the previous one (which copies the docstore and the
+# index-to-id map on every merge)
+# Vectors go straight to the memory-mapped vectors file of the index directory,
+# so memory use doesn't grow with the corpus; approximate indexes are built
+# from that file once all chunks are encoded (IVF quantizers are trained on a
+# sample of all the vectors before any is added)
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from utils.index_store import IndexWriter
+from typing import Iterable
+import numpy as np
+import time
+import uuid
+
+class IndexBuilder:
+    """Build the unified index from a stream of document chunks.
+    Args:
+        embeddings: Embedding model; encode_documents is used when available
+        writer: IndexWriter of the (new) index directory
+        batch_size: Number of chunks encoded per batch
+        report_interval: Seconds between progress reports
+    """
+
+    def __init__(self, embeddings: Embeddings, writer: IndexWriter, batch_size: int = 1024,
+                 report_interval: float = 10.0):
+        self._embeddings = embeddings
+        self._writer = writer
+        self.batch_size = batch_size
+        self.index_meta = writer.meta
+        self._pending: list[Document] = []
+        self._pending_ids: set[str] = set()
+        self.count = 0
+
+        self._report_interval = report_interval
+        self._start = time.perf_counter()
+        self._last_report = self._start
+        self._encode_seconds = 0.0
+
+    def add_documents(self, documents: Iterable[Document]) -> None:
+        """Queue documents, encoding and storing every full batch.
+        Documents keep their id when they have one; a document whose id was
+        already added is skipped."""
+        for document in documents:
+            if document.id is None:
+                document.id = str(uuid.uuid4())
+            elif document.id in self._pending_ids:
+                continue
+            self._pending_ids.add(document.id)
+            self._pending.append(document)
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        start = time.perf_counter()
+        if hasattr(self._embeddings, "encode_documents"):
+            vectors = self._embeddings.encode_documents(texts, batch_size=min(len(texts), 256))
+        else:
+            vectors = np.asarray(self._embeddings.embed_documents(texts), dtype=np.float32)
+        self._encode_seconds += time.perf_counter() - start
+        return vectors
+
+    def _flush(self) -> None:
+        """Encode the pending documents and append them to the writer."""
+        if not self._pending:
+            return
+        documents, self._pending = self._pending, []
+        self._pending_ids.clear()
+
+        existing = self._writer.existing_ids([document.id for document in documents])
+        documents = [document for document in documents if document.id not in existing]
+        if not documents:
+            return
+
+        vectors = self._encode([document.page_content for document in documents])
+        self._writer.add(documents, vectors)
+        self.count += len(documents)
+
+        now = time.perf_counter()
+        if now - self._last_report >= self._report_interval:
+            self._last_report = now
+            print(self.summary())
+
+    def summary(self) -> str:
+        """Return a progress/throughput line for the build."""
+        elapsed = max(time.perf_counter() - self._start, 1e-9)
+        encode_rate = self.count / self._encode_seconds if self._encode_seconds else 0.0
+        return (f"Embedded {self.count} chunks in {elapsed:.1f}s "
+                f"({self.count / elapsed:.1f} chunks/s overall, {encode_rate:.1f} chunks/s encoding)")
+
+    def build(self) -> None:
+        """Encode the remaining documents, build the approximate index and commit."""
+        self._flush()
+        if self._writer.ntotal == 0:
+            raise ValueError("No documents were added. Cannot create embeddings.")
+
+        self._writer.build_index()
+        self._writer.commit()
+        print(self.summary())
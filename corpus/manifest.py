@@ -0,0 +1,84 @@
+# IndexManifest: Sidecar manifest of the articles in the unified index
+# Records a content hash and the chunk ids of every indexed article in SQLite,
+# so incremental builds only re-embed new or changed articles and can remove
+# the vectors of deleted ones
+# Tracks the build run that last saw each article, which lets an interrupted
+# build resume where its last checkpoint left off
+# The tables live in the index's docstore.sqlite and share the IndexWriter's
+# connection, so manifest entries are committed together with the chunks
+
+from typing import Iterable, Optional
+import json
+import sqlite3
+
+class IndexManifest:
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                title TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                chunk_ids TEXT NOT NULL,
+                seen_run INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+
+    def _get_state(self, key: str) -> Optional[str]:
+        row = self._connection.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str) -> None:
+        self._connection.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+
+    def start_run(self) -> int:
+        """Return the id of the unfinished run to resume, or start a new one."""
+        active_run = self._get_state("active_run")
+        if active_run is not None:
+            print(f"Resuming interrupted build run {active_run}")
+            return int(active_run)
+
+        run = int(self._get_state("last_run") or 0) + 1
+        self._set_state("active_run", str(run))
+        self._connection.commit()
+        return run
+
+    def finish_run(self, run: int) -> None:
+        """Mark a run as complete."""
+        self._connection.execute("DELETE FROM state WHERE key = 'active_run'")
+        self._set_state("last_run", str(run))
+        self._connection.commit()
+
+    def get(self, title: str) -> Optional[tuple[str, list[str]]]:
+        """Return the content hash and chunk ids recorded for an article."""
+        row = self._connection.execute(
+            "SELECT content_hash, chunk_ids FROM articles WHERE title = ?", (title,)
+        ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def record(self, title: str, content_hash: str, chunk_ids: list[str], run: int) -> None:
+        """Record an (re)indexed article. Takes effect on the writer's next commit."""
+        self._connection.execute(
+            "INSERT OR REPLACE INTO articles (title, content_hash, chunk_ids, seen_run) VALUES (?, ?, ?, ?)",
+            (title, content_hash, json.dumps(chunk_ids), run)
+        )
+
+    def mark_seen(self, titles: Iterable[str], run: int) -> None:
+        """Mark unchanged articles as present in the current run."""
+        self._connection.executemany(
+            "UPDATE articles SET seen_run = ? WHERE title = ?",
+            ((run, title) for title in titles)
+        )
+
+    def stale_articles(self, run: int) -> list[tuple[str, list[str]]]:
+        """Return the articles (title, chunk ids) not seen during the run."""
+        rows = self._connection.execute(
+            "SELECT title, chunk_ids FROM articles WHERE seen_run != ?", (run,)
+        ).fetchall()
+        return [(title, json.loads(chunk_ids)) for title, chunk_ids in rows]
+
+    def remove(self, titles: Iterable[str]) -> None:
+        self._connection.executemany("DELETE FROM articles WHERE title = ?", ((title,) for title in titles))
@@ -11,3 +11,10 @@ fact_checker_crew = Crew(
     verbose=True,  # To get detailed output of the crew's work
 )
 
+
+def create_fact_checker_crew() -> Crew:
+    """Create an isolated copy of the fact checker crew for a single flow run.
+    Agents and tasks are cloned so concurrent runs don't overwrite each other's
+    task outputs, while the LLMs and tools (and the embedding model and FAISS
+    index behind them) stay shared."""
+    return fact_checker_crew.copy()
@@ -8,3 +8,8 @@ generic_translation_crew = Crew(
     tasks=[translation_task_pure],
     verbose=True,  # To get detailed output of the crew's work
 )
+
+
+def create_generic_translation_crew() -> Crew:
+    """Create a per-request copy of the generic translation crew."""
+    return generic_translation_crew.copy()
@@ -1,6 +1,6 @@
 from crewai import Crew
 from agents.input_analyser_agent import input_analyzer_agent
-from tasks.input_analysis_task import input_analysis_task
+from tasks.input_analysis_task import input_analysis_task, batch_input_analysis_task
 
 
 # Create fact checker crew
@@ -10,3 +10,21 @@ input_analyzer_crew = Crew(
     verbose=True,  # To get detailed output of the crew's work
 )
 
+
+def create_input_analyzer_crew() -> Crew:
+    """Create a per-run copy of the input analyzer crew, so its task output
+    belongs to a single flow."""
+    return input_analyzer_crew.copy()
+
+
+# Create batch input analyzer crew (several inputs per LLM call)
+batch_input_analyzer_crew = Crew(
+    agents=[input_analyzer_agent],
+    tasks=[batch_input_analysis_task],
+    verbose=True,
+)
+
+
+def create_batch_input_analyzer_crew() -> Crew:
+    """Create a per-run copy of the batch input analyzer crew."""
+    return batch_input_analyzer_crew.copy()
@@ -11,3 +11,8 @@ internet_fact_checker_crew = Crew(
     verbose=True,  # To get detailed output of the crew's work
 )
 
+
+def create_internet_fact_checker_crew() -> Crew:
+    """Create an isolated copy of the internet fact checker crew for one flow
+    run. The search and scrape tools are shared with the template crew."""
+    return internet_fact_checker_crew.copy()
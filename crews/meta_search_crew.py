@@ -1,13 +1,31 @@
 from crewai import Crew
 from agents.meta_searcher_agent import meta_searcher
 from agents.summarizer_agent import summarizer
-from agents.translator_agent import translator
 from tasks.metadata_search_task import meta_search_task
 from tasks.summarize_task import summarize_task
 
-# Create meta search crew
+# Create meta search crew (retrieves the fragments of an article)
 meta_search_crew = Crew(
-    agents=[meta_searcher, summarizer],
-    tasks=[meta_search_task, summarize_task],
+    agents=[meta_searcher],
+    tasks=[meta_search_task],
     verbose=True  # To get detailed output of the crew's work
 )
+
+# Create summarize crew; it receives the fragments once they have been
+# reduced, so it runs separately from the meta search crew
+summarize_crew = Crew(
+    agents=[summarizer],
+    tasks=[summarize_task],
+    verbose=True
+)
+
+
+def create_meta_search_crew() -> Crew:
+    """Create an isolated copy of the meta search crew for one flow run.
+    The metadata search tool (and its title index) is shared, not rebuilt."""
+    return meta_search_crew.copy()
+
+
+def create_summarize_crew() -> Crew:
+    """Create a per-run copy of the summarize crew."""
+    return summarize_crew.copy()
@@ -8,3 +8,8 @@ translation_crew = Crew(
     tasks=[translate_fact_verification_task],
     verbose=True,  # To get detailed output of the crew's work
 )
+
+
+def create_translation_crew() -> Crew:
+    """Create a per-run copy of the translation crew."""
+    return translation_crew.copy()
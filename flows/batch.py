@@ -0,0 +1,244 @@
+# Bulk fact-checking of many claims with the Wikipedia fact checker flow
+# Used by the /api/fact-check/batch endpoint and as a command line tool:
+#   python -m flows.batch claims.jsonl -o results.jsonl --concurrency 8
+# Each input line is a JSON string or an object with a "statement" (and an
+# optional "id"). Claims are processed as follows:
+# 1. Claims already in the result cache are answered right away
+# 2. The rest are analyzed in groups: short English claims locally, the
+#    others several claims per LLM call; the texts retrieval will search for
+#    are embedded in one batch per group
+# 3. A bounded pool runs one FactCheckerFlow per claim with its analysis
+# 4. Results are written as they complete; rerunning with the same output
+#    file skips the claims it already holds
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from crews.input_analyzer_crew import create_batch_input_analyzer_crew
+from dotenv import load_dotenv
+from flows.fact_checker_flow import FactCheckerFlow, fact_check_result, result_cache_key
+from typing import Any, Callable, Iterable, Iterator, Optional
+from utils.embeddings import embeddings
+from utils.fast_analysis import fast_analysis_stats, try_fast_analysis
+from utils.result_cache import ResultCache, create_result_cache
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+def analyze_claims(statements: list[str]) -> list[Optional[dict]]:
+    """Analyze several claims: short English claims locally, the rest with
+    one LLM call. Each LLM analysis is matched to its claim by the index it
+    was given and must repeat that claim as its original request; claims
+    without such an analysis get None, and are analyzed by their own flow."""
+    analyses = [try_fast_analysis(statement) for statement in statements]
+    remaining = [i for i, analysis in enumerate(analyses) if analysis is None]
+    if len(remaining) < 2:
+        return analyses
+
+    start = time.perf_counter()
+    try:
+        output = create_batch_input_analyzer_crew().kickoff(inputs={
+            "user_inputs": json.dumps([{"index": position, "input": statements[i]}
+                                       for position, i in enumerate(remaining)], ensure_ascii=False),
+        }).to_dict()
+        llm_analyses = output.get("analyses") or []
+    except Exception as e:
+        print(f"Batch input analysis failed, analyzing claims one by one: {e}")
+        return analyses
+    elapsed = time.perf_counter() - start
+
+    # An index answered twice is ambiguous, so neither answer is used
+    by_index: dict[int, Optional[dict]] = {}
+    for analysis in llm_analyses:
+        index = analysis.get("index")
+        by_index[index] = None if index in by_index else analysis
+
+    matched = 0
+    for position, i in enumerate(remaining):
+        analysis = by_index.get(position)
+        if (analysis is not None and analysis.get("request_in_english")
+                and ResultCache.normalize(analysis.get("original_request") or "") == ResultCache.normalize(statements[i])):
+            analyses[i] = {key: value for key, value in analysis.items() if key != "index"}
+            matched += 1
+            fast_analysis_stats.record_llm(elapsed / len(remaining))
+    if matched < len(remaining):
+        print(f"Batch input analysis matched {matched} of {len(remaining)} claims, analyzing the others one by one")
+    return analyses
+
+def prefetch_embeddings(analyses: list[Optional[dict]]) -> None:
+    """Embed the request, facts and questions of all analyses in one batch, so
+    the flows' retrieval finds them in the embedding cache."""
+    texts = []
+    for analysis in analyses:
+        if analysis is not None:
+            texts += [analysis["request_in_english"],
+                      *analysis.get("verification_facts", []),
+                      *analysis.get("possible_questions", [])]
+    if texts:
+        embeddings.embed_queries(texts)
+
+class BatchFactChecker:
+    """Fact-checks many claims concurrently.
+    Args:
+        concurrency: Flows running at the same time
+        analysis_batch_size: Claims analyzed per LLM call (1 disables batching)
+        result_cache: Cache consulted before and filled after each claim
+    """
+
+    def __init__(self, concurrency: int = 4, analysis_batch_size: int = 8,
+                 result_cache: Optional[ResultCache] = None):
+        self.concurrency = max(1, concurrency)
+        self.analysis_batch_size = max(1, analysis_batch_size)
+        self.result_cache = result_cache
+
+    def check(self, statement: str, input_analysis: Optional[dict] = None) -> dict:
+        """Fact-check one claim, reusing its analysis when given."""
+        flow = FactCheckerFlow(user_input=statement, input_analysis=input_analysis)
+        result = fact_check_result(flow.kickoff())
+        if self.result_cache is not None:
+            self.result_cache.put(result_cache_key(statement), result)
+        return result
+
+    def _groups(self, claims: Iterable[tuple[Any, str]],
+                on_result: Callable[[dict], None]) -> Iterator[list[tuple[Any, str]]]:
+        """Answer cached claims and group the others for batch analysis."""
+        group = []
+        for claim_id, statement in claims:
+            cached = self.result_cache.get(result_cache_key(statement)) if self.result_cache is not None else None
+            if cached is not None:
+                on_result({"id": claim_id, "statement": statement, "result": cached, "cached": True, "seconds": 0.0})
+                continue
+            group.append((claim_id, statement))
+            if len(group) == self.analysis_batch_size:
+                yield group
+                group = []
+        if group:
+            yield group
+
+    def run(self, claims: Iterable[tuple[Any, str]], on_result: Callable[[dict], None]) -> dict:
+        """Fact-check (id, statement) pairs, calling on_result with a record
+        for each claim as soon as it finishes. Returns summary counters."""
+        counts = {"claims": 0, "cached": 0, "failed": 0}
+        lock = threading.Lock()
+        start = time.perf_counter()
+
+        def report(record: dict) -> None:
+            with lock:
+                counts["claims"] += 1
+                counts["cached"] += bool(record.get("cached"))
+                counts["failed"] += "error" in record
+                on_result(record)
+
+        def check(claim_id: Any, statement: str, analysis: Optional[dict]) -> None:
+            claim_start = time.perf_counter()
+            try:
+                result = self.check(statement, analysis)
+            except Exception as e:
+                print(f"Fact check of claim {claim_id} failed: {e}")
+                report({"id": claim_id, "statement": statement, "error": str(e),
+                        "seconds": time.perf_counter() - claim_start})
+                return
+            report({"id": claim_id, "statement": statement, "result": result,
+                    "seconds": time.perf_counter() - claim_start})
+
+        pending: set[Future] = set()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch") as executor:
+            for group in self._groups(claims, report):
+                # Analyze ahead only while the pool has work for about one more group
+                while len(pending) >= self.concurrency + self.analysis_batch_size:
+                    _, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                statements = [statement for _, statement in group]
+                analyses = analyze_claims(statements)
+                prefetch_embeddings(analyses)
+                for (claim_id, statement), analysis in zip(group, analyses):
+                    pending.add(executor.submit(check, claim_id, statement, analysis))
+            wait(pending)
+
+        counts["seconds"] = time.perf_counter() - start
+        counts["claims_per_second"] = counts["claims"] / counts["seconds"] if counts["seconds"] else 0.0
+        return counts
+
+def create_batch_fact_checker(result_cache: Optional[ResultCache] = None) -> BatchFactChecker:
+    """Create a batch fact checker configured from BATCH_CONCURRENCY and
+    BATCH_ANALYSIS_SIZE."""
+    return BatchFactChecker(
+        concurrency=int(os.getenv("BATCH_CONCURRENCY", "4")),
+        analysis_batch_size=int(os.getenv("BATCH_ANALYSIS_SIZE", "8")),
+        result_cache=result_cache
+    )
+
+def parse_claim(item: Any, default_id: Any) -> tuple[Any, str]:
+    """Read a claim given as a string or as {"id": ..., "statement": ...}."""
+    if isinstance(item, str):
+        return default_id, item
+    if isinstance(item, dict) and isinstance(item.get("statement"), str):
+        return item.get("id", default_id), item["statement"]
+    raise ValueError(f"Claim {default_id} must be a string or an object with a 'statement'")
+
+def read_claims(path: str) -> Iterator[tuple[Any, str]]:
+    """Read the claims of a JSONL file; ids default to the line number."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                yield parse_claim(json.loads(line), line_number)
+
+def completed_ids(path: str) -> set[str]:
+    """Ids of the claims with a result in an output file, which a resumed run
+    skips. A line left incomplete by an interrupted run is removed."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+
+    done = set()
+    for line in data.decode("utf-8").splitlines():
+        if line.strip():
+            record = json.loads(line)
+            if "result" in record:
+                done.add(str(record["id"]))
+    return done
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description='Fact-check the claims of a JSONL file against the Wikipedia index')
+    parser.add_argument('input', help='JSONL file with one claim per line')
+    parser.add_argument('-o', '--output', help='JSONL file for the results (default: <input>.results.jsonl)')
+    parser.add_argument('--concurrency', type=int, default=int(os.getenv("BATCH_CONCURRENCY", "4")),
+                        help='Claims fact-checked at the same time')
+    parser.add_argument('--analysis-batch-size', type=int, default=int(os.getenv("BATCH_ANALYSIS_SIZE", "8")),
+                        help='Claims analyzed per LLM call')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the fact-check result cache')
+    args = parser.parse_args()
+
+    output_path = args.output or f"{os.path.splitext(args.input)[0]}.results.jsonl"
+    done = completed_ids(output_path)
+    if done:
+        print(f"Resuming: {len(done)} claims already in {output_path}")
+    claims = ((claim_id, statement) for claim_id, statement in read_claims(args.input)
+              if str(claim_id) not in done)
+
+    checker = BatchFactChecker(
+        concurrency=args.concurrency,
+        analysis_batch_size=args.analysis_batch_size,
+        result_cache=None if args.no_cache else create_result_cache()
+    )
+    with open(output_path, "a", encoding="utf-8") as output:
+        def write(record: dict) -> None:
+            output.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            output.flush()
+            print(f"{'Failed' if 'error' in record else 'Checked'} claim {record['id']} ({record['seconds']:.1f}s)")
+
+        stats = checker.run(claims, write)
+
+    print(f"Checked {stats['claims']} claims in {stats['seconds']:.1f}s "
+          f"({stats['claims_per_second']:.2f} claims/s, {stats['cached']} from cache, {stats['failed']} failed)")
+    print(f"Results written to {output_path}")
+    return 1 if stats["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
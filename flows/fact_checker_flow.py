@@ -4,21 +4,48 @@
 # 2. Search Wikipedia and verify facts
 # 3. Calculate confidence based on semantic similarity
 # 4. Translate results back to original language if needed
+# Independent work overlaps with the steps: an English claim is searched as
+# written while the analyzer LLM runs (the analysis usually repeats it, and
+# the search tool reuses those hits), and cited titles are resolved while
+# the translation crew runs
 
-from langchain_huggingface import HuggingFaceEmbeddings
-from sklearn.metrics.pairwise import cosine_similarity
+from concurrent.futures import Future
 from crewai.flow.flow import Flow, listen, start
-from crews.input_analyzer_crew import input_analyzer_crew
-from crews.fact_checker_crew import fact_checker_crew
-from crews.translation_crew import translation_crew
+from crews.input_analyzer_crew import create_input_analyzer_crew
+from crews.fact_checker_crew import create_fact_checker_crew
+from crews.translation_crew import create_translation_crew
 from pydantic import BaseModel
-from typing import Any
+from typing import Any, Optional
 import json
+from utils.similarity import confidence_score
 from utils.embeddings import embeddings
+from utils.semantic_cache import create_semantic_cache
+from utils.jobs import ProgressCallback, overlap_executor, progress_step, step_timings
+from utils.fast_analysis import fast_analysis_stats, is_english, split_facts, try_fast_analysis
+import copy
+import os
 import torch
 import time
 
 from tasks.metadata_search_task import meta_search_tool
+from tools.search_manager import SearchManager
+from utils.result_cache import ResultCache
+from utils.summary_store import get_summary_store
+
+# Verdicts of recently checked claims, reused for near-duplicate claims
+claim_cache = create_semantic_cache(embeddings)
+
+def result_cache_key(statement: str) -> str:
+    """Result cache key of a statement, for the current index and model"""
+    return ResultCache.make_key(
+        'fact-check', statement, SearchManager().index_version, os.getenv("OPENAI_MODEL_NAME", "")
+    )
+
+def fact_check_result(state: Any) -> dict:
+    """Convert the final FactCheckerState to the API's response dictionary"""
+    result_dict = state.translation if hasattr(state, 'translation') else {}
+    result_dict['confidence_score'] = state.confidence_score if hasattr(state, 'confidence_score') else None
+    return result_dict
 
 class FactCheckerState(BaseModel):
     """State schema for fact checker flow.
@@ -36,26 +63,62 @@ class FactCheckerState(BaseModel):
     confidence_score: float = 0
 
 class FactCheckerFlow(Flow):
-    def __init__(self, user_input: str):
-        """Initialize fact checker flow with user's query"""
+    def __init__(self, user_input: str, progress: Optional[ProgressCallback] = None,
+                 input_analysis: Optional[dict[str, Any]] = None):
+        """Initialize fact checker flow with user's query
+        input_analysis: analysis already made for the query (e.g. by a batch
+        analysis), used instead of running the input analyzer"""
         super().__init__()
         assert isinstance(user_input, str)
         
         self.inputs = {"user_input": user_input}
         self._state = FactCheckerState()
+        self._progress = progress  # Receives (step, status, details) as steps start and finish
+        self._input_analysis = input_analysis
+        self._speculative_retrieval: Optional[Future] = None
 
     @start()
+    @progress_step
     def analyze_input(self):
         """Step 1: Analyze input text for language detection
         Also translates non-English queries to English"""
-        self._state.input_analyzer = input_analyzer_crew.kickoff(inputs=self.inputs).to_dict()
+        if self._input_analysis is not None:
+            self._state.input_analyzer = self._input_analysis
+            return
+        # Short English claims are analyzed locally, without the LLM round trip
+        analysis = try_fast_analysis(self.inputs["user_input"])
+        if analysis is not None:
+            self._state.input_analyzer = analysis
+            return
+
+        self._speculative_retrieval = self._start_speculative_retrieval()
+        start = time.perf_counter()
+        self._state.input_analyzer = create_input_analyzer_crew().kickoff(inputs=self.inputs).to_dict()
+        fast_analysis_stats.record_llm(time.perf_counter() - start)
 
     @listen(analyze_input)
+    @progress_step
     def check_facts(self):
         """Step 2: Perform fact checking using Wikipedia articles
         - Searches Wikipedia for relevant articles
         - Verifies claims against found articles
         - Extracts supporting evidence"""
+        # A paraphrase of a recently checked claim reuses its verdict; results
+        # are only reused for the same index and model
+        query_english = self._state.input_analyzer["request_in_english"]
+        cache_version = f"{SearchManager().index_version}:{os.getenv('OPENAI_MODEL_NAME', '')}"
+        cached = claim_cache.get(query_english, cache_version)
+        if cached is not None:
+            self._state.fact_checker = copy.deepcopy(cached["fact_checker"])
+            self._state.search_results = cached["search_results"]
+            self._state.confidence_score = cached["confidence_score"]
+            return
+
+        self._finish_speculative_retrieval()
+
+        # Each run gets its own crew copy, so reading the task outputs below is
+        # safe while other requests are being served concurrently
+        fact_checker_crew = create_fact_checker_crew()
         self._state.fact_checker = fact_checker_crew.kickoff(inputs={
             "user_input": json.dumps(self._state.input_analyzer),
         }).to_dict()
@@ -65,44 +128,86 @@ class FactCheckerFlow(Flow):
         print(self._state.search_results)
         
         # Calculate confidence score using semantic similarity
-        query_english = self._state.input_analyzer["request_in_english"]
-        query_embedding = embeddings.embed_query(query_english) 
-
+        # The query embedding is cached from the RAG search, and fragments quoting
+        # retrieved chunks reuse the vectors stored in the FAISS index
         fragments = fact_checker_crew.tasks[1].output.to_dict().get("fragments", None)
-        
-        # Handle case when no fragments are found
-        if not fragments:
-            self._state.confidence_score = 0.0
-            return
 
-        fragments_embeddings = embeddings.embed_documents(fragments) 
-        
-        similarities = cosine_similarity([query_embedding], fragments_embeddings)[0]
-
-        self._state.confidence_score = max(similarities) 
+        self._state.confidence_score = confidence_score(
+            query_english,
+            fragments or [],  # No fragments found means no confidence
+            vector_lookup=SearchManager().lookup_vectors
+        )
         print("confidence: ", self._state.confidence_score)
-        
+
+        claim_cache.put(query_english, {
+            "fact_checker": copy.deepcopy(self._state.fact_checker),
+            "search_results": self._state.search_results,
+            "confidence_score": self._state.confidence_score,
+        }, cache_version)
         
     @listen(check_facts)
+    @progress_step
     def translate_facts(self):
         """Step 3: Translate results back to original language if needed
         Also verifies source titles and marks them as verified/unverified
         to check if they are present in the database."""
+        source_verification = overlap_executor.submit(self._verify_sources)
         if (self._state.input_analyzer["original_language"].lower() == "en" or 
             self._state.input_analyzer["original_language"].lower() == "english"):
             self._state.translation = self._state.fact_checker
         else:
-            self._state.translation = translation_crew.kickoff(inputs={
+            self._state.translation = create_translation_crew().kickoff(inputs={
                 "fact_verifier_response": json.dumps(self._state.fact_checker),
                 "target_language": self._state.input_analyzer["original_language"],
                 }).to_dict()
 
-        # Process sources and mark their verification status
-        temp = {}
-        for source in self._state.fact_checker["sources"]:
-            temp[source] = {"name": source, "verified": meta_search_tool.verify_title(source), "internet": False}
+        wait_start = time.perf_counter()
+        temp, seconds = source_verification.result()
+        step_timings.record(type(self).__name__, "verify_sources", seconds)
+        step_timings.record_saved(type(self).__name__, "verify_sources", seconds - (time.perf_counter() - wait_start))
 
         self._state.translation["sources"] = temp
         self._state.fact_checker["sources"] = temp
         
-        return self._state
\ No newline at end of file
+        return self._state
+
+    def _start_speculative_retrieval(self) -> Optional[Future]:
+        """Search for an English claim and its sentences in the background"""
+        user_input = self.inputs["user_input"].strip()
+        if not is_english(user_input)[0]:
+            return None
+        queries = list(dict.fromkeys([user_input, *split_facts(user_input)]))
+
+        def search() -> float:
+            start = time.perf_counter()
+            SearchManager().prefetch(queries)
+            return time.perf_counter() - start
+        return overlap_executor.submit(search)
+
+    def _finish_speculative_retrieval(self) -> None:
+        """Wait for the speculative search, usually finished long before the
+        analysis, and record the time it kept off the critical path"""
+        if self._speculative_retrieval is None:
+            return
+        wait_start = time.perf_counter()
+        try:
+            seconds = self._speculative_retrieval.result()
+        except Exception as e:
+            print(f"Speculative retrieval failed: {e}")
+            return
+        finally:
+            self._speculative_retrieval = None
+        step_timings.record(type(self).__name__, "speculative_retrieval", seconds)
+        step_timings.record_saved(type(self).__name__, "speculative_retrieval", seconds - (time.perf_counter() - wait_start))
+
+    def _verify_sources(self) -> tuple[dict, float]:
+        """Mark the cited sources as verified/unverified, resolving cited titles
+        to the indexed article they refer to"""
+        start = time.perf_counter()
+        temp = {}
+        for source in self._state.fact_checker["sources"]:
+            title = meta_search_tool.resolve_title(source)
+            temp[source] = {"name": title or source, "verified": title is not None, "internet": False}
+        # Citation counts pick the articles whose summaries are pre-generated
+        get_summary_store().record_citations(sorted({entry["name"] for entry in temp.values() if entry["verified"]}))
+        return temp, time.perf_counter() - start
@@ -1,15 +1,26 @@
 # Flow for retrieving and summarizing source content
 # This flow handles:
 # 1. Retrieving source content (from Wikipedia)
-# 2. Summarizing the content
-# 3. Translating the summary to the requested language
+# 2. Reducing it locally to its most central, non-repeated sentences
+# 3. Summarizing the content
+# 4. Translating the summary to the requested language
+# summarize_source() serves stored summaries first (see utils/summary_store.py)
+# and stores the ones it generates
 
 from crewai import task
 from crewai.flow.flow import Flow, listen, start
 from pydantic import BaseModel
 
-from crews.meta_search_crew import meta_search_crew
-from crews.generic_translation_crew import generic_translation_crew
+from crews.meta_search_crew import create_meta_search_crew, create_summarize_crew
+from crews.generic_translation_crew import create_generic_translation_crew
+from utils.embeddings import embeddings
+from utils.extractive import reduce_text, reduction_stats
+from utils.jobs import progress_step
+from utils.summary_store import SummaryStore, normalize_language
+from tasks.metadata_search_task import meta_search_tool
+from tools.search_manager import SearchManager
+from typing import Optional
+import os
 
 class SummarizedSourceFlowState(BaseModel):
     """State schema for source summarization flow.
@@ -18,18 +29,22 @@ class SummarizedSourceFlowState(BaseModel):
     - target_language: Desired language for the summary
     - summary: Summarized content
     - translated_summary: Final translated summary
+    - reduction: Report of the extractive reduction of the article
     """
     source: str = ""
     target_language: str = ""
     summary: str = ""    
     translated_summary: str = ""
+    reduction: dict = {}
 
 class GetSummarizedSourceFlow(Flow):
-    def __init__(self, source: str, target_language: str):
+    def __init__(self, source: str, target_language: str, summary: Optional[str] = None):
         """Initialize source summarization flow
         Args:
             source: title of the source to summarize
             target_language: Language code for the desired summary translation
+            summary: English summary already available (e.g. stored), which
+                is only translated
         """
         super().__init__()
         assert isinstance(source, str)
@@ -38,20 +53,37 @@ class GetSummarizedSourceFlow(Flow):
         self._state = SummarizedSourceFlowState()
         self._state.source = source
         self._state.target_language = target_language
+        self._summary = summary
 
     @start()
+    @progress_step
     def get_summarized_source(self):
         """Step 1: Retrieve and summarize the source content
         - Retrieves the full content from the source
+        - Reduces it to a bounded number of tokens (SUMMARY_TOKEN_BUDGET)
         - Creates a concise summary highlighting key points
         - Maintains important context and facts"""
-        self._state.summary = meta_search_crew.kickoff(inputs={
+        if self._summary is not None:
+            self._state.summary = self._summary
+            return
+
+        fragments = create_meta_search_crew().kickoff(inputs={
             "article_title": self._state.source
         }).raw
 
-        print(meta_search_crew.tasks[0].output.raw)
+        fragments, self._state.reduction = reduce_text(
+            fragments, embeddings, token_budget=int(os.getenv("SUMMARY_TOKEN_BUDGET", "3000"))
+        )
+        reduction_stats.record(self._state.reduction)
+        print(f"Article reduced from {self._state.reduction['input_tokens']} to "
+              f"{self._state.reduction['output_tokens']} tokens in {self._state.reduction['seconds']:.2f}s")
+
+        self._state.summary = create_summarize_crew().kickoff(inputs={
+            "fragments": fragments
+        }).raw
 
     @listen(get_summarized_source)
+    @progress_step
     def translate_summary(self):
         """Step 2: Translate the summary to target language
         - Translates the summary while preserving meaning
@@ -62,9 +94,41 @@ class GetSummarizedSourceFlow(Flow):
             self._state.translated_summary = self._state.summary
         else:
             # Translate summary to target language
-            self._state.translated_summary = generic_translation_crew.kickoff(inputs={
+            self._state.translated_summary = create_generic_translation_crew().kickoff(inputs={
                 "content": self._state.summary,
                 "target_language": self._state.target_language
             }).raw
 
         return self._state
+
+def summary_version() -> str:
+    """Version of the stored summaries: the index and the model they come from"""
+    return f"{SearchManager().index_version}:{os.getenv('OPENAI_MODEL_NAME', '')}"
+
+def summarize_source(source: str, target_language: str, store: Optional[SummaryStore] = None) -> dict:
+    """Summary of a cited source in the target language. Stored summaries of
+    the article it resolves to are served directly; a stored English summary
+    is only translated; otherwise the flow runs and its summaries are stored."""
+    title = meta_search_tool.resolve_title(source)
+    if store is None or title is None:
+        result = GetSummarizedSourceFlow(source=source, target_language=target_language).kickoff()
+        return {"title": title, "summary": result.translated_summary, "reduction": result.reduction, "stored": False}
+
+    version = summary_version()
+    stored = store.get(title, target_language, version)
+    if stored is not None:
+        return {"title": title, **stored, "stored": True}
+
+    english = store.get(title, "english", version) if normalize_language(target_language) != "english" else None
+    result = GetSummarizedSourceFlow(
+        source=title,
+        target_language=target_language,
+        summary=english["summary"] if english else None
+    ).kickoff()
+
+    reduction = english["reduction"] if english else result.reduction
+    if english is None:
+        store.put(title, "english", version, result.summary, reduction)
+    if normalize_language(target_language) != "english":
+        store.put(title, target_language, version, result.translated_summary, reduction)
+    return {"title": title, "summary": result.translated_summary, "reduction": reduction, "stored": False}
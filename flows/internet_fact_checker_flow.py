@@ -5,16 +5,25 @@
 # 3. Calculate confidence based on semantic similarity
 # 4. Translate results back to original language if needed
 
-from langchain_huggingface import HuggingFaceEmbeddings
-from sklearn.metrics.pairwise import cosine_similarity
 from crewai.flow.flow import Flow, listen, start
-from crews.input_analyzer_crew import input_analyzer_crew
-from crews.internet_fact_checker_crew import internet_fact_checker_crew
-from crews.translation_crew import translation_crew
+from crews.input_analyzer_crew import create_input_analyzer_crew
+from crews.internet_fact_checker_crew import create_internet_fact_checker_crew
+from crews.translation_crew import create_translation_crew
 from pydantic import BaseModel
-from typing import Any
+from typing import Any, Optional
 import json
+from utils.similarity import confidence_score
 from utils.embeddings import embeddings
+from utils.semantic_cache import create_semantic_cache
+from utils.jobs import ProgressCallback, progress_step
+from utils.fast_analysis import fast_analysis_stats, try_fast_analysis
+import copy
+import os
+import time
+
+# Verdicts of recently checked claims, reused for near-duplicate claims
+# (separate from the Wikipedia flow's, whose verdicts cite other sources)
+claim_cache = create_semantic_cache(embeddings)
 
 class FactCheckerState(BaseModel):
     """State schema for internet fact checker flow.
@@ -32,26 +41,49 @@ class FactCheckerState(BaseModel):
     confidence_score: float = 0
 
 class InternetFactCheckerFlow(Flow):
-    def __init__(self, user_input: str):
+    def __init__(self, user_input: str, progress: Optional[ProgressCallback] = None):
         """Initialize internet fact checker flow with user's query"""
         super().__init__()
         assert isinstance(user_input, str)
         
         self.inputs = {"user_input": user_input}
         self._state = FactCheckerState()
+        self._progress = progress  # Receives (step, status, details) as steps start and finish
 
     @start()
+    @progress_step
     def analyze_input(self):
         """Step 1: Analyze input text for language detection
         Also translates non-English queries to English"""
-        self._state.input_analyzer = input_analyzer_crew.kickoff(inputs=self.inputs).to_dict()
+        # Short English claims are analyzed locally, without the LLM round trip
+        analysis = try_fast_analysis(self.inputs["user_input"])
+        if analysis is not None:
+            self._state.input_analyzer = analysis
+            return
+
+        start = time.perf_counter()
+        self._state.input_analyzer = create_input_analyzer_crew().kickoff(inputs=self.inputs).to_dict()
+        fast_analysis_stats.record_llm(time.perf_counter() - start)
 
     @listen(analyze_input)
+    @progress_step
     def check_facts(self):
         """Step 2: Perform fact checking using internet sources
         - Searches internet for relevant articles and sources
         - Verifies claims against found sources
         - Extracts supporting evidence"""
+        # A paraphrase of a recently checked claim reuses its verdict
+        query_english = self._state.input_analyzer["request_in_english"]
+        cache_version = os.getenv('OPENAI_MODEL_NAME', '')
+        cached = claim_cache.get(query_english, cache_version)
+        if cached is not None:
+            self._state.fact_checker = copy.deepcopy(cached["fact_checker"])
+            self._state.search_results = cached["search_results"]
+            self._state.confidence_score = cached["confidence_score"]
+            return
+
+        # Per-run crew copy: its task outputs are read back below
+        internet_fact_checker_crew = create_internet_fact_checker_crew()
         self._state.fact_checker = internet_fact_checker_crew.kickoff(inputs={
             "user_input": json.dumps(self._state.input_analyzer),
         }).to_dict()
@@ -61,25 +93,20 @@ class InternetFactCheckerFlow(Flow):
         print(self._state.search_results)
         
         # Calculate confidence score using semantic similarity
-        query_english = self._state.input_analyzer["request_in_english"]
-        query_embedding = embeddings.embed_query(query_english) 
-
         fragments = internet_fact_checker_crew.tasks[1].output.to_dict().get("fragments", None)
-        
-        # Handle case when no fragments are found
-        if not fragments:
-            self._state.confidence_score = 0.0
-            return
 
-        fragments_embeddings = embeddings.embed_documents(fragments) 
-        
-        similarities = cosine_similarity([query_embedding], fragments_embeddings)[0]
-
-        self._state.confidence_score = max(similarities) 
+        # No fragments found means no confidence
+        self._state.confidence_score = confidence_score(query_english, fragments or [])
         print("confidence: ", self._state.confidence_score)
-        ##
+
+        claim_cache.put(query_english, {
+            "fact_checker": copy.deepcopy(self._state.fact_checker),
+            "search_results": self._state.search_results,
+            "confidence_score": self._state.confidence_score,
+        }, cache_version)
 
     @listen(check_facts)
+    @progress_step
     def translate_facts(self):
         """Step 3: Translate results back to original language if needed
         Also verifies source URLs and marks them as internet sources"""
@@ -87,7 +114,7 @@ class InternetFactCheckerFlow(Flow):
             self._state.input_analyzer["original_language"].lower() == "english"):
             self._state.translation = self._state.fact_checker
         else:
-            self._state.translation = translation_crew.kickoff(inputs={
+            self._state.translation = create_translation_crew().kickoff(inputs={
                 "fact_verifier_response": json.dumps(self._state.fact_checker),
                 "target_language": self._state.input_analyzer["original_language"],
                 }).to_dict()
@@ -0,0 +1,76 @@
+# Bulk pre-generation of source summaries for /api/summarize-source
+# Generates and stores the summaries of the most cited articles (or of the
+# titles in a file) in the requested languages, so the endpoint serves them
+# without running the crews:
+#   python -m flows.pregenerate_summaries --top 200 --languages English Spanish --workers 4
+# Articles run on a bounded pool. Each stored summary is written as soon as
+# it is generated, and summaries already stored for the current index and
+# model are skipped, so an interrupted run resumes where it stopped
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+from flows.get_summarized_source_flow import summarize_source, summary_version
+from utils.summary_store import get_summary_store, normalize_language
+import argparse
+import os
+import sys
+import time
+
+def pregenerate(titles: list[str], languages: list[str], workers: int = 4) -> dict:
+    """Store the summaries of titles in every language, the English one of
+    each article first (the others are its translations)."""
+    store = get_summary_store()
+    version = summary_version()
+    languages = sorted({normalize_language(language) for language in languages},
+                       key=lambda language: language != "english")
+    jobs = [(title, [language for language in languages if not store.has(title, language, version)])
+            for title in titles]
+    jobs = [(title, missing) for title, missing in jobs if missing]
+    counts = {"articles": len(titles), "skipped": len(titles) - len(jobs), "generated": 0, "failed": 0}
+    print(f"{counts['skipped']} of {len(titles)} articles already have all their summaries")
+
+    def generate(title: str, missing: list[str]) -> int:
+        for language in missing:
+            summarize_source(title, language, store=store)
+        return len(missing)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="summaries") as executor:
+        futures = {executor.submit(generate, title, missing): title for title, missing in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            title = futures[future]
+            try:
+                counts["generated"] += future.result()
+                print(f"[{done}/{len(jobs)}] {title}")
+            except Exception as e:
+                counts["failed"] += 1
+                print(f"[{done}/{len(jobs)}] {title} failed: {e}")
+    counts["seconds"] = time.perf_counter() - start
+    return counts
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description='Pre-generate the stored summaries of the most cited articles')
+    parser.add_argument('--top', type=int, default=100, help='Most cited articles to summarize')
+    parser.add_argument('--titles', help='File with one article title per line, instead of the most cited')
+    parser.add_argument('--languages', nargs='+', default=['English'], help='Summary languages')
+    parser.add_argument('--workers', type=int, default=int(os.getenv("SUMMARY_WORKERS", "4")),
+                        help='Articles summarized at the same time')
+    args = parser.parse_args()
+
+    if args.titles:
+        with open(args.titles, encoding='utf-8') as f:
+            titles = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+    else:
+        titles = get_summary_store().most_cited(args.top)
+        if not titles:
+            print("No cited articles yet; pass --titles to choose the articles")
+            return 0
+
+    counts = pregenerate(titles, args.languages, args.workers)
+    print(f"Generated {counts['generated']} summaries for {counts['articles'] - counts['skipped']} articles "
+          f"in {counts['seconds']:.1f}s ({counts['skipped']} already stored, {counts['failed']} failed)")
+    return 1 if counts["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
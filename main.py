@@ -1,21 +1,32 @@
-from flask import Flask, send_from_directory, request, jsonify
+from flask import Flask, Response, send_from_directory, request, jsonify
 from flask_restful import Api, Resource
+import json
 import os
+import queue
 import traceback
 from dotenv import load_dotenv
-from flows.fact_checker_flow import FactCheckerFlow
-from flows.get_summarized_source_flow import GetSummarizedSourceFlow
-from flows.internet_fact_checker_flow import InternetFactCheckerFlow
-from crews.generic_translation_crew import generic_translation_crew
+from flows.fact_checker_flow import FactCheckerFlow, claim_cache, fact_check_result, result_cache_key
+from flows.batch import create_batch_fact_checker, parse_claim
+from flows.get_summarized_source_flow import summarize_source
+from flows.internet_fact_checker_flow import InternetFactCheckerFlow, claim_cache as internet_claim_cache
+from crews.generic_translation_crew import create_generic_translation_crew
 from tools.search_manager import SearchManager
 from utils.embeddings import embeddings
+from utils.result_cache import create_result_cache
+from utils.llm_cache import llm_cache_stats
+from utils.fast_analysis import fast_analysis_stats
+from utils.page_cache import get_page_cache
+from utils.extractive import reduction_stats
+from utils.reranking import rerank_stats
+from utils.summary_store import get_summary_store
+from utils.jobs import JobManager, JobQueueFull, step_timings
 import webbrowser
 import threading
 
 # Load environment variables
 load_dotenv()
 
-# Initialize embeddings at startup
+# Initialize the shared embedding model at startup (also used by SearchManager)
 embeddings
 
 app = Flask(__name__)
@@ -27,6 +38,48 @@ WEB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'web')
 # Initialize search manager at startup
 search_manager = SearchManager()
 
+# Persistent cache of fact-check results; RESULT_CACHE_TTL=0 disables it
+result_cache = create_result_cache()
+
+# Bulk fact checking for /api/fact-check/batch, sharing the result cache
+batch_fact_checker = create_batch_fact_checker(result_cache)
+BATCH_MAX_CLAIMS = int(os.getenv("BATCH_MAX_CLAIMS", "1000"))
+
+# Worker pool of the background fact-check jobs
+job_manager = JobManager(
+    max_workers=int(os.getenv("JOB_WORKERS", "4")),
+    max_pending=int(os.getenv("JOB_QUEUE_SIZE", "100")),
+    retention=float(os.getenv("JOB_RETENTION", "3600"))
+)
+
+def run_fact_check(statement: str, progress=None) -> dict:
+    """Run the Wikipedia fact-checking flow, answering repeated claims from
+    the result cache while the index and model are unchanged"""
+    cache_key = result_cache_key(statement)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        print("Result cache hit")  # Debug print
+        return cached
+
+    flow = FactCheckerFlow(user_input=statement, progress=progress)
+    result_dict = fact_check_result(flow.kickoff())
+
+    print(f"Flow result: {result_dict}")  # Debug print
+    result_cache.put(cache_key, result_dict)
+    return result_dict
+
+def run_internet_fact_check(statement: str, progress=None) -> dict:
+    """Run the internet fact-checking flow"""
+    flow = InternetFactCheckerFlow(user_input=statement, progress=progress)
+    result = flow.kickoff()
+
+    # Convert InternetFactCheckerState to dictionary
+    result_dict = result.translation if hasattr(result, 'translation') else {}
+    result_dict['confidence_score'] = result.confidence_score if hasattr(result, 'confidence_score') else None
+
+    print(f"Internet flow result: {result_dict}")  # Debug print
+    return result_dict
+
 class FactCheckerAPI(Resource):
     def post(self):
         """API endpoint for fact checking"""
@@ -37,15 +90,7 @@ class FactCheckerAPI(Resource):
 
             statement = data['statement']
             print(f"Received statement: {statement}")  # Debug print
-            flow = FactCheckerFlow(user_input=statement)
-            result = flow.kickoff()
-            
-            # Convert FactCheckerState to dictionary
-            result_dict = result.translation if hasattr(result, 'translation') else {}
-            result_dict['confidence_score'] = result.confidence_score if hasattr(result, 'confidence_score') else None
-            
-            print(f"Flow result: {result_dict}")  # Debug print
-            return jsonify(result_dict)
+            return jsonify(run_fact_check(statement))
 
         except Exception as e:
             print(f"Error in FactCheckerAPI: {e}")  # Debug print
@@ -62,21 +107,46 @@ class InternetFactCheckerAPI(Resource):
 
             statement = data['statement']
             print(f"Received statement for internet fact check: {statement}")  # Debug print
-            flow = InternetFactCheckerFlow(user_input=statement)
-            result = flow.kickoff()
-            
-            # Convert InternetFactCheckerState to dictionary
-            result_dict = result.translation if hasattr(result, 'translation') else {}
-            result_dict['confidence_score'] = result.confidence_score if hasattr(result, 'confidence_score') else None
-            
-            print(f"Internet flow result: {result_dict}")  # Debug print
-            return jsonify(result_dict)
+            return jsonify(run_internet_fact_check(statement))
 
         except Exception as e:
             print(f"Error in InternetFactCheckerAPI: {e}")  # Debug print
             print(traceback.format_exc())  # Print full traceback
             return {'error': str(e), 'traceback': traceback.format_exc()}, 500
 
+class FactCheckJobAPI(Resource):
+    """Start a fact check as a background job. Responds immediately with the
+    job id; progress and the result are read from the job endpoints."""
+    def __init__(self, kind: str, run):
+        self.kind = kind
+        self.run = run
+
+    def post(self):
+        data = request.get_json()
+        if not data or 'statement' not in data:
+            return {'error': 'Missing statement in request'}, 400
+
+        statement = data['statement']
+        print(f"Received statement for {self.kind} job: {statement}")  # Debug print
+        try:
+            job = job_manager.submit(self.kind, lambda job: self.run(statement, progress=job.progress))
+        except JobQueueFull as e:
+            return {'error': f'Too many pending fact checks, try again later ({e})'}, 503
+
+        return {
+            'job_id': job.id,
+            'status_url': f'/api/jobs/{job.id}',
+            'events_url': f'/api/jobs/{job.id}/events'
+        }, 202
+
+class JobAPI(Resource):
+    def get(self, job_id):
+        """Status, per-step progress and, once finished, the result of a job"""
+        job = job_manager.get(job_id)
+        if job is None:
+            return {'error': 'Unknown or expired job'}, 404
+        return jsonify(job.to_dict())
+
 class SummarizedSourceAPI(Resource):
     def post(self):
         """API endpoint for getting summarized source"""
@@ -88,18 +158,17 @@ class SummarizedSourceAPI(Resource):
             source = data['source']
             target_language = data.get('target_language', 'English')
             
-            flow = GetSummarizedSourceFlow(
-                source=source,
-                target_language=target_language
-            )
-            result = flow.kickoff()
-            print(f"Flow result: {result}")  # Debug print
+            # Stored summaries are served at once; others are generated and stored
+            result = summarize_source(source, target_language, store=get_summary_store())
+            print(f"Summary of {result['title'] or source} ({'stored' if result['stored'] else 'generated'})")  # Debug print
             
             # Convert state to dictionary for JSON serialization
             response = {
                 'source': source,
                 'target_language': target_language,
-                'summary': result.translated_summary
+                'summary': result['summary'],
+                'reduction': result['reduction'],
+                'stored': result['stored']
             }
             return jsonify(response)
 
@@ -112,6 +181,74 @@ class SummarizedSourceAPI(Resource):
 api.add_resource(FactCheckerAPI, '/api/fact-check')
 api.add_resource(InternetFactCheckerAPI, '/api/fact-check-internet')
 api.add_resource(SummarizedSourceAPI, '/api/summarize-source')
+api.add_resource(FactCheckJobAPI, '/api/fact-check/jobs', endpoint='fact_check_jobs',
+                 resource_class_kwargs={'kind': 'fact-check', 'run': run_fact_check})
+api.add_resource(FactCheckJobAPI, '/api/fact-check-internet/jobs', endpoint='internet_fact_check_jobs',
+                 resource_class_kwargs={'kind': 'fact-check-internet', 'run': run_internet_fact_check})
+api.add_resource(JobAPI, '/api/jobs/<string:job_id>')
+
+@app.route('/api/jobs/<job_id>/events')
+def job_events(job_id):
+    """Stream the events of a job as Server-Sent Events: 'progress' for each
+    step, 'status' changes, then 'result' or 'error'. Events already produced
+    are replayed, so clients can connect at any time."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return {'error': 'Unknown or expired job'}, 404
+
+    def stream():
+        sent = 0
+        while True:
+            events, finished = job.wait_for_events(sent, timeout=15)
+            if not events and not finished:
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'], ensure_ascii=False, default=str)}\n\n"
+            sent += len(events)
+            if finished and not events:
+                return
+
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/fact-check/batch', methods=['POST'])
+def fact_check_batch():
+    """Fact-check a list of statements (strings or {"id", "statement"}
+    objects), sent as {"statements": [...]} or as a bare JSON array.
+    Streams one JSON line per statement as soon as it is checked, in
+    completion order, followed by a summary line."""
+    data = request.get_json(silent=True)
+    if isinstance(data, list):
+        data = {'statements': data}
+    if not isinstance(data, dict) or not isinstance(data.get('statements'), list) or not data['statements']:
+        return {'error': 'Missing statements in request'}, 400
+    if len(data['statements']) > BATCH_MAX_CLAIMS:
+        return {'error': f'At most {BATCH_MAX_CLAIMS} statements per batch'}, 413
+    try:
+        claims = [parse_claim(item, index) for index, item in enumerate(data['statements'])]
+    except ValueError as e:
+        return {'error': str(e)}, 400
+
+    records = queue.Queue()
+
+    def run():
+        try:
+            records.put({'summary': batch_fact_checker.run(claims, records.put)})
+        except Exception as e:
+            print(f"Error in batch fact check: {e}")  # Debug print
+            print(traceback.format_exc())  # Print full traceback
+            records.put({'error': str(e)})
+        finally:
+            records.put(None)
+
+    threading.Thread(target=run, daemon=True).start()
+
+    def stream():
+        while (record := records.get()) is not None:
+            yield json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+    return Response(stream(), mimetype='application/x-ndjson')
 
 @app.route('/')
 def index():
@@ -123,6 +260,28 @@ def serve_web_files(path):
     """Serve all other files from the web directory"""
     return send_from_directory(WEB_DIR, path)
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Report in-process cache counters"""
+    return jsonify({
+        'embedding_cache': embeddings.cache_stats(),
+        'result_cache': result_cache.stats(),
+        'semantic_cache': {
+            'wikipedia': claim_cache.stats(),
+            'internet': internet_claim_cache.stats()
+        },
+        'llm_cache': llm_cache_stats(),
+        'page_cache': get_page_cache().stats(),
+        'summary_reduction': reduction_stats.to_dict(),
+        'reranking': rerank_stats.to_dict(),
+        'summary_store': get_summary_store().stats(),
+        'fast_analysis': fast_analysis_stats.to_dict(),
+        'jobs': job_manager.stats(),
+        'flow_steps': step_timings.to_dict(),
+        'speculative_retrieval': search_manager.prefetch_stats(),
+        'hybrid_search': search_manager.hybrid_stats()
+    })
+
 @app.route('/api/translate', methods=['POST'])
 def translate_text():
     try:
@@ -133,8 +292,8 @@ def translate_text():
         text = data['text']
         target_language = data['target_language']
 
-        # Use the generic translation crew
-        result = generic_translation_crew.kickoff(inputs={
+        # Use a per-request copy of the generic translation crew
+        result = create_generic_translation_crew().kickoff(inputs={
             'content': text,
             'target_language': target_language
         })
@@ -162,4 +321,6 @@ if __name__ == '__main__':
     threading.Timer(2, open_browser).start()
     
     print(f"Serving web files from: {WEB_DIR}")
-    app.run(debug=False, port=5555)
+    # Flows use per-request crew copies, so requests can be served concurrently
+    # while sharing the embedding model and FAISS index loaded above
+    app.run(debug=False, port=5555, threaded=True)
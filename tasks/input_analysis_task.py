@@ -28,3 +28,34 @@ input_analysis_task = Task(
     expected_output="""A JSON with the following fields: "original_request", "request_in_english", "verification_facts", "possible_questions", and "original_language.""",
     output_json=InputAnalysisOutput,
 )
+
+class BatchInputAnalysisItem(InputAnalysisOutput):
+    """Output schema for the analysis of one input of a batch."""
+    index: int
+
+class BatchInputAnalysisOutput(BaseModel):
+    """Output schema for the analysis of several inputs at once."""
+    analyses: List[BatchInputAnalysisItem]
+
+# Create batch input analysis task: one LLM call analyzes a group of claims
+# (used by bulk fact checking, where analyzing each claim separately would
+# repeat the instructions in every prompt)
+batch_input_analysis_task = Task(
+    description="""Your task is to analyze each of the user inputs in a list and break each one down into structured components.
+    
+    For every input, your analysis must include:
+    1. The original request exactly as provided, in the original language.
+    2. The request in English.
+    3. The facts that need verification. These facts will result from the decomposition of the original request into verification facts. Do not generate new facts or asumptions from the original request, only decompose it. Each fact must contain all the information necessary to make a search for verification by itself, as is no other fact could be accessed to understand it.
+    4. The possible questions that would be useful to be answered to verify the claims.
+    5. The detected language of the original text. If more than one language is detected, choose the one with the highest prevalence.
+    
+    6. The index of the input, exactly as given with it.
+    
+    Analyze every input independently of the others, and return exactly one analysis per input, in the same order as the inputs.
+    
+    The user inputs to analyze are the following JSON list of objects with an "index" and an "input": '''{user_inputs}'''""",
+    agent=input_analyzer_agent,
+    expected_output="""A JSON with the field "analyses": a list with one element per input, in the same order, each with the fields "index", "original_request", "request_in_english", "verification_facts", "possible_questions", and "original_language".""",
+    output_json=BatchInputAnalysisOutput,
+)
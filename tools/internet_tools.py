@@ -0,0 +1,149 @@
+# Internet Tools: Concurrent Web Search and Page Retrieval
+# Searches the web for every component of the input analysis at once and
+# fetches the best results concurrently, returning the relevant passages of
+# all pages in a single tool result, instead of the agent alternating LLM
+# turns with one search or scrape at a time
+# Uses Serper's search API (SERPER_API_KEY); SERPER_SEARCH_URL points it at
+# another endpoint with the same interface, e.g. a local stub server
+# Pages are read from the page cache when possible, and stale cached pages
+# are revalidated instead of downloaded again
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, PrivateAttr
+from typing import Dict, List, Optional, Tuple, Type
+from .search_tools import RAGSearchInput
+from utils.fast_analysis import ENGLISH_WORDS
+from utils.http_client import FetchPool, create_fetch_pool, extract_text
+from utils.page_cache import get_page_cache
+
+import json
+import os
+import re
+
+class InternetSearchTool(BaseTool):
+    name: str = "Internet Search Tool"
+    description: str = "Search the internet for all components of the input analysis and return the relevant content of the best pages, with their URLs."
+    args_schema: Type[BaseModel] = RAGSearchInput
+
+    _pool: FetchPool = PrivateAttr()
+
+    def __init__(self, **data):
+        """Initialize the tool with its own pooled HTTP client."""
+        super().__init__(**data)
+        self._pool = create_fetch_pool()
+
+    def _search(self, query: str) -> List[Dict]:
+        """Organic results (title, link, snippet) of one web search."""
+        try:
+            response = self._pool.post_json(
+                os.getenv("SERPER_SEARCH_URL", "https://google.serper.dev/search"),
+                {"q": query, "num": int(os.getenv("INTERNET_RESULTS_PER_QUERY", "5"))},
+                headers={"X-API-KEY": os.getenv("SERPER_API_KEY", "")}
+            )
+        except Exception as e:
+            print(f"Internet search failed for '{query}': {e}")
+            return []
+        return [result for result in response.get("organic", []) if result.get("link")]
+
+    def _select_pages(self, results_per_query: List[List[Dict]], max_pages: int) -> List[Dict]:
+        """Take the best results of every query in turn, once per URL."""
+        pages, seen = [], set()
+        for rank in range(max((len(results) for results in results_per_query), default=0)):
+            for results in results_per_query:
+                if rank < len(results) and results[rank]["link"] not in seen:
+                    seen.add(results[rank]["link"])
+                    pages.append(results[rank])
+                    if len(pages) == max_pages:
+                        return pages
+        return pages
+
+    @staticmethod
+    def _relevant_passages(blocks: List[str], terms: set, budget: int) -> str:
+        """The text blocks sharing most terms with the queries, in page order,
+        up to budget characters."""
+        scored = []
+        for position, block in enumerate(blocks):
+            words = set(re.findall(r'\w+', block.lower()))
+            score = len(words & terms)
+            if score and len(block) > 40:
+                scored.append((score, position, block))
+
+        selected, used = [], 0
+        for score, position, block in sorted(scored, key=lambda item: (-item[0], item[1])):
+            if used + len(block) > budget:
+                block = block[:max(0, budget - used)]
+            if not block:
+                break
+            selected.append((position, block))
+            used += len(block)
+        return "\n".join(block for _, block in sorted(selected))
+
+    def _read_pages(self, urls: List[str]) -> List[Optional[Tuple[str, List[str]]]]:
+        """Title and text blocks of each page (None when it couldn't be read),
+        from the page cache when fresh, otherwise fetched concurrently."""
+        page_cache = get_page_cache()
+        cached = [page_cache.get(url) for url in urls]
+        texts: List[Optional[Tuple[str, List[str]]]] = [None] * len(urls)
+        to_fetch = []
+        for i, (url, page) in enumerate(zip(urls, cached)):
+            if page is not None and page["fresh"]:
+                page_cache.record_hit(url, page)
+                texts[i] = (page["title"], page["blocks"])
+            else:
+                to_fetch.append(i)
+
+        fetched = self._pool.fetch_all(
+            [urls[i] for i in to_fetch],
+            deadline=float(os.getenv("INTERNET_FETCH_DEADLINE", "20")),
+            headers=[page_cache.conditional_headers(cached[i]) for i in to_fetch]
+        )
+        for i, response in zip(to_fetch, fetched):
+            page = cached[i]
+            if response["status"] == 304 and page is not None:
+                page_cache.record_hit(urls[i], page, revalidated=True)
+                texts[i] = (page["title"], page["blocks"])
+            elif response["error"] is None:
+                page_cache.record_miss()
+                texts[i] = extract_text(response["text"], response["content_type"])
+                page_cache.put(urls[i], *texts[i], etag=response["etag"],
+                               last_modified=response["last_modified"], downloaded_bytes=response["bytes"])
+            else:
+                page_cache.record_miss()
+                print(f"Could not fetch {urls[i]}: {response['error']}")
+        return texts
+
+    def _run(self,
+            original_request: str,
+            request_in_english: str,
+            verification_facts: List[str],
+            possible_questions: List[str],
+            original_language: str
+        ) -> str:
+        """Search all components of the input analysis and read the best pages."""
+        queries = list(dict.fromkeys([request_in_english, *verification_facts, *possible_questions]))
+        queries = queries[:int(os.getenv("INTERNET_MAX_QUERIES", "6"))]
+        results_per_query = self._pool.map(self._search, queries)
+        pages = self._select_pages(results_per_query, int(os.getenv("INTERNET_MAX_PAGES", "6")))
+
+        terms = {word for query in queries for word in re.findall(r'\w+', query.lower())
+                 if len(word) > 2 and word not in ENGLISH_WORDS}
+        budget = int(os.getenv("INTERNET_PAGE_CHARS", "3000"))
+        texts = self._read_pages([page["link"] for page in pages])
+
+        all_results = []
+        for page, text in zip(pages, texts):
+            content = ""
+            title = page.get("title", "")
+            if text is not None:
+                page_title, blocks = text
+                title = title or page_title
+                content = self._relevant_passages(blocks, terms, budget)
+            # The search snippet stands in for pages that couldn't be read
+            content = content or page.get("snippet", "")
+            if content:
+                all_results.append({
+                    "content": content,
+                    "internet_article_source": f"{title} ({page['link']})" if title else page["link"]
+                })
+
+        return json.dumps(all_results, indent=2, ensure_ascii=False)
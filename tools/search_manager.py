@@ -1,18 +1,41 @@
 # SearchManager: Singleton class for managing vector embeddings and search operations
 # Provides a centralized, thread-safe mechanism for loading and accessing
-# pre-computed document embeddings using FAISS vector store
+# pre-computed document embeddings. The index is opened lazily: vectors and
+# the FAISS index are memory-mapped and chunk text is read from SQLite only
+# for the hits, so startup doesn't depend on the size of the corpus
 
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
-import torch
+from langchain_core.documents import Document
+from utils.embeddings import CachedEmbeddings, embeddings
+from utils.faiss_index import apply_search_params
+from utils.index_store import IndexReader, is_index_store
+from utils.jobs import overlap_executor
+from utils.sparse_search import reciprocal_rank_fusion
+from collections import OrderedDict
+import numpy as np
+import hashlib
+import json
 import os
+import re
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+
+# Fact verifiers append the source between parentheses to the cited fragments
+SOURCE_SUFFIX_PATTERN = re.compile(r'\s*\([^()]*\)\s*$')
 
 class SearchManager:
     _instance: Optional['SearchManager'] = None
-    _vector_store: Optional[FAISS] = None
-    _embeddings: Optional[HuggingFaceEmbeddings] = None
+    _index_store: Optional[IndexReader] = None
+    _embeddings: Optional[CachedEmbeddings] = None
+    _recent_hits: Optional[OrderedDict] = None
+    _recent_hits_lock = threading.Lock()
+    _recent_hits_size = 5000
+    _prefetched: Optional[OrderedDict] = None
+    _prefetch_ttl = 120
+    _prefetch_size = 1000
+    _prefetch_stats = {"prefetched": 0, "served": 0}
+    _hybrid_stats = {"queries": 0, "sparse_only_hits": 0, "sparse_seconds": 0.0}
     
     def __new__(cls):
         if cls._instance is None:
@@ -20,7 +43,7 @@ class SearchManager:
         return cls._instance
     
     def __init__(self):
-        if self._vector_store is None:
+        if self._index_store is None:
             print("Initializing SearchManager...")
             # Dynamically find the project root and set the embeddings path
             project_root = Path(__file__).parent.parent
@@ -28,25 +51,226 @@ class SearchManager:
             
             if not os.path.exists(embeddings_path):
                 raise ValueError("Unified embeddings not found. Please run create_embeddings.py first.")
+            if not is_index_store(embeddings_path):
+                raise ValueError("The unified embeddings use the old pickled format. "
+                                 "Please rebuild them with create_embeddings.py.")
             
-            # Initiialize model to generate embeddings
-            self._embeddings = HuggingFaceEmbeddings(
-                model_name="all-MiniLM-L6-v2",
-                model_kwargs={'device': 'cuda' if torch.cuda.is_available() else 'cpu'}
-            )
-
-            #Initialize the FAISS database
-            self._vector_store = FAISS.load_local(
-                embeddings_path, 
-                self._embeddings, 
-                allow_dangerous_deserialization=True
-            )
-            print(f"Loaded unified embeddings from {os.path.basename(embeddings_path)}")
+            # Reuse the process-wide embedding model instead of loading a second copy
+            self._embeddings = embeddings
+
+            self._index_store = IndexReader(embeddings_path)
+            print(f"Opened unified embeddings from {os.path.basename(embeddings_path)} "
+                  f"({self._index_store.ntotal} chunks)")
+
+            # Apply the search parameters of approximate indexes, which can be
+            # tuned per deployment without rebuilding the index
+            index_meta = self._index_store.meta
+            if os.getenv("FAISS_NPROBE"):
+                index_meta["nprobe"] = int(os.getenv("FAISS_NPROBE"))
+            if os.getenv("FAISS_EF_SEARCH"):
+                index_meta["ef_search"] = int(os.getenv("FAISS_EF_SEARCH"))
+            if self._index_store.index is not None:
+                apply_search_params(self._index_store.index, index_meta)
+            print(f"Index type: {index_meta['index_type']}")
+
+            # Normalized content -> index position of recently retrieved chunks,
+            # used to reuse their stored vectors for confidence scoring
+            self._recent_hits = OrderedDict()
+
+            # (index version, normalized query, k) -> (expiry, hits) of
+            # speculative searches; hits of an earlier index version never match
+            self._prefetched = OrderedDict()
     
     @property
-    def vector_store(self) -> FAISS:
-        return self._vector_store
+    def index_store(self) -> IndexReader:
+        return self._index_store
     
     @property
-    def embeddings(self) -> HuggingFaceEmbeddings:
+    def embeddings(self) -> CachedEmbeddings:
         return self._embeddings
+
+    @property
+    def index_meta(self) -> dict:
+        return self._index_store.meta
+
+    @property
+    def index_version(self) -> str:
+        """Identifies the committed index contents and search parameters."""
+        meta = json.dumps(self._index_store.meta, sort_keys=True)
+        return hashlib.sha1(meta.encode('utf-8')).hexdigest()[:16]
+
+    def similarity_search(self, query: str, k: int = 5) -> List[Document]:
+        return self.similarity_search_batch([query], k)[0]
+
+    def prefetch(self, queries: List[str], k: int = 5) -> None:
+        """Search speculatively, before the final queries are known (e.g. for
+        the raw claim while its analysis is running). The hits are kept for a
+        short time and serve later searches of the same queries on the same
+        index version."""
+        version = self.index_version
+        results = self._search_batch(queries, k)
+        expiry = time.monotonic() + self._prefetch_ttl
+        with self._recent_hits_lock:
+            for query, docs in zip(queries, results):
+                key = (version, self._embeddings.normalize(query), k)
+                self._prefetched[key] = (expiry, docs)
+                self._prefetched.move_to_end(key)
+            while len(self._prefetched) > self._prefetch_size:
+                self._prefetched.popitem(last=False)
+            self._prefetch_stats["prefetched"] += len(queries)
+
+    def prefetch_stats(self) -> dict:
+        """Speculatively searched queries, and how many later searches they served."""
+        with self._recent_hits_lock:
+            return dict(self._prefetch_stats)
+
+    def similarity_search_batch(self, queries: List[str], k: int = 5) -> List[List[Document]]:
+        """Search the index for several queries at once, serving the queries
+        that were prefetched from their kept hits. Returns the hits of each
+        query, in the same order as the queries."""
+        results: List[Optional[List[Document]]] = [None] * len(queries)
+        version = self.index_version
+        now = time.monotonic()
+        with self._recent_hits_lock:
+            for i, query in enumerate(queries):
+                prefetched = self._prefetched.get((version, self._embeddings.normalize(query), k))
+                if prefetched is not None and prefetched[0] > now:
+                    results[i] = prefetched[1]
+                    self._prefetch_stats["served"] += 1
+
+        missing = [i for i, docs in enumerate(results) if docs is None]
+        for i, docs in zip(missing, self._search_batch([queries[i] for i in missing], k)):
+            results[i] = docs
+        return results
+
+    @property
+    def hybrid_enabled(self) -> bool:
+        """Whether searches fuse the BM25 keyword index with FAISS (HYBRID_SEARCH=0
+        disables it; indexes built before the keyword index don't have it)."""
+        return os.getenv("HYBRID_SEARCH", "1") != "0" and self._index_store.has_sparse_index
+
+    def hybrid_search_batch(self, queries: List[str], k: int = 5) -> List[List[Document]]:
+        """Search the FAISS index and the BM25 keyword index for several queries
+        and fuse the two rankings of each query by reciprocal rank fusion.
+        The keyword search runs while the queries are embedded and searched."""
+        if not queries:
+            return []
+
+        def sparse_search():
+            start = time.perf_counter()
+            return self._index_store.sparse_search(queries, k), time.perf_counter() - start
+
+        sparse_future = overlap_executor.submit(sparse_search)
+        dense_results = self.similarity_search_batch(queries, k)
+        sparse_results, sparse_seconds = sparse_future.result()
+
+        documents = {doc.metadata["position"]: doc for docs in dense_results for doc in docs}
+        keyword_hits = self._index_store.get_documents(
+            {position for positions in sparse_results for position in positions} - documents.keys()
+        )
+        for position, doc in keyword_hits.items():
+            doc.metadata["position"] = position
+        documents.update(keyword_hits)
+        self._remember_hits([(self._embeddings.normalize(doc.page_content), position)
+                             for position, doc in keyword_hits.items()])
+
+        results = []
+        sparse_only = 0
+        for docs, positions in zip(dense_results, sparse_results):
+            dense_positions = [doc.metadata["position"] for doc in docs]
+            fused = reciprocal_rank_fusion([dense_positions, [p for p in positions if p in documents]], k)
+            sparse_only += len(set(fused) - set(dense_positions))
+            results.append([documents[position] for position in fused])
+
+        with self._recent_hits_lock:
+            self._hybrid_stats["queries"] += len(queries)
+            self._hybrid_stats["sparse_only_hits"] += sparse_only
+            self._hybrid_stats["sparse_seconds"] += sparse_seconds
+        return results
+
+    def hybrid_stats(self) -> dict:
+        """Queries searched with the keyword index, the fused hits FAISS alone
+        didn't return, and the mean keyword search time per query."""
+        enabled = self.hybrid_enabled
+        with self._recent_hits_lock:
+            queries = self._hybrid_stats["queries"]
+            return {
+                "enabled": enabled,
+                "queries": queries,
+                "sparse_only_hits": self._hybrid_stats["sparse_only_hits"],
+                "mean_sparse_ms": self._hybrid_stats["sparse_seconds"] / queries * 1000 if queries else 0.0,
+            }
+
+    def _search_batch(self, queries: List[str], k: int) -> List[List[Document]]:
+        """All queries are embedded in a single forward pass and looked up with
+        one multi-vector FAISS search; the text of all hits is then read with
+        one docstore query."""
+        if not queries:
+            return []
+
+        vectors = np.asarray(self._embeddings.embed_queries(queries), dtype=np.float32)
+        indices = self._index_store.search(vectors, k)
+        documents = self._index_store.get_documents(np.unique(indices))
+
+        results = []
+        hits = []
+        for row in indices:
+            docs = []
+            for i in row:
+                # FAISS pads with -1 when there are fewer than k hits, and
+                # deleted chunks have no document
+                doc = documents.get(int(i))
+                if doc is None:
+                    continue
+                # The position identifies the chunk's neighbors in its article
+                doc.metadata["position"] = int(i)
+                docs.append(doc)
+                hits.append((self._embeddings.normalize(doc.page_content), int(i)))
+                if len(docs) == k:
+                    break
+            results.append(docs)
+
+        self._remember_hits(hits)
+        return results
+
+    def _remember_hits(self, hits: List[tuple]) -> None:
+        """Record the index positions of retrieved chunks in a bounded LRU."""
+        with self._recent_hits_lock:
+            for key, position in hits:
+                self._recent_hits[key] = position
+                self._recent_hits.move_to_end(key)
+            while len(self._recent_hits) > self._recent_hits_size:
+                self._recent_hits.popitem(last=False)
+
+    def document_vectors(self, docs: List[Document]) -> np.ndarray:
+        """Return the index vectors of retrieved chunks (one row per document),
+        read from the stored vectors; chunks without a position are encoded."""
+        vectors = np.zeros((len(docs), self._index_store.dimension), dtype=np.float32)
+        stored = [i for i, doc in enumerate(docs) if doc.metadata.get("position") is not None]
+        if stored:
+            positions = [docs[i].metadata["position"] for i in stored]
+            vectors[stored] = self._index_store.vectors[positions]
+        missing = [i for i, doc in enumerate(docs) if doc.metadata.get("position") is None]
+        if missing:
+            vectors[missing] = self._embeddings.encode_documents([docs[i].page_content for i in missing])
+        return vectors
+
+    def lookup_vectors(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Return the stored index vectors of recently retrieved chunks.
+        A text matches a chunk when both are equal after normalization, with or
+        without a trailing "(source)" suffix. Texts that do not match any
+        recently retrieved chunk get None, and must be encoded by the caller."""
+        positions = []
+        with self._recent_hits_lock:
+            for text in texts:
+                position = None
+                for candidate in (text, SOURCE_SUFFIX_PATTERN.sub('', text)):
+                    position = self._recent_hits.get(self._embeddings.normalize(candidate))
+                    if position is not None:
+                        break
+                positions.append(position)
+
+        return [
+            self._index_store.reconstruct(position) if position is not None else None
+            for position in positions
+        ]
@@ -2,18 +2,19 @@
 # Provides specialized tools for semantic search and metadata retrieval
 # Supports multilingual, context-aware information extraction
 
-from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field, PrivateAttr
-from typing import List, Type, Dict
+from typing import List, Type, Dict, Optional
 from .search_manager import SearchManager
+from utils.index_store import IndexReader
+from utils.reranking import rerank, rerank_settings, rerank_stats
+from utils.titles import PARENTHETICAL_PATTERN, normalize_title
 
 import os
 from pathlib import Path
-import re
-import unicodedata
 import json
+import numpy as np
 import torch
 
 class RAGSearchInput(BaseModel):
@@ -29,18 +30,24 @@ class RAGSearchTool(BaseTool):
     description: str = "Search through documents using RAG (Retrieval Augmented Generation) to find relevant information."
     args_schema: Type[BaseModel] = RAGSearchInput
     
-    _vector_store: FAISS = PrivateAttr()
+    _search_manager: SearchManager = PrivateAttr()
     
     def __init__(self, **data):
         """Initialize RAG tool using SearchManager singleton."""
         super().__init__(**data)
-        search_manager = SearchManager()
-        self._vector_store = search_manager.vector_store
+        self._search_manager = SearchManager()
 
     def search(self, query: str, k: int = 5) -> List[Document]:
         """Search for relevant documents."""
-        docs = self._vector_store.similarity_search(query, k=k)
+        docs = self._search_manager.similarity_search(query, k=k)
         return docs
+
+    def search_batch(self, queries: List[str], k: int = 5) -> List[List[Document]]:
+        """Search for relevant documents for several queries in one round trip,
+        fusing the FAISS hits with BM25 keyword matches when the index has them."""
+        if self._search_manager.hybrid_enabled:
+            return self._search_manager.hybrid_search_batch(queries, k=k)
+        return self._search_manager.similarity_search_batch(queries, k=k)
     
     def _run(self, 
             original_request: str,
@@ -50,32 +57,39 @@ class RAGSearchTool(BaseTool):
             original_language: str
         ) -> str:
         """Run search for all components of the input analysis."""
-        all_results = []
-        
-        # Search for original English request
-        request_results = self.search(request_in_english)
-        all_results.extend(self._format_results(request_results))
-        
-        # Search for each verification fact
-        for fact in verification_facts:
-            fact_results = self.search(fact)
-            all_results.extend(self._format_results(fact_results))
-        
-        # Search for each question
-        for question in possible_questions:
-            question_results = self.search(question)
-            all_results.extend(self._format_results(question_results))
+        # Search for the English request, each verification fact and each
+        # question with a single batched embedding pass and FAISS lookup (and
+        # keyword search)
+        queries = [request_in_english, *verification_facts, *possible_questions]
+        candidates = self._unique_documents(self.search_batch(queries))
+
+        # Keep only the passages most relevant to the request and its facts
+        settings = rerank_settings()
+        if settings is not None:
+            targets = [request_in_english, *verification_facts]
+            candidates, report = rerank(
+                targets,
+                candidates,
+                np.asarray(self._search_manager.embeddings.embed_queries(targets), dtype=np.float32),
+                self._search_manager.document_vectors(candidates),
+                top_n=settings[0],
+                token_budget=settings[1]
+            )
+            rerank_stats.record(report)
 
-        # Remove duplicates based on content
+        return json.dumps(self._format_results(candidates), ensure_ascii=False)
+
+    @staticmethod
+    def _unique_documents(results: List[List[Document]]) -> List[Document]:
+        """The hits of all queries, without repeated chunks."""
         seen_content = set()
-        unique_results = []
-        for result in all_results:
-            if result['content'] not in seen_content:
-                seen_content.add(result['content'])
-                unique_results.append(result)
-        
-        all_results = json.dumps(unique_results, indent=2, ensure_ascii=False)
-        return all_results
+        unique = []
+        for docs in results:
+            for doc in docs:
+                if doc.page_content not in seen_content:
+                    seen_content.add(doc.page_content)
+                    unique.append(doc)
+        return unique
     
     def _format_results(self, docs: List[Document]) -> List[Dict]:
         """Format search results with metadata."""
@@ -95,62 +109,49 @@ class MetadataSearchTool(BaseTool):
     description: str = "Search through documents using the article title and returns all its fragments."
     args_schema: Type[BaseModel] = MetadataSearchInput
     
-    _vector_store: FAISS = PrivateAttr()
-    _title_index: set = PrivateAttr(default=set())
+    _index_store: IndexReader = PrivateAttr()
     
     def __init__(self, **data):
         """Initialize Metadata Search tool using SearchManager singleton."""
         super().__init__(**data)
         
+        # Titles are looked up in the title index of the docstore, which is
+        # built with the index, so nothing is scanned here
         search_manager = SearchManager()
-        self._vector_store = search_manager.vector_store
-        
-        # Build title index during initialization
-        self._build_title_index()
-
-    def _build_title_index(self):
-        """Build an index of normalized titles from the vector store."""
-        for doc in self._vector_store.docstore._dict.values():
-            if 'title' in doc.metadata:
-                normalized_title = self._normalize_text(doc.metadata['title'])
-                self._title_index.add(normalized_title)
+        self._index_store = search_manager.index_store
 
     def _run(self, article_title: str) -> str:
         """Run the metadata search tool."""
         try:
-            # Normalize the article title for search
-            normalized_title = self._normalize_text(article_title)
-            
-            # Find all documents with matching normalized titles
-            results = []
-            for doc in self._vector_store.docstore._dict.values():
-                if 'title' in doc.metadata:
-                    doc_normalized_title = self._normalize_text(doc.metadata['title'])
-                    if doc_normalized_title == normalized_title:
-                        results.append(doc.page_content)
+            # Fetch the fragments of the article, in document order
+            title = self.resolve_title(article_title)
+            docs = self._index_store.get_article(self._normalize_text(title)) if title else []
+            results = [doc.page_content for doc in docs]
             
             return "\n".join(results) if results else "No matching articles found."
             
         except Exception as e:
             return f"Error searching for article: {str(e)}"
 
+    def resolve_title(self, title: str) -> Optional[str]:
+        """Return the indexed title a cited title refers to, or None.
+        Tries an exact normalized match, then the title without a trailing
+        qualifier between parentheses, then the approximate title index."""
+        for candidate in (title, PARENTHETICAL_PATTERN.sub('', title)):
+            match = self._index_store.find_title(self._normalize_text(candidate))
+            if match is not None:
+                return match
+
+        resolver = self._index_store.title_resolver
+        return resolver.resolve(title) if resolver is not None else None
+
     def verify_title(self, title: str) -> bool:
         """Verify if a title exists in the database."""
         try:
-            normalized_title = self._normalize_text(title)
-            return normalized_title in self._title_index
+            return self.resolve_title(title) is not None
         except:
             return False
 
     def _normalize_text(self, text: str) -> str:
         """Normalize text for search."""
-        # Remove accents and convert to lowercase
-        text = ''.join(c for c in unicodedata.normalize('NFKD', text)
-                      if not unicodedata.combining(c))
-        text = text.lower()
-        
-        # Remove special characters and extra whitespace
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = ' '.join(text.split())
-        
-        return text
\ No newline at end of file
+        return normalize_title(text)
@@ -2,9 +2,106 @@
 # Creates a single, reusable HuggingFace embeddings instance
 # Automatically detects and uses CUDA if available
 # Provides a consistent embedding model across the application
+# (search, confidence scoring and index building all share it), with an
+# in-process LRU cache for query embeddings
 
+from collections import OrderedDict
+from langchain_core.embeddings import Embeddings as BaseEmbeddings
 from langchain_huggingface import HuggingFaceEmbeddings
+from typing import List
+import numpy as np
+import threading
 import torch
+import os
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+class CachedEmbeddings(BaseEmbeddings):
+    """Embedding service around the shared HuggingFace model.
+    Query embeddings are kept in an LRU cache keyed by normalized text, so
+    repeated facts and queries are not re-encoded. Document embeddings (used
+    when building the index) bypass the cache."""
+
+    def __init__(self, model: HuggingFaceEmbeddings, cache_size: int = 10000):
+        self._model = model
+        self._cache_size = cache_size
+        self._cache: OrderedDict[str, List[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def model(self) -> HuggingFaceEmbeddings:
+        return self._model
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize text for the cache key.
+        The model's tokenizer is uncased and ignores whitespace, so this does
+        not change the resulting embedding."""
+        return ' '.join(text.split()).lower()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents without caching."""
+        return self._model.embed_documents(texts)
+
+    def encode_documents(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Embed documents straight into a float32 matrix.
+        Produces the same vectors as embed_documents, without converting them
+        to Python lists, which matters when embedding a whole corpus."""
+        texts = [text.replace("\n", " ") for text in texts]  # As HuggingFaceEmbeddings does
+        encode_kwargs = {**self._model.encode_kwargs, "batch_size": batch_size}
+        vectors = self._model.client.encode(
+            texts,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+            **encode_kwargs
+        )
+        return vectors.astype(np.float32, copy=False)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query, using the cache when possible."""
+        return self.embed_queries([text])[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries, encoding all cache misses in one batch."""
+        keys = [self.normalize(text) for text in texts]
+        vectors = {}
+        with self._lock:
+            for key in keys:
+                if key in vectors:
+                    continue
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    vectors[key] = self._cache[key]
+                    self._hits += 1
+
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if missing:
+            for key, vector in zip(missing, self._model.embed_documents(missing)):
+                vectors[key] = vector
+
+            with self._lock:
+                self._misses += len(missing)
+                for key in missing:
+                    self._cache[key] = vectors[key]
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+
+        return [vectors[key] for key in keys]
+
+    def cache_stats(self) -> dict:
+        """Return hit/miss counters of the query embedding cache."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "size": len(self._cache),
+                "max_size": self._cache_size,
+            }
 
 class Embeddings:
     _instance = None
@@ -12,10 +109,14 @@ class Embeddings:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(Embeddings, cls).__new__(cls)
-            cls._instance._embeddings = HuggingFaceEmbeddings(
-                model_name="all-MiniLM-L6-v2",
+            model = HuggingFaceEmbeddings(
+                model_name=MODEL_NAME,
                 model_kwargs={'device': 'cuda' if torch.cuda.is_available() else 'cpu'}
             )
+            cls._instance._embeddings = CachedEmbeddings(
+                model,
+                cache_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+            )
         return cls._instance
 
 embeddings = Embeddings()._embeddings
@@ -0,0 +1,118 @@
+# Extractive Reduction: Bounded Article Text for the Summarizer
+# Articles are stored as overlapping chunks (100 characters of overlap), and
+# the metadata search returns all of them, so a long article would reach the
+# summarizer LLM as a huge, partly repeated prompt. This module reduces it
+# locally before the LLM: the text is split into sentences, sentences
+# repeated by the chunk overlap (verbatim, truncated or near-identical) are
+# dropped, and when the rest doesn't fit the token budget the sentences most
+# central to the article (closest to the mean of their MiniLM embeddings)
+# are kept, in their original order, with the article's first sentence
+# Token counts are estimated at 4 characters per token
+
+from utils.embeddings import CachedEmbeddings
+import numpy as np
+import re
+import threading
+import time
+
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'(])|\n+')
+DUPLICATE_SIMILARITY = 0.95
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+def split_sentences(text: str) -> list[str]:
+    return [sentence.strip() for sentence in SENTENCE_PATTERN.split(text) if sentence.strip()]
+
+def drop_duplicates(sentences: list[str], vectors: np.ndarray) -> list[int]:
+    """Indices of the sentences to keep: the first occurrence of repeated
+    sentences, without fragments contained in a kept sentence, nor sentences
+    nearly identical to a kept one (cosine similarity above DUPLICATE_SIMILARITY)."""
+    keys = [" ".join(sentence.lower().split()) for sentence in sentences]
+    kept: list[int] = []
+    seen = set()
+    for i, key in enumerate(keys):
+        if key in seen:
+            continue
+        # Chunk boundaries cut sentences, whose start or end reappears in the
+        # neighboring chunk
+        if any(key in keys[j] for j in kept[-8:]) or any(key in keys[j] for j in range(i + 1, min(i + 8, len(keys)))):
+            continue
+        if kept and float(np.max(vectors[kept] @ vectors[i])) >= DUPLICATE_SIMILARITY:
+            continue
+        seen.add(key)
+        kept.append(i)
+    return kept
+
+def reduce_text(text: str, embeddings: CachedEmbeddings, token_budget: int = 3000) -> tuple[str, dict]:
+    """Reduce an article to at most token_budget (estimated) tokens of its
+    most central, non-repeated sentences. Returns the text and a report of
+    the reduction."""
+    start = time.perf_counter()
+    sentences = split_sentences(text)
+    report = {
+        "input_tokens": estimate_tokens(text),
+        "input_sentences": len(sentences),
+    }
+    if not sentences:
+        return text, {**report, "output_tokens": report["input_tokens"], "output_sentences": 0,
+                      "duplicates": 0, "seconds": time.perf_counter() - start}
+
+    vectors = embeddings.encode_documents(sentences)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    kept = drop_duplicates(sentences, vectors)
+
+    if sum(estimate_tokens(sentences[i]) + 1 for i in kept) > token_budget:
+        centroid = vectors[kept].mean(axis=0)
+        scores = vectors[kept] @ centroid
+        selected, used = {kept[0]}, estimate_tokens(sentences[kept[0]]) + 1
+        for position in np.argsort(-scores, kind="stable"):
+            i = kept[int(position)]
+            cost = estimate_tokens(sentences[i]) + 1
+            if i not in selected and used + cost <= token_budget:
+                selected.add(i)
+                used += cost
+        kept_selected = sorted(selected)
+    else:
+        kept_selected = kept
+
+    reduced = "\n".join(sentences[i] for i in kept_selected)
+    report.update({
+        "output_tokens": estimate_tokens(reduced),
+        "output_sentences": len(kept_selected),
+        "duplicates": len(sentences) - len(kept),
+        "seconds": time.perf_counter() - start,
+    })
+    return reduced, report
+
+class ReductionStats:
+    """Thread-safe totals of the reductions made, for the metrics endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.articles = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.duplicates = 0
+        self.seconds = 0.0
+
+    def record(self, report: dict) -> None:
+        with self._lock:
+            self.articles += 1
+            self.input_tokens += report["input_tokens"]
+            self.output_tokens += report["output_tokens"]
+            self.duplicates += report["duplicates"]
+            self.seconds += report["seconds"]
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "articles": self.articles,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "reduction": 1 - self.output_tokens / self.input_tokens if self.input_tokens else 0.0,
+                "duplicate_sentences": self.duplicates,
+                "mean_seconds": self.seconds / self.articles if self.articles else 0.0,
+            }
+
+reduction_stats = ReductionStats()
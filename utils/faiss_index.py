@@ -0,0 +1,93 @@
+# FAISS Index Utility: Index Types and Metadata
+# Describes the FAISS index variants the unified index can be built with
+# (exact flat, IVF-Flat, HNSW and IVF-PQ), creates them from their parameters,
+# and reads/writes the metadata saved next to the index so that search-time
+# parameters (nprobe, efSearch) are applied when it is loaded
+
+from typing import Optional
+import json
+import math
+import os
+import faiss
+
+INDEX_META_FILE = "index_meta.json"
+INDEX_TYPES = ("flat", "ivf-flat", "hnsw", "ivf-pq")
+
+DEFAULT_INDEX_META = {
+    "index_type": "flat",
+    "nlist": None,          # IVF: number of clusters (None: 4 * sqrt(number of vectors))
+    "nprobe": 16,           # IVF: clusters visited per query
+    "hnsw_m": 32,           # HNSW: neighbors per node
+    "ef_construction": 200, # HNSW: candidate list size while building
+    "ef_search": 64,        # HNSW: candidate list size while searching
+    "pq_m": 48,             # PQ: sub-quantizers, i.e. bytes per vector with 8 bits
+    "pq_bits": 8,           # PQ: bits per sub-quantizer code
+}
+
+def make_index_meta(**params) -> dict:
+    """Return index metadata with defaults for the parameters not given."""
+    meta = {**DEFAULT_INDEX_META, **{key: value for key, value in params.items() if value is not None}}
+    if meta["index_type"] not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{meta['index_type']}'. Use one of: {', '.join(INDEX_TYPES)}")
+    return meta
+
+def requires_training(meta: dict) -> bool:
+    """IVF indexes must be trained on a sample of the vectors before adding them."""
+    return meta["index_type"] in ("ivf-flat", "ivf-pq")
+
+def default_nlist(count: int) -> int:
+    """Rule-of-thumb cluster count, keeping at least 39 training points per cluster."""
+    return max(1, min(int(4 * math.sqrt(count)), count // 39))
+
+def training_sample_size(meta: dict, count: int) -> int:
+    """Number of vectors used to train the quantizers."""
+    return min(count, max(meta["nlist"] * 100, (2 ** meta["pq_bits"]) * 100, 10000))
+
+def create_index(dimension: int, meta: dict, count: Optional[int] = None) -> faiss.Index:
+    """
+    Create an empty index for the given metadata.
+    count, the number of vectors to be added, is used to pick nlist when it is
+    not set; the chosen value is stored back in meta.
+    """
+    index_type = meta["index_type"]
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dimension)
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, meta["hnsw_m"])
+        index.hnsw.efConstruction = meta["ef_construction"]
+        index.hnsw.efSearch = meta["ef_search"]
+        return index
+
+    if meta["nlist"] is None:
+        if count is None:
+            raise ValueError("nlist must be set when the number of vectors is unknown")
+        meta["nlist"] = default_nlist(count)
+
+    if index_type == "ivf-flat":
+        index = faiss.index_factory(dimension, f"IVF{meta['nlist']},Flat")
+    else:
+        if dimension % meta["pq_m"] != 0:
+            raise ValueError(f"pq_m ({meta['pq_m']}) must divide the vector dimension ({dimension})")
+        index = faiss.index_factory(dimension, f"IVF{meta['nlist']},PQ{meta['pq_m']}x{meta['pq_bits']}")
+    faiss.extract_index_ivf(index).nprobe = meta["nprobe"]
+    return index
+
+def apply_search_params(index: faiss.Index, meta: dict) -> None:
+    """Set the search-time parameters recorded in the metadata on a loaded index."""
+    if meta["index_type"] in ("ivf-flat", "ivf-pq"):
+        faiss.extract_index_ivf(index).nprobe = meta["nprobe"]
+    elif meta["index_type"] == "hnsw":
+        index.hnsw.efSearch = meta["ef_search"]
+
+def load_index_meta(index_path: str) -> dict:
+    """Read the metadata of a saved index; indexes without one are flat."""
+    meta_path = os.path.join(index_path, INDEX_META_FILE)
+    if not os.path.exists(meta_path):
+        return make_index_meta()
+    with open(meta_path, encoding="utf-8") as f:
+        return make_index_meta(**json.load(f))
+
+def save_index_meta(index_path: str, meta: dict) -> None:
+    with open(os.path.join(index_path, INDEX_META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
@@ -0,0 +1,172 @@
+# Fast Analysis: Local Input Analysis of Short English Claims
+# Most claims are a short English sentence ("The Eiffel Tower is in Paris"),
+# for which the input analyzer's LLM round trip only echoes the claim back
+# as its own translation and verification fact. This module analyzes such
+# claims locally: an offline language check based on the script and on
+# English and foreign function words, rule-based splitting into
+# self-contained facts, and simple questions from each fact
+# When any rule is unsure (non-ASCII or foreign words, questions, long
+# inputs, facts starting with a pronoun) it returns None with the reason,
+# and the flows fall back to the LLM crew
+
+from typing import Optional
+import os
+import re
+import threading
+import time
+
+ENGLISH_WORDS = {
+    "the", "a", "an", "is", "are", "was", "were", "be", "been", "has", "have", "had",
+    "of", "in", "on", "at", "by", "for", "with", "from", "to", "and", "or", "but",
+    "that", "which", "who", "it", "its", "this", "these", "those", "than", "not",
+    "did", "does", "do", "will", "can", "first", "most", "largest", "into", "as",
+}
+# Frequent function words of other languages written in the Latin script,
+# none of which is an English word
+FOREIGN_WORDS = {
+    # Spanish / Portuguese / Italian
+    "el", "la", "los", "las", "es", "del", "una", "y", "que", "por", "con", "para",
+    "fue", "são", "é", "em", "um", "uma", "dos", "das", "il", "della", "di", "che", "sono", "è",
+    # French
+    "le", "les", "est", "des", "du", "et", "une", "au", "aux", "sur", "dans", "sont",
+    # German / Dutch
+    "der", "die", "das", "ist", "und", "ein", "eine", "den", "dem", "von", "mit", "nicht",
+    "het", "een", "van", "zijn", "wurde", "war",
+}
+PRONOUNS = {"it", "he", "she", "they", "this", "these", "those", "its", "his", "her", "their", "there"}
+AUXILIARIES = ("is", "are", "was", "were", "has", "have", "had", "will", "can", "does", "do", "did")
+
+SENTENCE_PATTERN = re.compile(r'(?<=[.;!])\s+')
+CLAUSE_PATTERN = re.compile(r',?\s+(?:and|but|while|whereas)\s+|;\s*')
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+def is_english(text: str) -> tuple[bool, str]:
+    """Whether text is confidently English, with the reason when it isn't."""
+    letters = [c for c in text if c.isalpha()]
+    if not letters:
+        return False, "no_text"
+    if any(not ('a' <= c.lower() <= 'z') for c in letters):
+        return False, "non_ascii"
+    words = [word.lower() for word in WORD_PATTERN.findall(text)]
+    english = sum(word in ENGLISH_WORDS for word in words)
+    foreign = sum(word in FOREIGN_WORDS for word in words)
+    if foreign or english == 0:
+        return False, "not_english"
+    return True, ""
+
+def has_verb(clause: str) -> bool:
+    """Rough check that a clause is a statement of its own."""
+    words = clause.lower().split()
+    return any(word in AUXILIARIES or word.endswith("ed") for word in words[1:])
+
+def split_facts(text: str) -> list[str]:
+    """Split a claim into sentences, and sentences into coordinated clauses
+    when every clause has a verb of its own."""
+    facts = []
+    for sentence in SENTENCE_PATTERN.split(text.strip()):
+        sentence = sentence.strip().rstrip(".;!").strip()
+        if not sentence:
+            continue
+        clauses = [clause.strip() for clause in CLAUSE_PATTERN.split(sentence) if clause.strip()]
+        if len(clauses) > 1 and all(has_verb(clause) for clause in clauses):
+            facts.extend(clauses)
+        else:
+            facts.append(sentence)
+    return facts
+
+def fact_question(fact: str) -> str:
+    """Turn a fact into a yes/no question, inverting its copula when it has one."""
+    words = fact.split()
+    if words[0].lower() in ENGLISH_WORDS:
+        words[0] = words[0].lower()
+    for position in range(1, len(words)):
+        if words[position].lower() in ("is", "are", "was", "were"):
+            return " ".join([words[position].capitalize(), *words[:position], *words[position + 1:]]) + "?"
+    return f"Is it true that {' '.join(words)}?"
+
+def fast_analyze(text: str, max_words: int = 30, max_facts: int = 4) -> tuple[Optional[dict], str]:
+    """Analyze a claim locally. Returns the analysis (the fields of
+    InputAnalysisOutput) and an empty reason, or None and why the claim needs
+    the LLM analysis."""
+    stripped = text.strip()
+    if len(stripped.split()) > max_words:
+        return None, "too_long"
+    if "?" in stripped:
+        return None, "question"
+    english, reason = is_english(stripped)
+    if not english:
+        return None, reason
+
+    facts = split_facts(stripped)
+    if not facts:
+        return None, "no_text"
+    if len(facts) > max_facts:
+        return None, "too_many_facts"
+    if any(fact.split()[0].lower() in PRONOUNS for fact in facts):
+        return None, "unresolved_reference"
+
+    return {
+        "original_request": text,
+        "request_in_english": stripped,
+        "verification_facts": facts,
+        "possible_questions": [fact_question(fact) for fact in facts],
+        "original_language": "English",
+    }, ""
+
+class FastAnalysisStats:
+    """Thread-safe counters of the local analysis: how often it answered, why
+    it fell back, and the LLM analysis time it saved (estimated from the mean
+    duration of the LLM analyses)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.fast = 0
+        self.fast_seconds = 0.0
+        self.llm = 0
+        self.llm_seconds = 0.0
+        self.fallbacks: dict[str, int] = {}
+
+    def record_fast(self, seconds: float) -> None:
+        with self._lock:
+            self.fast += 1
+            self.fast_seconds += seconds
+
+    def record_fallback(self, reason: str) -> None:
+        with self._lock:
+            self.fallbacks[reason] = self.fallbacks.get(reason, 0) + 1
+
+    def record_llm(self, seconds: float) -> None:
+        with self._lock:
+            self.llm += 1
+            self.llm_seconds += seconds
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            analyses = self.fast + self.llm
+            mean_llm = self.llm_seconds / self.llm if self.llm else 0.0
+            mean_fast = self.fast_seconds / self.fast if self.fast else 0.0
+            return {
+                "fast": self.fast,
+                "llm": self.llm,
+                "fast_rate": self.fast / analyses if analyses else 0.0,
+                "fallbacks": dict(self.fallbacks),
+                "mean_fast_seconds": mean_fast,
+                "mean_llm_seconds": mean_llm,
+                "saved_seconds": max(0.0, self.fast * (mean_llm - mean_fast)),
+            }
+
+fast_analysis_stats = FastAnalysisStats()
+
+def try_fast_analysis(text: str) -> Optional[dict]:
+    """The local analysis of text when enabled (FAST_ANALYSIS=0 disables it)
+    and confident, recording the outcome in fast_analysis_stats. Claims longer
+    than FAST_ANALYSIS_MAX_WORDS words always go to the LLM."""
+    if os.getenv("FAST_ANALYSIS", "1") == "0":
+        return None
+    start = time.perf_counter()
+    analysis, reason = fast_analyze(text, max_words=int(os.getenv("FAST_ANALYSIS_MAX_WORDS", "30")))
+    if analysis is None:
+        fast_analysis_stats.record_fallback(reason)
+    else:
+        fast_analysis_stats.record_fast(time.perf_counter() - start)
+    return analysis
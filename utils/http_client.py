@@ -0,0 +1,215 @@
+# HTTP Client: Pooled, Bounded Fetching of Web Pages
+# A single requests session with pooled keep-alive connections, shared by the
+# internet retrieval tool. Requests run concurrently on a fixed thread pool,
+# with at most per_host requests to the same host at a time, connect/read
+# timeouts, a deadline for a whole group of fetches and a cap on the bytes
+# read from each response, so one slow or huge page can't stall or bloat a
+# fact check
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+from requests.adapters import HTTPAdapter
+from typing import Optional
+from urllib.parse import urlsplit
+import charset_normalizer
+import codecs
+import os
+import re
+import requests
+import threading
+import time
+
+USER_AGENT = "Mozilla/5.0 (compatible; NLPFactChecker/1.0)"
+TEXT_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+CHARSET_PATTERN = re.compile(r'charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+def _codec(name) -> Optional[str]:
+    """The codec of a charset name, or None if Python doesn't know it."""
+    if isinstance(name, bytes):
+        name = name.decode('ascii', errors='ignore')
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+def decode_body(body: bytes, content_type: str) -> str:
+    """Decode a response body with the charset of its Content-Type header,
+    else the one its <meta> tag declares, else UTF-8 when it is valid UTF-8,
+    else the detected encoding. (requests assumes ISO-8859-1 for text
+    responses without a header charset, which mangles UTF-8 pages.)"""
+    match = CHARSET_PATTERN.search(content_type)
+    encoding = _codec(match.group(1)) if match else None
+    if encoding is None:
+        match = META_CHARSET_PATTERN.search(body[:4096])
+        encoding = _codec(match.group(1)) if match else None
+    if encoding is None:
+        try:
+            return body.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            detected = charset_normalizer.from_bytes(bytes(body)).best()
+            encoding = _codec(detected.encoding) if detected is not None else None
+    return body.decode(encoding or 'utf-8', errors='replace')
+
+class TextExtractor(HTMLParser):
+    """Collects the title and the visible text blocks of an HTML page."""
+    SKIPPED_TAGS = {"script", "style", "noscript", "svg", "nav", "header", "footer", "aside", "form", "template"}
+    BLOCK_TAGS = {"p", "div", "li", "h1", "h2", "h3", "h4", "h5", "h6", "td", "th", "br", "section", "article", "blockquote", "pre"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.blocks: list[str] = []
+        self._current: list[str] = []
+        self._skipping = 0
+        self._in_title = False
+
+    def _end_block(self) -> None:
+        text = " ".join("".join(self._current).split())
+        if text:
+            self.blocks.append(text)
+        self._current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in self.BLOCK_TAGS:
+            self._end_block()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in self.BLOCK_TAGS:
+            self._end_block()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skipping:
+            self._current.append(data)
+
+    def close(self):
+        super().close()
+        self._end_block()
+        self.title = " ".join(self.title.split())
+
+def extract_text(body: str, content_type: str) -> tuple[str, list[str]]:
+    """Title and text blocks of a page (plain text is split on blank lines)."""
+    if "html" not in content_type:
+        return "", [block.strip() for block in re.split(r'\n\s*\n', body) if block.strip()]
+    extractor = TextExtractor()
+    extractor.feed(body)
+    extractor.close()
+    return extractor.title, extractor.blocks
+
+class FetchPool:
+    """Concurrent HTTP fetching with connection pooling and limits.
+    Args:
+        max_workers: Requests in flight at the same time
+        per_host: Requests in flight to the same host
+        timeout: Seconds to connect and between bytes read
+        max_bytes: Bytes read from a response before it is truncated
+    """
+
+    def __init__(self, max_workers: int = 16, per_host: int = 4, timeout: float = 5.0,
+                 max_bytes: int = 1_000_000):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self._session = requests.Session()
+        self._session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=max_workers, max_retries=0)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+        self._host_limits: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def post_json(self, url: str, payload: dict, headers: Optional[dict] = None) -> dict:
+        """POST a JSON payload and return the decoded JSON response."""
+        with self._host_limit(url):
+            response = self._session.post(url, json=payload, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def fetch(self, url: str, headers: Optional[dict] = None) -> dict:
+        """GET a page, reading at most max_bytes of it. Returns the url, the
+        final url after redirects, the status, content type, validators
+        (etag, last_modified), text and bytes read, or the error that
+        prevented reading it. A 304 answer to conditional headers has no text."""
+        start = time.perf_counter()
+        result = {"url": url, "final_url": url, "status": None, "content_type": "", "text": "", "error": None,
+                  "truncated": False, "etag": None, "last_modified": None, "bytes": 0}
+        try:
+            with self._host_limit(url):
+                with self._session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+                    result["status"] = response.status_code
+                    result["final_url"] = response.url
+                    result["content_type"] = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                    result["etag"] = response.headers.get("ETag")
+                    result["last_modified"] = response.headers.get("Last-Modified")
+                    if response.status_code == 304:
+                        result["seconds"] = time.perf_counter() - start
+                        return result
+                    if response.status_code >= 400:
+                        raise requests.HTTPError(f"HTTP {response.status_code}")
+                    if result["content_type"] and not result["content_type"].startswith(TEXT_CONTENT_TYPES):
+                        raise ValueError(f"Unsupported content type {result['content_type']}")
+
+                    body = bytearray()
+                    for chunk in response.iter_content(chunk_size=65536):
+                        body.extend(chunk)
+                        if len(body) >= self.max_bytes:
+                            del body[self.max_bytes:]
+                            result["truncated"] = True
+                            break
+                    result["bytes"] = len(body)
+                    result["text"] = decode_body(bytes(body), response.headers.get("Content-Type", ""))
+        except Exception as e:
+            result["error"] = str(e)
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def fetch_all(self, urls: list[str], deadline: float = 20.0, headers: Optional[list[dict]] = None) -> list[dict]:
+        """Fetch several pages concurrently, each with its own headers when
+        given. Pages still loading when the deadline passes are reported with
+        an error, in the same order."""
+        headers = headers or [None] * len(urls)
+        futures = [self._executor.submit(self.fetch, url, url_headers) for url, url_headers in zip(urls, headers)]
+        done, _ = wait(futures, timeout=deadline)
+        results = []
+        for url, future in zip(urls, futures):
+            if future in done:
+                results.append(future.result())
+            else:
+                future.cancel()
+                results.append({"url": url, "final_url": url, "status": None, "content_type": "", "text": "",
+                                "error": f"Not fetched within {deadline}s", "truncated": False, "etag": None,
+                                "last_modified": None, "bytes": 0, "seconds": deadline})
+        return results
+
+    def map(self, func, items: list) -> list:
+        """Run func over items on the pool (e.g. concurrent searches)."""
+        return list(self._executor.map(func, items))
+
+def create_fetch_pool() -> FetchPool:
+    """Create a fetch pool configured from FETCH_WORKERS, FETCH_PER_HOST,
+    FETCH_TIMEOUT (seconds) and FETCH_MAX_BYTES."""
+    return FetchPool(
+        max_workers=int(os.getenv("FETCH_WORKERS", "16")),
+        per_host=int(os.getenv("FETCH_PER_HOST", "4")),
+        timeout=float(os.getenv("FETCH_TIMEOUT", "5")),
+        max_bytes=int(os.getenv("FETCH_MAX_BYTES", "1000000"))
+    )
@@ -0,0 +1,470 @@
+# Index Store: On-disk Format of the Unified Index
+# The unified index directory contains:
+# - vectors.f32: every chunk embedding as a raw float32 matrix, memory-mapped
+#   so all worker processes share the same pages through the page cache
+# - index.faiss: the approximate FAISS index (IVF/HNSW/PQ builds only), read
+#   with mmap where FAISS supports it
+# - docstore.sqlite: chunk text and metadata by index position, fetched only
+#   for the top-k hits; also holds the normalized title index used to fetch
+#   whole articles and the manifest used by incremental builds, and the
+#   BM25 keyword index of the chunks: an FTS5 table over the chunk text that
+#   stores only the inverted index (no text copy, no term offsets)
+# - title_index/: trigram index of the article titles (see utils.titles)
+# - index_meta.json: index type, parameters and sizes
+# Nothing is pickled, so loading the index doesn't deserialize the corpus.
+# A chunk's position is its row in vectors.f32 and its id in the FAISS index;
+# positions are never reused, deleted chunks only lose their docstore row
+# until the index is compacted (see corpus/create_embeddings.py --compact).
+
+from langchain_core.documents import Document
+from utils.faiss_index import (
+    apply_search_params, create_index, load_index_meta, make_index_meta,
+    save_index_meta, training_sample_size,
+)
+from utils.sparse_search import match_expression, query_terms
+from utils.titles import TITLE_INDEX_DIR, TitleResolver, normalize_title
+from typing import Iterable, Iterator, Optional
+import json
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+import numpy as np
+import faiss
+
+VECTORS_FILE = "vectors.f32"
+FAISS_INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.sqlite"
+
+DOCSTORE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS chunks (
+        position INTEGER PRIMARY KEY,
+        doc_id TEXT NOT NULL UNIQUE,
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        sources TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS chunks_title ON chunks (title);
+    CREATE TABLE IF NOT EXISTS titles (
+        normalized_title TEXT NOT NULL,
+        title TEXT NOT NULL,
+        PRIMARY KEY (normalized_title, title)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS store_state (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5 (
+        content, content='chunks', content_rowid='position',
+        detail='column', tokenize='unicode61 remove_diacritics 2'
+    );
+    CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts_terms USING fts5vocab (chunks_fts, 'row');
+"""
+
+# Terms of a keyword query are looked up among the chunks of at most this
+# share of the corpus; more common terms barely change BM25 scores but make
+# the query scan most of the index
+SPARSE_MAX_DOCUMENT_SHARE = 0.05
+
+# Candidates fetched on top of the deleted share's oversampling when the
+# index still holds deleted positions
+DELETED_SEARCH_MARGIN = 8
+
+def is_index_store(path: str) -> bool:
+    """Whether a directory holds an index in this format."""
+    return os.path.exists(os.path.join(path, DOCSTORE_FILE))
+
+def _row_to_document(doc_id: str, title: str, content: str, sources: str) -> Document:
+    return Document(id=doc_id, page_content=content, metadata={"title": title, "sources": json.loads(sources)})
+
+class IndexReader:
+    """Read-only access to an index directory, shared by all request threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.meta = load_index_meta(path)
+        self.dimension = self.meta["dimension"]
+        self._docstore_uri = f"file:{os.path.join(path, DOCSTORE_FILE)}?mode=ro"
+        self._local = threading.local()
+        self._title_resolver: Optional[TitleResolver] = None
+
+        # Positions, including deleted chunks, as of the last committed update
+        row = self._connection.execute("SELECT value FROM store_state WHERE key = 'ntotal'").fetchone()
+        self.ntotal = int(row[0])
+        # Indexes built before the BM25 keyword index get it on their next update
+        self.has_sparse_index = self._connection.execute(
+            "SELECT 1 FROM store_state WHERE key = 'sparse_index'"
+        ).fetchone() is not None
+
+        self.vectors = np.memmap(os.path.join(path, VECTORS_FILE), dtype=np.float32, mode='r',
+                                 shape=(self.ntotal, self.dimension))
+
+        self.index: Optional[faiss.Index] = None
+        if self.meta["index_type"] != "flat":
+            index_path = os.path.join(path, FAISS_INDEX_FILE)
+            try:
+                self.index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                # Not every index type can be memory-mapped
+                self.index = faiss.read_index(index_path)
+            apply_search_params(self.index, self.meta)
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        """One read-only SQLite connection per thread."""
+        if not hasattr(self._local, "connection"):
+            self._local.connection = sqlite3.connect(self._docstore_uri, uri=True)
+        return self._local.connection
+
+    def search(self, queries: np.ndarray, k: int) -> np.ndarray:
+        """Return the positions of the k nearest chunks of each query (-1 padded).
+        Flat and HNSW indexes keep deleted chunks, which get_documents() skips,
+        so such indexes are searched for more candidates, in proportion to the deleted
+        share, and again for twice as many while a query has fewer than k
+        live chunks among them: the deleted chunks of a changed article rank
+        right next to the chunks that replaced them."""
+        deleted = self.meta.get("deleted", 0) if self.meta["index_type"] in ("flat", "hnsw") else 0
+        if not deleted:
+            return self._search(queries, k)
+
+        fetch = min(self.ntotal, math.ceil(k * self.ntotal / max(1, self.ntotal - deleted)) + DELETED_SEARCH_MARGIN)
+        while True:
+            positions = self._search(queries, fetch)
+            if fetch == self.ntotal:
+                return positions
+            live = self.live_positions(np.unique(positions))
+            if all((row < 0).any() or np.isin(row, live).sum() >= k for row in positions):
+                return positions
+            fetch = min(self.ntotal, fetch * 2)
+
+    def _search(self, queries: np.ndarray, fetch: int) -> np.ndarray:
+        if self.index is None:
+            _, positions = faiss.knn(queries, self.vectors, min(fetch, self.ntotal))
+        else:
+            _, positions = self.index.search(queries, fetch)
+        return positions
+
+    def live_positions(self, positions: Iterable[int]) -> np.ndarray:
+        """Return which of the given positions hold a chunk (not deleted)."""
+        positions = [int(position) for position in positions if position >= 0]
+        live = []
+        for start in range(0, len(positions), 500):
+            batch = positions[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            live.extend(row[0] for row in self._connection.execute(
+                f"SELECT position FROM chunks WHERE position IN ({placeholders})", batch))
+        return np.asarray(live, dtype=np.int64)
+
+    def sparse_search(self, queries: list[str], k: int) -> list[list[int]]:
+        """Return the positions of the k best BM25 matches of each query.
+        Only the query's terms found in at most SPARSE_MAX_DOCUMENT_SHARE of
+        the chunks are searched, or its rarest term when all are common."""
+        results = []
+        max_documents = max(1, int(self.ntotal * SPARSE_MAX_DOCUMENT_SHARE))
+        for query in queries:
+            counts = {}
+            for term in query_terms(query):
+                row = self._connection.execute(
+                    "SELECT doc FROM chunks_fts_terms WHERE term = ?", (term,)
+                ).fetchone()
+                if row is not None:
+                    counts[term] = row[0]
+            selected = [term for term, count in counts.items() if count <= max_documents]
+            if not selected and counts:
+                selected = [min(counts, key=counts.get)]
+            if not selected:
+                results.append([])
+                continue
+            results.append([position for (position,) in self._connection.execute(
+                "SELECT rowid FROM chunks_fts WHERE chunks_fts MATCH ? ORDER BY rank LIMIT ?",
+                (match_expression(selected), k)
+            )])
+        return results
+
+    def reconstruct(self, position: int) -> np.ndarray:
+        return np.array(self.vectors[position])
+
+    def get_documents(self, positions: Iterable[int]) -> dict[int, Document]:
+        """Fetch the chunks at the given positions; deleted ones are missing."""
+        positions = [int(position) for position in positions if position >= 0]
+        if not positions:
+            return {}
+        placeholders = ",".join("?" * len(positions))
+        rows = self._connection.execute(
+            f"SELECT position, doc_id, title, content, sources FROM chunks WHERE position IN ({placeholders})",
+            positions
+        ).fetchall()
+        return {row[0]: _row_to_document(*row[1:]) for row in rows}
+
+    def iter_documents(self, batch_size: int = 10000) -> Iterator[tuple[int, Document]]:
+        """Stream all chunks in position order."""
+        last_position = -1
+        while True:
+            rows = self._connection.execute(
+                "SELECT position, doc_id, title, content, sources FROM chunks "
+                "WHERE position > ? ORDER BY position LIMIT ?",
+                (last_position, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row[0], _row_to_document(*row[1:])
+            last_position = rows[-1][0]
+
+    def iter_titles(self) -> Iterator[tuple[str, str]]:
+        """Stream the (normalized title, title) pairs of all articles."""
+        yield from self._connection.execute("SELECT normalized_title, title FROM titles")
+
+    def find_title(self, normalized_title: str) -> Optional[str]:
+        """Return an indexed title with the given normalized form."""
+        row = self._connection.execute(
+            "SELECT title FROM titles WHERE normalized_title = ? LIMIT 1", (normalized_title,)
+        ).fetchone()
+        return row[0] if row else None
+
+    @property
+    def title_resolver(self) -> Optional[TitleResolver]:
+        """The approximate title matcher, opened on first use; None for
+        indexes built without a title index."""
+        if self._title_resolver is None:
+            path = os.path.join(self.path, TITLE_INDEX_DIR)
+            if os.path.exists(path):
+                self._title_resolver = TitleResolver(path)
+        return self._title_resolver
+
+    def get_article(self, normalized_title: str) -> list[Document]:
+        """Return the chunks of the articles with a normalized title, in document order.
+        An article's chunks are stored at consecutive positions in the order
+        they were split, so this reads only that article's rows."""
+        rows = self._connection.execute(
+            "SELECT c.doc_id, c.title, c.content, c.sources FROM titles t "
+            "JOIN chunks c ON c.title = t.title "
+            "WHERE t.normalized_title = ? ORDER BY c.position",
+            (normalized_title,)
+        ).fetchall()
+        return [_row_to_document(*row) for row in rows]
+
+    def sample_documents(self, count: int, seed: int = 0) -> list[Document]:
+        """Return up to count random chunks."""
+        rng = random.Random(seed)
+        positions = rng.sample(range(self.ntotal), min(count * 2, self.ntotal))
+        return list(self.get_documents(positions).values())[:count]
+
+class IndexWriter:
+    """
+    Append and delete chunks in an index directory.
+    Changes become durable on commit(): vectors are flushed first, then the
+    docstore transaction is committed, then the approximate index is rewritten.
+    Vectors written after the last commit are discarded on the next open, and
+    an approximate index behind the docstore is caught up from vectors.f32.
+    """
+
+    def __init__(self, path: str, index_meta: Optional[dict] = None):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        meta_exists = os.path.exists(os.path.join(path, "index_meta.json"))
+        self.meta = load_index_meta(path) if meta_exists else (index_meta or make_index_meta())
+
+        self.connection = sqlite3.connect(os.path.join(path, DOCSTORE_FILE))
+        self.connection.executescript(DOCSTORE_SCHEMA)
+        self.ntotal = int(self._get_state("ntotal") or 0)
+        self.dimension: Optional[int] = self.meta.get("dimension")
+        self._backfill_titles()
+        self._backfill_sparse_index()
+
+        # Drop vectors that were written after the last commit
+        vectors_path = os.path.join(path, VECTORS_FILE)
+        if os.path.exists(vectors_path) and self.dimension:
+            with open(vectors_path, "r+b") as f:
+                f.truncate(self.ntotal * self.dimension * 4)
+        self._vectors_file = open(vectors_path, "ab")
+
+        self.index: Optional[faiss.Index] = None
+        if meta_exists and self.meta["index_type"] != "flat":
+            self.index = faiss.read_index(os.path.join(path, FAISS_INDEX_FILE))
+            self._catch_up_index()
+
+    def _get_state(self, key: str) -> Optional[str]:
+        row = self.connection.execute("SELECT value FROM store_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str) -> None:
+        self.connection.execute("INSERT OR REPLACE INTO store_state (key, value) VALUES (?, ?)", (key, value))
+
+    def _backfill_titles(self) -> None:
+        """Fill the title index of docstores created before it existed."""
+        if self.ntotal == 0 or self.connection.execute("SELECT 1 FROM titles LIMIT 1").fetchone():
+            return
+        titles = [title for (title,) in self.connection.execute("SELECT DISTINCT title FROM chunks")]
+        self._add_titles(titles)
+        self.connection.commit()
+
+    def _backfill_sparse_index(self) -> None:
+        """Build the keyword index of docstores created before it existed, and
+        mark it as built (also for new, empty docstores)."""
+        if self._get_state("sparse_index") is not None:
+            return
+        if self.ntotal:
+            print("Building the BM25 keyword index of the existing chunks...")
+            self.connection.execute("INSERT INTO chunks_fts (chunks_fts) VALUES ('rebuild')")
+        self._set_state("sparse_index", "1")
+        self.connection.commit()
+
+    def optimize_sparse_index(self) -> None:
+        """Merge the keyword index into a single compact b-tree (after a build
+        or update; inserts leave it fragmented). Commits the docstore."""
+        self.connection.execute("INSERT INTO chunks_fts (chunks_fts) VALUES ('optimize')")
+        self.connection.commit()
+
+    def _add_titles(self, titles: Iterable[str]) -> None:
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO titles (normalized_title, title) VALUES (?, ?)",
+            ((normalize_title(title), title) for title in set(titles))
+        )
+
+    def _vectors(self) -> np.ndarray:
+        self._vectors_file.flush()
+        return np.memmap(os.path.join(self.path, VECTORS_FILE), dtype=np.float32, mode='r',
+                         shape=(self.ntotal, self.dimension))
+
+    def _add_to_index(self, vectors: np.ndarray, start: int) -> None:
+        if self.meta["index_type"] == "hnsw":
+            # HNSW assigns sequential ids, which match positions since every
+            # position is added in order
+            self.index.add(vectors)
+        else:
+            self.index.add_with_ids(vectors, np.arange(start, start + len(vectors), dtype=np.int64))
+
+    def _catch_up_index(self) -> None:
+        """Add the committed vectors the approximate index is missing."""
+        if self.meta["index_type"] == "hnsw":
+            indexed_until = self.index.ntotal
+        else:
+            # The index file may be newer than the metadata after an
+            # interruption; remove the range first so it is not added twice
+            indexed_until = self.meta.get("indexed_until", self.ntotal)
+            self.index.remove_ids(faiss.IDSelectorRange(indexed_until, self.ntotal))
+        if indexed_until < self.ntotal:
+            print(f"Adding {self.ntotal - indexed_until} vectors missing from the approximate index...")
+            self._add_to_index(np.ascontiguousarray(self._vectors()[indexed_until:]), indexed_until)
+            self.meta["indexed_until"] = self.ntotal
+
+    def existing_ids(self, doc_ids: list[str]) -> set[str]:
+        """Return which of the given chunk ids are already stored."""
+        found = set()
+        for start in range(0, len(doc_ids), 500):
+            batch = doc_ids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            found.update(row[0] for row in self.connection.execute(
+                f"SELECT doc_id FROM chunks WHERE doc_id IN ({placeholders})", batch))
+        return found
+
+    def add(self, documents: list[Document], vectors: np.ndarray) -> None:
+        """Append chunks and their vectors. Documents must have an id."""
+        if self.dimension is None:
+            self.dimension = vectors.shape[1]
+            self.meta["dimension"] = self.dimension
+
+        start = self.ntotal
+        self._vectors_file.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        self.connection.executemany(
+            "INSERT INTO chunks (position, doc_id, title, content, sources) VALUES (?, ?, ?, ?, ?)",
+            (
+                (start + i, document.id, document.metadata["title"], document.page_content,
+                 json.dumps(document.metadata.get("sources", []), ensure_ascii=False))
+                for i, document in enumerate(documents)
+            )
+        )
+        self.connection.executemany(
+            "INSERT INTO chunks_fts (rowid, content) VALUES (?, ?)",
+            ((start + i, document.page_content) for i, document in enumerate(documents))
+        )
+        self._add_titles(document.metadata["title"] for document in documents)
+        self.ntotal += len(documents)
+
+        # Trained indexes take new vectors directly; a new IVF index is filled
+        # once it has been trained on all vectors (see build_index)
+        if self.index is not None and self.index.is_trained:
+            self._add_to_index(vectors, start)
+            self.meta["indexed_until"] = self.ntotal
+
+    def delete(self, doc_ids: Iterable[str]) -> int:
+        """Delete chunks by id; returns the number deleted."""
+        doc_ids = list(doc_ids)
+        positions = []
+        titles = set()
+        for start in range(0, len(doc_ids), 500):
+            batch = doc_ids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.connection.execute(
+                f"SELECT position, title, content FROM chunks WHERE doc_id IN ({placeholders})", batch).fetchall()
+            for position, title, _ in rows:
+                positions.append(position)
+                titles.add(title)
+            # The keyword index only holds the terms, so it's given the
+            # content to remove
+            self.connection.executemany(
+                "INSERT INTO chunks_fts (chunks_fts, rowid, content) VALUES ('delete', ?, ?)",
+                ((position, content) for position, _, content in rows)
+            )
+            self.connection.execute(f"DELETE FROM chunks WHERE doc_id IN ({placeholders})", batch)
+
+        # Drop the titles of articles that no longer have any chunk
+        self.connection.executemany(
+            "DELETE FROM titles WHERE title = ? AND NOT EXISTS (SELECT 1 FROM chunks WHERE chunks.title = ?)",
+            ((title, title) for title in titles)
+        )
+
+        if positions and self.index is not None and self.meta["index_type"] != "hnsw":
+            self.index.remove_ids(np.asarray(positions, dtype=np.int64))
+        # HNSW graphs and the flat vectors keep deleted positions; searches skip them
+        self.meta["deleted"] = self.meta.get("deleted", 0) + len(positions)
+        return len(positions)
+
+    def build_index(self) -> None:
+        """Create the approximate index from all vectors (full builds only).
+        IVF quantizers are trained on a random sample of the vectors first."""
+        if self.meta["index_type"] == "flat" or self.ntotal == 0:
+            return
+
+        vectors = self._vectors()
+        self.index = create_index(self.dimension, self.meta, count=self.ntotal)
+        if not self.index.is_trained:
+            sample_size = training_sample_size(self.meta, self.ntotal)
+            sample_rows = np.sort(np.random.default_rng(0).choice(self.ntotal, sample_size, replace=False))
+            print(f"Training {self.meta['index_type']} index on {sample_size} vectors...")
+            self.index.train(np.ascontiguousarray(vectors[sample_rows]))
+
+        block_size = 65536
+        for start in range(0, self.ntotal, block_size):
+            self._add_to_index(np.ascontiguousarray(vectors[start:start + block_size]), start)
+        self.meta["indexed_until"] = self.ntotal
+
+    def build_title_index(self) -> int:
+        """Rebuild the approximate title index from the committed titles."""
+        titles = [title for (title,) in self.connection.execute("SELECT title FROM titles")]
+        return TitleResolver.build(titles, os.path.join(self.path, TITLE_INDEX_DIR))
+
+    def commit(self) -> None:
+        """Make all changes durable, in crash-safe order."""
+        self._vectors_file.flush()
+        os.fsync(self._vectors_file.fileno())
+
+        self._set_state("ntotal", str(self.ntotal))
+        self.connection.commit()
+
+        if self.index is not None:
+            tmp_path = os.path.join(self.path, FAISS_INDEX_FILE + ".tmp")
+            faiss.write_index(self.index, tmp_path)
+            os.replace(tmp_path, os.path.join(self.path, FAISS_INDEX_FILE))
+
+        self.meta["ntotal"] = self.ntotal
+        self.meta["committed_at"] = time.time()  # Part of the index version
+        save_index_meta(self.path, self.meta)
+
+    def close(self) -> None:
+        self._vectors_file.close()
+        self.connection.close()
@@ -0,0 +1,202 @@
+# Jobs: Background Fact-Check Jobs with Progress Events
+# Long-running flows are submitted as jobs to a bounded worker pool, so the
+# request that starts them returns immediately with a job id. Each job keeps
+# the ordered list of events it produced (per-step progress, then its result
+# or error), which clients read by polling or stream as Server-Sent Events
+# Finished jobs are kept for a retention period and then forgotten
+# The durations of the flow steps, and of the work flows run alongside them,
+# are aggregated in step_timings for the metrics endpoint
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+import functools
+import threading
+import time
+import uuid
+
+# Callback the flows report their steps to: progress(step, status, details)
+ProgressCallback = Callable[[str, str, dict], None]
+
+@contextmanager
+def report_step(progress: Optional[ProgressCallback], step: str) -> Iterator[None]:
+    """Report a flow step as started, then finished (with its duration) or failed."""
+    start = time.perf_counter()
+    if progress is not None:
+        progress(step, "started", {})
+    try:
+        yield
+    except Exception:
+        if progress is not None:
+            progress(step, "failed", {"seconds": time.perf_counter() - start})
+        raise
+    if progress is not None:
+        progress(step, "finished", {"seconds": time.perf_counter() - start})
+
+class StepTimings:
+    """Thread-safe totals of the durations of flow steps, per flow.
+    Work that runs concurrently with a step records the time it took off
+    the critical path as saved seconds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._steps: dict[str, dict[str, list[float]]] = {}
+        self._saved: dict[str, dict[str, float]] = {}
+
+    def record(self, flow: str, step: str, seconds: float) -> None:
+        with self._lock:
+            totals = self._steps.setdefault(flow, {}).setdefault(step, [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+
+    def record_saved(self, flow: str, work: str, seconds: float) -> None:
+        with self._lock:
+            saved = self._saved.setdefault(flow, {})
+            saved[work] = saved.get(work, 0.0) + max(0.0, seconds)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                flow: {
+                    "steps": {step: {"count": count, "mean_seconds": total / count}
+                              for step, (count, total) in steps.items()},
+                    "saved_seconds": dict(self._saved.get(flow, {})),
+                }
+                for flow, steps in self._steps.items()
+            }
+
+step_timings = StepTimings()
+
+# Threads for the work flows overlap with their own steps (e.g. speculative
+# retrieval during the input analysis)
+overlap_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="overlap")
+
+def progress_step(method: Callable) -> Callable:
+    """Decorator for flow steps: reports the step, named after the method, to
+    the flow's _progress callback and records its duration in step_timings.
+    Goes below the @start/@listen decorator."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with report_step(getattr(self, "_progress", None), method.__name__):
+                return method(self, *args, **kwargs)
+        finally:
+            step_timings.record(type(self).__name__, method.__name__, time.perf_counter() - start)
+    return wrapper
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are queued or running."""
+
+class Job:
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._events: list[dict] = []
+        self._condition = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def _emit(self, event: str, data: dict) -> None:
+        with self._condition:
+            self._events.append({"event": event, "data": data})
+            self._condition.notify_all()
+
+    def progress(self, step: str, status: str, details: Optional[dict] = None) -> None:
+        """Record the progress of a flow step; usable as a flow's progress callback."""
+        self._emit("progress", {"step": step, "status": status, **(details or {})})
+
+    def _set_status(self, status: str) -> None:
+        self.status = status
+        self._emit("status", {"status": status})
+
+    def run(self, func: Callable[["Job"], Any]) -> None:
+        self._set_status("running")
+        try:
+            self.result = func(self)
+        except Exception as e:
+            print(f"Job {self.id} failed: {e}")
+            self.error = str(e)
+            self.finished_at = time.time()
+            self._emit("error", {"error": self.error})
+            self._set_status("failed")
+            return
+        self.finished_at = time.time()
+        self._emit("result", self.result)
+        self._set_status("done")
+
+    def wait_for_events(self, start: int, timeout: float) -> tuple[list[dict], bool]:
+        """Return the events from index start on, waiting up to timeout for new
+        ones, and whether the job had finished when they were read."""
+        with self._condition:
+            if len(self._events) <= start and not self.finished:
+                self._condition.wait(timeout)
+            return self._events[start:], self.finished
+
+    def to_dict(self) -> dict:
+        with self._condition:
+            steps = [event["data"] for event in self._events if event["event"] == "progress"]
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "steps": steps,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+class JobManager:
+    """Runs jobs on a fixed number of worker threads.
+    Args:
+        max_workers: Jobs running at the same time
+        max_pending: Jobs queued or running before new ones are rejected
+        retention: Seconds a finished job can still be read
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 100, retention: float = 3600):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention = retention
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _forget_expired(self) -> None:
+        now = time.time()
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished and now - job.finished_at > self.retention]:
+            del self._jobs[job_id]
+
+    def submit(self, kind: str, func: Callable[[Job], Any]) -> Job:
+        """Queue func(job) as a new job; raises JobQueueFull when the queue is full."""
+        with self._lock:
+            self._forget_expired()
+            pending = sum(not job.finished for job in self._jobs.values())
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} jobs are already pending")
+            job = Job(kind)
+            self._jobs[job.id] = job
+        self._executor.submit(job.run, func)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            **{status: statuses.count(status) for status in ("queued", "running", "done", "failed")},
+        }
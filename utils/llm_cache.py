@@ -0,0 +1,140 @@
+# LLM Cache: Memoized LLM Calls for the Agents
+# Wraps the call() method of the LLM objects given to the agents so that a
+# prompt that was already answered (same model, parameters and messages) is
+# served from a persistent SQLite cache instead of calling the model again;
+# e.g. translating the same summary or analyzing the same input twice
+# Keeps per-agent counters of the calls served from the cache and of the LLM
+# latency and tokens they saved. Anything with a call(messages) method and a
+# model attribute can be wrapped, so the cache can be exercised offline with
+# a stub LLM
+
+from crewai import LLM
+from dotenv import load_dotenv
+from utils.result_cache import ResultCache
+from typing import Any, Optional
+import hashlib
+import json
+import os
+import threading
+import time
+
+# The agents' LLMs are created on import, before the application loads .env
+load_dotenv()
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'llm.sqlite')
+
+class LLMCallStats:
+    """Thread-safe counters of one agent's LLM calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hits = 0
+        self.llm_seconds = 0.0
+        self.saved_seconds = 0.0
+        self.saved_tokens = 0
+
+    def record_miss(self, seconds: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.llm_seconds += seconds
+
+    def record_hit(self, saved_seconds: float, saved_tokens: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.hits += 1
+            self.saved_seconds += saved_seconds
+            self.saved_tokens += saved_tokens
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            misses = self.calls - self.hits
+            return {
+                "calls": self.calls,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.calls if self.calls else 0.0,
+                "mean_llm_seconds": self.llm_seconds / misses if misses else 0.0,
+                "saved_seconds": self.saved_seconds,
+                "saved_tokens": self.saved_tokens,
+            }
+
+_response_cache: Optional[ResultCache] = None
+_response_cache_lock = threading.Lock()
+_agent_stats: dict[str, LLMCallStats] = {}
+
+def get_response_cache() -> ResultCache:
+    """The shared response cache, configured from LLM_CACHE_PATH, LLM_CACHE_TTL
+    (seconds, 0 disables it) and LLM_CACHE_MAX_ENTRIES."""
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResultCache(
+                os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+                ttl=float(os.getenv("LLM_CACHE_TTL", "604800")),
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+            )
+        return _response_cache
+
+def prompt_key(llm: Any, messages: Any, params: dict) -> str:
+    """Hash of everything that determines the model's answer."""
+    payload = json.dumps({
+        "model": getattr(llm, "model", None),
+        "temperature": getattr(llm, "temperature", None),
+        "messages": messages,
+        "params": {key: value for key, value in params.items() if key != "callbacks"},
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def count_tokens(model: str, messages: Any, response: str) -> int:
+    """Prompt plus completion tokens; estimated from the length when the
+    model's tokenizer is not known to litellm."""
+    try:
+        import litellm
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        return (litellm.token_counter(model=model, messages=messages)
+                + litellm.token_counter(model=model, text=response))
+    except Exception:
+        return (len(json.dumps(messages, default=str)) + len(response)) // 4
+
+def memoize_llm(llm: Any, name: str, cache: Optional[ResultCache] = None) -> Any:
+    """Serve the LLM's repeated prompts from the cache. Returns the same
+    object, whose call() now consults the cache first."""
+    cache = cache if cache is not None else get_response_cache()
+    stats = _agent_stats.setdefault(name, LLMCallStats())
+    uncached_call = llm.call
+
+    def call(messages, *args, **kwargs):
+        # Positional extras are callbacks, which don't affect the answer
+        key = prompt_key(llm, messages, kwargs)
+        cached = cache.get(key)
+        if cached is not None:
+            stats.record_hit(cached["seconds"], cached["tokens"])
+            return cached["response"]
+
+        start = time.perf_counter()
+        response = uncached_call(messages, *args, **kwargs)
+        elapsed = time.perf_counter() - start
+        stats.record_miss(elapsed)
+
+        if isinstance(response, str) and response:
+            cache.put(key, {
+                "response": response,
+                "seconds": elapsed,
+                "tokens": count_tokens(getattr(llm, "model", ""), messages, response),
+            })
+        return response
+
+    llm.call = call
+    return llm
+
+def create_llm(name: str, **params) -> LLM:
+    """Create the memoized LLM of an agent, with the configured model."""
+    return memoize_llm(LLM(model=os.getenv("OPENAI_MODEL_NAME", "gpt-4o-mini"), **params), name)
+
+def llm_cache_stats() -> dict:
+    """Per-agent counters and the state of the shared response cache."""
+    return {
+        "agents": {name: stats.to_dict() for name, stats in _agent_stats.items()},
+        "store": get_response_cache().stats(),
+    }
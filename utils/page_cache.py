@@ -0,0 +1,207 @@
+# Page Cache: Compressed On-Disk Cache of Retrieved Web Pages
+# Keeps the extracted text of the pages read by the internet retrieval tool
+# in SQLite, keyed by normalized URL, so popular pages (encyclopedias, news
+# sites) are not downloaded and parsed again for every fact check
+# Text is stored zlib-compressed and content-addressed: mirrors serving the
+# same text share one blob. Pages are served as they are for a TTL; after
+# that, pages with an ETag or Last-Modified are revalidated with a
+# conditional request, which costs no body when they haven't changed. The
+# least recently used pages are evicted when the blobs exceed a byte budget
+
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'pages.sqlite')
+TRACKING_PARAMETERS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL: lowercase scheme and host, no default port,
+    fragment or tracking parameters, and sorted query parameters."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if not key.lower().startswith(TRACKING_PARAMETERS))
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+class PageCache:
+    """Disk-backed, thread-safe cache of extracted page text.
+    Args:
+        path: SQLite database file
+        ttl: Seconds a page is served without revalidation (0 disables the cache)
+        max_bytes: Compressed bytes kept before the least recently used pages are evicted
+    """
+
+    def __init__(self, path: str, ttl: float = 86400, max_bytes: int = 256 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                downloaded_bytes INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+            CREATE INDEX IF NOT EXISTS pages_content_hash ON pages (content_hash);
+            CREATE TABLE IF NOT EXISTS blobs (
+                content_hash TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                text_bytes INTEGER NOT NULL
+            );
+        """)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._revalidated = 0
+        self._misses = 0
+        self._evictions = 0
+        self._bytes_saved = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, url: str) -> Optional[dict]:
+        """The cached page (title, blocks, etag, last_modified) and whether
+        it is still fresh; None when the URL isn't cached."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            row = self._connection.execute("""
+                SELECT pages.etag, pages.last_modified, pages.fetched_at, pages.downloaded_bytes, blobs.data
+                FROM pages JOIN blobs ON blobs.content_hash = pages.content_hash
+                WHERE pages.url = ?
+            """, (normalize_url(url),)).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, fetched_at, downloaded_bytes, data = row
+        page = json.loads(zlib.decompress(data))
+        return {
+            **page,
+            "etag": etag,
+            "last_modified": last_modified,
+            "downloaded_bytes": downloaded_bytes,
+            "fresh": time.time() - fetched_at < self.ttl,
+        }
+
+    def conditional_headers(self, page: Optional[dict]) -> dict:
+        """Headers revalidating a stale cached page."""
+        headers = {}
+        if page is not None and not page["fresh"]:
+            if page["etag"]:
+                headers["If-None-Match"] = page["etag"]
+            if page["last_modified"]:
+                headers["If-Modified-Since"] = page["last_modified"]
+        return headers
+
+    def record_hit(self, url: str, page: dict, revalidated: bool = False) -> None:
+        """Count a page served from the cache; a revalidated page is fresh again."""
+        now = time.time()
+        with self._lock:
+            if revalidated:
+                self._revalidated += 1
+                self._connection.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                                         (now, now, normalize_url(url)))
+            else:
+                self._hits += 1
+                self._connection.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (now, normalize_url(url)))
+            self._bytes_saved += page["downloaded_bytes"]
+            self._connection.commit()
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self._misses += 1
+
+    def put(self, url: str, title: str, blocks: list[str], etag: Optional[str] = None,
+            last_modified: Optional[str] = None, downloaded_bytes: int = 0) -> None:
+        """Cache the extracted text of a page."""
+        if not self.enabled:
+            return
+        text = json.dumps({"title": title, "blocks": blocks}, ensure_ascii=False).encode("utf-8")
+        content_hash = hashlib.sha256(text).hexdigest()
+        data = zlib.compress(text, 6)
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO blobs (content_hash, data, size, text_bytes) VALUES (?, ?, ?, ?)",
+                (content_hash, data, len(data), len(text))
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO pages (url, content_hash, etag, last_modified, downloaded_bytes, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (normalize_url(url), content_hash, etag, last_modified, downloaded_bytes, now, now)
+            )
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        """Drop the least recently used pages until the blobs fit the budget."""
+        self._delete_orphan_blobs()
+        (total,) = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        while total > self.max_bytes:
+            rows = self._connection.execute("SELECT url FROM pages ORDER BY accessed_at LIMIT 16").fetchall()
+            if not rows:
+                break
+            self._connection.executemany("DELETE FROM pages WHERE url = ?", rows)
+            self._evictions += len(rows)
+            self._delete_orphan_blobs()
+            (total,) = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()
+
+    def _delete_orphan_blobs(self) -> None:
+        self._connection.execute(
+            "DELETE FROM blobs WHERE content_hash NOT IN (SELECT content_hash FROM pages)"
+        )
+
+    def stats(self) -> dict:
+        """Return hit/miss counters, the downloads saved and the store size."""
+        with self._lock:
+            pages, = self._connection.execute("SELECT COUNT(*) FROM pages").fetchone()
+            stored, text_bytes = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0), COALESCE(SUM(text_bytes), 0) FROM blobs"
+            ).fetchone()
+            lookups = self._hits + self._revalidated + self._misses
+            return {
+                "hits": self._hits,
+                "revalidated": self._revalidated,
+                "misses": self._misses,
+                "hit_rate": (self._hits + self._revalidated) / lookups if lookups else 0.0,
+                "bytes_saved": self._bytes_saved,
+                "evictions": self._evictions,
+                "pages": pages,
+                "stored_bytes": stored,
+                "compression_ratio": text_bytes / stored if stored else 0.0,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+            }
+
+_page_cache: Optional[PageCache] = None
+_page_cache_lock = threading.Lock()
+
+def get_page_cache() -> PageCache:
+    """The shared page cache, configured from PAGE_CACHE_PATH, PAGE_CACHE_TTL
+    (seconds, 0 disables it) and PAGE_CACHE_MAX_BYTES."""
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageCache(
+                os.getenv("PAGE_CACHE_PATH", DEFAULT_CACHE_PATH),
+                ttl=float(os.getenv("PAGE_CACHE_TTL", "86400")),
+                max_bytes=int(os.getenv("PAGE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+            )
+        return _page_cache
@@ -0,0 +1,183 @@
+# Reranking: Compact Evidence for the Fact Verifier
+# The RAG search returns the top hits of every query (the request, each fact
+# and each question), which can add up to dozens of 1000-character chunks in
+# the verification prompt. This stage scores that candidate pool against the
+# request and the verification facts and keeps the best passages within
+# RERANK_TOP_N passages and RERANK_TOKEN_BUDGET (estimated) tokens:
+# - Scores combine the cosine similarity of the chunk's stored index vector
+#   to each query with the share of the query's terms found in the chunk,
+#   which rewards exact names, dates and numbers. Setting RERANK_MODEL to a
+#   sentence-transformers cross-encoder (e.g.
+#   cross-encoder/ms-marco-MiniLM-L-6-v2) scores the pairs with it instead
+# - The best passage of each query is kept first, so every fact keeps its
+#   evidence, then the best scored passages overall
+# - Kept chunks that are neighbors in the same article are collapsed into one
+#   passage, without the text the chunk overlap repeats
+
+from langchain_core.documents import Document
+from utils.extractive import estimate_tokens
+from utils.sparse_search import terms
+from typing import Optional
+import numpy as np
+import os
+import threading
+import time
+
+LEXICAL_WEIGHT = 0.3
+MAX_OVERLAP = 300
+
+def lexical_scores(queries: list[str], texts: list[str]) -> np.ndarray:
+    """Share of each query's terms found in each text (queries x texts)."""
+    text_terms = [terms(text) for text in texts]
+    scores = np.zeros((len(queries), len(texts)), dtype=np.float32)
+    for i, query in enumerate(queries):
+        query_terms = terms(query)
+        if query_terms:
+            scores[i] = [len(query_terms & words) / len(query_terms) for words in text_terms]
+    return scores
+
+_cross_encoder = None
+_cross_encoder_lock = threading.Lock()
+
+def get_cross_encoder(model_name: str):
+    """The cross-encoder named by RERANK_MODEL, loaded on first use."""
+    global _cross_encoder
+    with _cross_encoder_lock:
+        if _cross_encoder is None or _cross_encoder[0] != model_name:
+            from sentence_transformers import CrossEncoder
+            _cross_encoder = (model_name, CrossEncoder(model_name))
+        return _cross_encoder[1]
+
+def score_passages(queries: list[str], texts: list[str], query_vectors: np.ndarray,
+                   text_vectors: np.ndarray) -> np.ndarray:
+    """Relevance of each text to each query (queries x texts)."""
+    model_name = os.getenv("RERANK_MODEL")
+    if model_name:
+        pairs = [(query, text) for query in queries for text in texts]
+        return np.asarray(get_cross_encoder(model_name).predict(pairs), dtype=np.float32).reshape(len(queries), len(texts))
+
+    query_vectors = query_vectors / np.maximum(np.linalg.norm(query_vectors, axis=1, keepdims=True), 1e-12)
+    text_vectors = text_vectors / np.maximum(np.linalg.norm(text_vectors, axis=1, keepdims=True), 1e-12)
+    return query_vectors @ text_vectors.T + LEXICAL_WEIGHT * lexical_scores(queries, texts)
+
+def select_passages(scores: np.ndarray, costs: list[int], top_n: int, token_budget: int) -> list[int]:
+    """Indices of the passages to keep: the best one of each query first, then
+    the best overall, while they fit top_n and token_budget. The best passage
+    is always kept."""
+    order = []
+    for row in scores:
+        best = int(np.argmax(row))
+        if best not in order:
+            order.append(best)
+    order += [int(i) for i in np.argsort(-scores.max(axis=0), kind="stable") if int(i) not in order]
+
+    selected, used = [], 0
+    for i in order:
+        if len(selected) == top_n:
+            break
+        if selected and used + costs[i] > token_budget:
+            continue
+        selected.append(i)
+        used += costs[i]
+    return selected
+
+def join_overlapping(first: str, second: str) -> str:
+    """Join consecutive chunks, dropping the start of the second chunk that
+    repeats the end of the first."""
+    for length in range(min(MAX_OVERLAP, len(first), len(second)), 0, -1):
+        if first.endswith(second[:length]):
+            return first + second[length:]
+    return f"{first} {second}"
+
+def collapse_neighbors(docs: list[Document], scores: list[float]) -> list[tuple[float, Document]]:
+    """Merge the chunks that are consecutive in the same article (by index
+    position) into single passages, scored as their best chunk, best first."""
+    groups: list[list[int]] = []
+    by_position = sorted(
+        (i for i in range(len(docs)) if docs[i].metadata.get("position") is not None),
+        key=lambda i: docs[i].metadata["position"]
+    )
+    for i in by_position:
+        previous = docs[groups[-1][-1]] if groups else None
+        if (previous is not None and previous.metadata.get("title") == docs[i].metadata.get("title")
+                and docs[i].metadata["position"] == previous.metadata["position"] + 1):
+            groups[-1].append(i)
+        else:
+            groups.append([i])
+    groups += [[i] for i in range(len(docs)) if docs[i].metadata.get("position") is None]
+
+    passages = []
+    for group in groups:
+        content = docs[group[0]].page_content
+        for i in group[1:]:
+            content = join_overlapping(content, docs[i].page_content)
+        passages.append((max(scores[i] for i in group), Document(page_content=content, metadata=docs[group[0]].metadata)))
+    return sorted(passages, key=lambda passage: -passage[0])
+
+def rerank(queries: list[str], docs: list[Document], query_vectors: np.ndarray, doc_vectors: np.ndarray,
+           top_n: int = 8, token_budget: int = 2000) -> tuple[list[Document], dict]:
+    """Keep the passages of docs most relevant to the queries, neighbors
+    collapsed, best first. Returns them and a report of the reranking."""
+    start = time.perf_counter()
+    report = {
+        "candidates": len(docs),
+        "input_tokens": sum(estimate_tokens(doc.page_content) for doc in docs),
+    }
+    if not docs or not queries:
+        return docs, {**report, "passages": len(docs), "output_tokens": report["input_tokens"],
+                      "seconds": time.perf_counter() - start}
+
+    texts = [doc.page_content for doc in docs]
+    scores = score_passages(queries, texts, query_vectors, doc_vectors)
+    selected = select_passages(scores, [estimate_tokens(text) for text in texts], top_n, token_budget)
+    passages = collapse_neighbors([docs[i] for i in selected], [float(scores[:, i].max()) for i in selected])
+
+    kept = [doc for _, doc in passages]
+    report.update({
+        "passages": len(kept),
+        "output_tokens": sum(estimate_tokens(doc.page_content) for doc in kept),
+        "seconds": time.perf_counter() - start,
+    })
+    return kept, report
+
+def rerank_settings() -> Optional[tuple[int, int]]:
+    """(top_n, token_budget) from RERANK_TOP_N and RERANK_TOKEN_BUDGET, or
+    None when RERANK=0 disables the reranking."""
+    if os.getenv("RERANK", "1") == "0":
+        return None
+    return int(os.getenv("RERANK_TOP_N", "8")), int(os.getenv("RERANK_TOKEN_BUDGET", "2000"))
+
+class RerankStats:
+    """Thread-safe totals of the rerankings made, for the metrics endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.searches = 0
+        self.candidates = 0
+        self.passages = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.seconds = 0.0
+
+    def record(self, report: dict) -> None:
+        with self._lock:
+            self.searches += 1
+            self.candidates += report["candidates"]
+            self.passages += report["passages"]
+            self.input_tokens += report["input_tokens"]
+            self.output_tokens += report["output_tokens"]
+            self.seconds += report["seconds"]
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "searches": self.searches,
+                "mean_candidates": self.candidates / self.searches if self.searches else 0.0,
+                "mean_passages": self.passages / self.searches if self.searches else 0.0,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "reduction": 1 - self.output_tokens / self.input_tokens if self.input_tokens else 0.0,
+                "mean_seconds": self.seconds / self.searches if self.searches else 0.0,
+            }
+
+rerank_stats = RerankStats()
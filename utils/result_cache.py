@@ -0,0 +1,124 @@
+# Result Cache: Persistent Cache of Fact-Check Results
+# Stores finished fact-check responses in SQLite, keyed by the normalized
+# statement, the version of the unified index and the LLM model name, so a
+# repeated claim is answered without running the flow again and a rebuilt
+# index or a different model never serves an outdated verdict
+# Entries expire after a TTL, and the least recently used ones are evicted
+# when the cache grows past its maximum number of entries
+
+from typing import Optional
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+class ResultCache:
+    """Disk-backed, thread-safe cache of JSON results.
+    Args:
+        path: SQLite database file
+        ttl: Seconds an entry is served after it was stored (0 disables the cache)
+        max_entries: Entries kept before the least recently used are evicted
+    """
+
+    def __init__(self, path: str, ttl: float = 86400, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at);
+        """)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def normalize(statement: str) -> str:
+        """Normalize a statement so re-cased or re-spaced repeats share a key."""
+        return ' '.join(statement.split()).lower().rstrip('.!?¡¿ ')
+
+    @classmethod
+    def make_key(cls, kind: str, statement: str, index_version: str, model: str) -> str:
+        payload = json.dumps([kind, cls.normalize(statement), index_version, model])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached result, or None if it is missing or expired."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._connection.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._connection.commit()
+                self._misses += 1
+                return None
+            self._connection.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self._connection.commit()
+            self._hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: dict) -> None:
+        """Store a result, evicting expired and least recently used entries."""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self._connection.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl,))
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM results").fetchone()
+            if count > self.max_entries:
+                self._connection.execute(
+                    "DELETE FROM results WHERE key IN "
+                    "(SELECT key FROM results ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+                self._evictions += count - self.max_entries
+            self._connection.commit()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current number of entries."""
+        with self._lock:
+            (size,) = self._connection.execute("SELECT COUNT(*) FROM results").fetchone()
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "size": size,
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+            }
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'results.sqlite')
+
+def create_result_cache() -> ResultCache:
+    """Create the fact-check result cache configured from RESULT_CACHE_PATH,
+    RESULT_CACHE_TTL (0 disables it) and RESULT_CACHE_MAX_ENTRIES."""
+    return ResultCache(
+        os.getenv("RESULT_CACHE_PATH", DEFAULT_CACHE_PATH),
+        ttl=float(os.getenv("RESULT_CACHE_TTL", "86400")),
+        max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000"))
+    )
@@ -0,0 +1,127 @@
+# Semantic Cache: Verdicts of Near-Duplicate Claims
+# Keeps the verdicts of recently checked claims in a small in-memory FAISS
+# index of their English statements, so a paraphrase of a claim that was
+# already checked ("Paris is home to the Eiffel Tower") reuses its verdict
+# instead of running retrieval and verification again
+# A hit requires a cosine similarity above the threshold and the same numbers
+# and negations in both statements, which sentence embeddings barely tell
+# apart; the cache holds at most max_entries claims, evicting the least
+# recently used
+
+from collections import OrderedDict
+from utils.embeddings import CachedEmbeddings
+from typing import Optional
+import numpy as np
+import faiss
+import os
+import re
+import threading
+
+NUMBER_PATTERN = re.compile(r'\d+(?:[.,]\d+)*')
+NEGATION_WORDS = {"not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "without"}
+
+def claim_signature(text: str) -> tuple[tuple[str, ...], bool]:
+    """Numbers and negation parity of a statement; cached verdicts are only
+    reused between statements with the same signature."""
+    lowered = text.lower()
+    words = re.findall(r"[a-z']+", lowered)
+    negations = sum(word in NEGATION_WORDS or word.endswith("n't") for word in words)
+    return tuple(sorted(NUMBER_PATTERN.findall(lowered))), negations % 2 == 1
+
+class SemanticCache:
+    """Nearest-neighbor cache of verdicts keyed by English claims.
+    Args:
+        embeddings: The shared embedding service
+        threshold: Minimum cosine similarity for a hit
+        max_entries: Claims kept before the least recently used is evicted
+    """
+
+    def __init__(self, embeddings: CachedEmbeddings, threshold: float = 0.95, max_entries: int = 2000):
+        self._embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._index: Optional[faiss.IndexIDMap2] = None
+        self._entries: OrderedDict[int, tuple[str, str, dict]] = OrderedDict()  # id -> (version, claim, value)
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _embed(self, claim: str) -> np.ndarray:
+        vector = np.asarray([self._embeddings.embed_query(claim)], dtype=np.float32)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def get(self, claim: str, version: str = "") -> Optional[dict]:
+        """Return the verdict of the most similar cached claim, or None.
+        Entries stored under another version (index or model) never match."""
+        if not self.enabled:
+            return None
+        vector = self._embed(claim)
+        signature = claim_signature(claim)
+        with self._lock:
+            if self._index is not None and self._index.ntotal:
+                scores, ids = self._index.search(vector, min(4, self._index.ntotal))
+                for score, entry_id in zip(scores[0], ids[0]):
+                    if entry_id == -1 or score < self.threshold:
+                        break
+                    entry_version, cached_claim, value = self._entries[int(entry_id)]
+                    if entry_version != version:
+                        continue
+                    if claim_signature(cached_claim) != signature:
+                        self._rejected += 1
+                        continue
+                    self._entries.move_to_end(int(entry_id))
+                    self._hits += 1
+                    print(f"Semantic cache hit ({score:.3f}): {cached_claim}")
+                    return value
+            self._misses += 1
+        return None
+
+    def put(self, claim: str, value: dict, version: str = "") -> None:
+        """Cache the verdict of a claim."""
+        if not self.enabled:
+            return
+        vector = self._embed(claim)
+        with self._lock:
+            if self._index is None:
+                self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vector, np.array([entry_id], dtype=np.int64))
+            self._entries[entry_id] = (version, claim, value)
+
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+            if evicted:
+                self._index.remove_ids(np.array(evicted, dtype=np.int64))
+
+    def stats(self) -> dict:
+        """Return hit/miss counters; rejected counts similar claims whose
+        numbers or negation differed."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "rejected": self._rejected,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+            }
+
+def create_semantic_cache(embeddings: CachedEmbeddings) -> SemanticCache:
+    """Create a cache configured from SEMANTIC_CACHE_THRESHOLD and
+    SEMANTIC_CACHE_SIZE (0 disables it)."""
+    return SemanticCache(
+        embeddings,
+        threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+        max_entries=int(os.getenv("SEMANTIC_CACHE_SIZE", "2000"))
+    )
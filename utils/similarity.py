@@ -0,0 +1,42 @@
+# Similarity Utility: Confidence Scoring
+# Measures how well the evidence fragments match the query, as the maximum
+# cosine similarity (normalized dot product) between their embeddings
+# Reuses already known fragment vectors and only encodes the rest
+
+from utils.embeddings import embeddings
+from typing import Callable, List, Optional
+import numpy as np
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length, leaving all-zero rows untouched."""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+def confidence_score(
+    query: str,
+    fragments: List[str],
+    vector_lookup: Optional[Callable[[List[str]], List[Optional[np.ndarray]]]] = None
+) -> float:
+    """Calculate the confidence score between a query and evidence fragments.
+    Args:
+        query: The request in English
+        fragments: Evidence fragments cited by the fact verifier
+        vector_lookup: Optional function returning a known vector (or None)
+            for each fragment, e.g. SearchManager.lookup_vectors
+    """
+    if not fragments:
+        return 0.0
+
+    vectors = list(vector_lookup(fragments)) if vector_lookup else [None] * len(fragments)
+
+    # Encode only the fragments without a known vector
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        encoded = embeddings.embed_documents([fragments[i] for i in missing])
+        for i, vector in zip(missing, encoded):
+            vectors[i] = vector
+
+    query_vector = _normalize_rows(np.asarray(embeddings.embed_query(query), dtype=np.float32))
+    fragments_matrix = _normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+    return float(np.max(fragments_matrix @ query_vector))
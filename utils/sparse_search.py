@@ -0,0 +1,47 @@
+# Sparse Search: Keyword Queries and Rank Fusion
+# Dense MiniLM retrieval matches meaning, and misses claims that hinge on an
+# exact name, date or number. The index also keeps a BM25 keyword index of
+# the chunks (an SQLite FTS5 table in the docstore, see utils.index_store);
+# this module turns claims into its queries and fuses its rankings with the
+# FAISS ones by reciprocal rank fusion
+# Kept free of the embedding model, so the index store can import it
+
+from typing import Iterable
+import re
+import unicodedata
+
+# Reciprocal rank fusion constant: larger values flatten the weight of the
+# top ranks
+RRF_K = 60
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "of", "in", "on", "at", "to", "for", "from", "by", "with", "as",
+    "is", "are", "was", "were", "be", "been", "being", "has", "have", "had", "do", "does", "did",
+    "it", "its", "this", "that", "these", "those", "he", "she", "they", "his", "her", "their",
+    "which", "who", "what", "when", "where", "how", "not", "no", "true", "than", "then", "also",
+}
+
+def terms(text: str) -> set[str]:
+    """Lowercase words of a text, without stopwords."""
+    return {word for word in re.findall(r'\w+', text.lower()) if word not in STOPWORDS}
+
+def query_terms(text: str) -> list[str]:
+    """Terms of a query as the keyword index stores them (lowercase, without
+    diacritics), stopwords removed, in order of appearance."""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return list(dict.fromkeys(word for word in re.findall(r'\w+', text) if word not in STOPWORDS))
+
+def match_expression(query_terms: Iterable[str]) -> str:
+    """FTS5 query matching chunks with any of the terms, each quoted so it's
+    never read as an operator."""
+    return " OR ".join('"' + term.replace('"', '""') + '"' for term in query_terms)
+
+def reciprocal_rank_fusion(rankings: list[list[int]], k: int) -> list[int]:
+    """Fuse rankings of index positions into the top k positions, scoring each
+    by the sum of 1 / (RRF_K + rank) over the rankings it appears in."""
+    scores: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, position in enumerate(ranking, 1):
+            scores[position] = scores.get(position, 0.0) + 1.0 / (RRF_K + rank)
+    return sorted(scores, key=lambda position: -scores[position])[:k]
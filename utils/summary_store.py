@@ -0,0 +1,130 @@
+# Summary Store: Persistent Article Summaries by Title and Language
+# Summaries of an article only change when the index or the model does, so
+# the ones generated for /api/summarize-source (or pre-generated in bulk by
+# flows/pregenerate_summaries.py) are stored in SQLite, keyed by canonical
+# article title, target language and version, and served without running
+# the crews again
+# The store also counts how often fact checks cite each article, which
+# decides the articles worth pre-generating
+
+from typing import Optional
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'summaries.sqlite')
+
+# Language codes the clients may send instead of the language names
+LANGUAGE_CODES = {
+    "en": "english", "es": "spanish", "fr": "french", "de": "german", "it": "italian", "pt": "portuguese",
+    "zh": "chinese", "ja": "japanese", "ko": "korean", "ar": "arabic", "ru": "russian",
+}
+
+def normalize_language(language: str) -> str:
+    """Canonical language key: the lowercase language name."""
+    language = language.strip().lower()
+    return LANGUAGE_CODES.get(language, language)
+
+class SummaryStore:
+    """Disk-backed, thread-safe store of article summaries.
+    Args:
+        path: SQLite database file
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                title TEXT NOT NULL,
+                language TEXT NOT NULL,
+                version TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                reduction TEXT,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (title, language, version)
+            );
+            CREATE TABLE IF NOT EXISTS citations (
+                title TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            );
+        """)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, title: str, language: str, version: str) -> Optional[dict]:
+        """The stored summary (summary, reduction) or None."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT summary, reduction FROM summaries WHERE title = ? AND language = ? AND version = ?",
+                (title, normalize_language(language), version)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        return {"summary": row[0], "reduction": json.loads(row[1]) if row[1] else {}}
+
+    def has(self, title: str, language: str, version: str) -> bool:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT 1 FROM summaries WHERE title = ? AND language = ? AND version = ?",
+                (title, normalize_language(language), version)
+            ).fetchone() is not None
+
+    def put(self, title: str, language: str, version: str, summary: str, reduction: Optional[dict] = None) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO summaries (title, language, version, summary, reduction, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (title, normalize_language(language), version, summary,
+                 json.dumps(reduction) if reduction else None, time.time())
+            )
+            self._connection.commit()
+
+    def record_citations(self, titles: list[str]) -> None:
+        """Count one citation of each (canonical) title."""
+        if not titles:
+            return
+        with self._lock:
+            self._connection.executemany(
+                "INSERT INTO citations (title, count) VALUES (?, 1) "
+                "ON CONFLICT (title) DO UPDATE SET count = count + 1",
+                [(title,) for title in titles]
+            )
+            self._connection.commit()
+
+    def most_cited(self, limit: int) -> list[str]:
+        """The most cited titles, most cited first."""
+        with self._lock:
+            return [title for (title,) in self._connection.execute(
+                "SELECT title FROM citations ORDER BY count DESC, title LIMIT ?", (limit,)
+            )]
+
+    def stats(self) -> dict:
+        with self._lock:
+            summaries, = self._connection.execute("SELECT COUNT(*) FROM summaries").fetchone()
+            cited, = self._connection.execute("SELECT COUNT(*) FROM citations").fetchone()
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "summaries": summaries,
+                "cited_articles": cited,
+            }
+
+_summary_store: Optional[SummaryStore] = None
+_summary_store_lock = threading.Lock()
+
+def get_summary_store() -> SummaryStore:
+    """The shared summary store, at SUMMARY_STORE_PATH."""
+    global _summary_store
+    with _summary_store_lock:
+        if _summary_store is None:
+            _summary_store = SummaryStore(os.getenv("SUMMARY_STORE_PATH", DEFAULT_STORE_PATH))
+        return _summary_store
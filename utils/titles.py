@@ -0,0 +1,176 @@
+# Title Utility: Normalization of Wikipedia Article Titles
+# Titles cited by the agents are matched against the indexed articles after
+# removing accents, case, punctuation and extra whitespace; the same
+# normalization is applied when the title index is built
+
+from array import array
+from typing import Iterable, Optional
+import numpy as np
+import os
+import re
+import shutil
+import unicodedata
+
+def normalize_title(text: str) -> str:
+    """Normalize a title for matching."""
+    # Remove accents and convert to lowercase
+    text = ''.join(c for c in unicodedata.normalize('NFKD', text)
+                  if not unicodedata.combining(c))
+    text = text.lower()
+
+    # Remove special characters and extra whitespace
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+# Title Resolver: Approximate Title Matching
+# Agents often cite a source with a qualifier or slightly different wording
+# ("Eiffel Tower (Paris)"). Titles are matched by the trigrams of their
+# normalized form through an inverted index built with the unified index and
+# stored as memory-mapped arrays:
+# - keys.npy: sorted trigram codes
+# - offsets.npy: start of each trigram's posting list in postings.npy
+# - postings.npy: title ids, grouped by trigram
+# - text.npy / text_offsets.npy: UTF-8 titles, by id
+# Only the rarest trigrams of a query are used to collect candidates, which
+# bounds the work per lookup; candidates are then ranked by Dice similarity.
+# A citation only resolves when its best match is close and clearly ahead of
+# the runner-up: an ambiguous one ("Paris" among "Paris Hilton" and "Paris
+# Commune") stays unresolved rather than naming the wrong article.
+
+TITLE_INDEX_DIR = "title_index"
+TITLE_INDEX_ARRAYS = ("keys", "offsets", "postings", "text", "text_offsets")
+
+# Queries shorter than this, or of a single word, get no prefix bonus: a
+# short name is the prefix of too many unrelated titles
+PREFIX_BONUS_MIN_LENGTH = 12
+
+# Trailing qualifier between parentheses, as in "Eiffel Tower (Paris)"
+PARENTHETICAL_PATTERN = re.compile(r'\s*\([^()]*\)\s*$')
+
+def title_trigrams(normalized: str) -> set[str]:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _trigram_code(trigram: str) -> int:
+    """Pack a trigram into an int64 (21 bits per code point)."""
+    a, b, c = (ord(char) for char in trigram)
+    return (a << 42) | (b << 21) | c
+
+class TitleResolver:
+    """Resolve cited titles to the closest indexed article title.
+    Args:
+        path: Title index directory written by TitleResolver.build
+        min_score: Minimum similarity for a match
+        min_margin: Minimum lead of the best match over the runner-up
+        max_postings: Posting entries read per lookup
+        candidates: Candidates ranked by exact similarity per lookup
+    """
+
+    def __init__(self, path: str, min_score: float = 0.75, min_margin: float = 0.1, max_postings: int = 10000,
+                 candidates: int = 16):
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in TITLE_INDEX_ARRAYS}
+        self._keys = arrays["keys"]
+        self._offsets = arrays["offsets"]
+        self._postings = arrays["postings"]
+        self._text = arrays["text"]
+        self._text_offsets = arrays["text_offsets"]
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.max_postings = max_postings
+        self.candidates = candidates
+
+    def __len__(self) -> int:
+        return len(self._text_offsets) - 1
+
+    @staticmethod
+    def build(titles: Iterable[str], path: str) -> int:
+        """Write the title index of the given titles to path; returns the number of titles."""
+        titles = sorted(set(titles))
+        codes = array('q')
+        lengths = []
+        for title in titles:
+            title_codes = {_trigram_code(trigram) for trigram in title_trigrams(normalize_title(title))}
+            codes.extend(title_codes)
+            lengths.append(len(title_codes))
+
+        codes = np.frombuffer(codes, dtype=np.int64) if codes else np.zeros(0, dtype=np.int64)
+        title_ids = np.repeat(np.arange(len(titles), dtype=np.int32), lengths)
+        order = np.argsort(codes, kind='stable')
+        keys, starts = np.unique(codes[order], return_index=True)
+
+        encoded = [title.encode('utf-8') for title in titles]
+        text_offsets = np.zeros(len(titles) + 1, dtype=np.int64)
+        np.cumsum([len(title) for title in encoded], out=text_offsets[1:])
+
+        arrays = {
+            "keys": keys,
+            "offsets": np.append(starts, len(codes)).astype(np.int64),
+            "postings": title_ids[order],
+            "text": np.frombuffer(b''.join(encoded), dtype=np.uint8),
+            "text_offsets": text_offsets,
+        }
+
+        # Written next to the current index and swapped in
+        tmp_path = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name, values in arrays.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), values)
+        shutil.rmtree(path, ignore_errors=True)
+        os.rename(tmp_path, path)
+        return len(titles)
+
+    def title(self, title_id: int) -> str:
+        start, end = self._text_offsets[title_id], self._text_offsets[title_id + 1]
+        return bytes(self._text[start:end]).decode('utf-8')
+
+    def search(self, title: str, limit: int = 5) -> list[tuple[str, float]]:
+        """Return up to limit (title, score) pairs, best first.
+        The score is the Dice coefficient of the trigram sets, plus a bonus
+        when one normalized title is a prefix of the other at a word boundary
+        (for queries of several words and PREFIX_BONUS_MIN_LENGTH characters)."""
+        normalized = normalize_title(title)
+        query_trigrams = title_trigrams(normalized)
+        if not normalized or len(self._keys) == 0:
+            return []
+
+        codes = np.array(sorted(_trigram_code(trigram) for trigram in query_trigrams), dtype=np.int64)
+        slots = np.minimum(np.searchsorted(self._keys, codes), len(self._keys) - 1)
+        slots = slots[self._keys[slots] == codes]
+        if len(slots) == 0:
+            return []
+
+        # Collect candidates from the rarest trigrams first
+        starts, ends = self._offsets[slots], self._offsets[slots + 1]
+        lists, total = [], 0
+        for i in np.argsort(ends - starts, kind='stable'):
+            if lists and total + ends[i] - starts[i] > self.max_postings:
+                break
+            lists.append(self._postings[starts[i]:ends[i]])
+            total += ends[i] - starts[i]
+        candidate_ids, counts = np.unique(np.concatenate(lists), return_counts=True)
+        candidate_ids = candidate_ids[np.argsort(-counts, kind='stable')[:self.candidates]]
+
+        prefix_bonus = " " in normalized and len(normalized) >= PREFIX_BONUS_MIN_LENGTH
+        scored = []
+        for title_id in candidate_ids:
+            candidate = self.title(int(title_id))
+            candidate_normalized = normalize_title(candidate)
+            candidate_trigrams = title_trigrams(candidate_normalized)
+            score = 2 * len(query_trigrams & candidate_trigrams) / (len(query_trigrams) + len(candidate_trigrams))
+            if prefix_bonus and (candidate_normalized.startswith(normalized + " ")
+                                 or normalized.startswith(candidate_normalized + " ")):
+                score = min(1.0, score + 0.1)
+            scored.append((candidate, score))
+        scored.sort(key=lambda pair: -pair[1])
+        return scored[:limit]
+
+    def resolve(self, title: str) -> Optional[str]:
+        """Return the best matching indexed title, or None if none is close
+        enough or the runner-up is within min_margin of it (ambiguous)."""
+        matches = self.search(title, limit=2)
+        if not matches or matches[0][1] < self.min_score:
+            return None
+        if len(matches) > 1 and matches[0][1] - matches[1][1] < self.min_margin:
+            return None
+        return matches[0][0]
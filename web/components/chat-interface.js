@@ -274,6 +274,9 @@ const ChatInterface = {
             </template>
           </q-input>
         </div>
+        <div v-if="loading && progressText" class="text-caption text-grey q-px-md q-pt-xs">
+          {{ progressText }}...
+        </div>
       </div>
     </div>
   `,
@@ -282,6 +285,7 @@ const ChatInterface = {
       messages: [],
       newMessage: '',
       loading: false,
+      progressText: '',
       lastUserMessage: null,
       sourceMenus: {},
       menuTargets: {},
@@ -332,7 +336,7 @@ const ChatInterface = {
 
       this.loading = true;
       try {
-        const endpoint = this.useInternet ? '/api/fact-check-internet' : '/api/fact-check';
+        const endpoint = this.useInternet ? '/api/fact-check-internet/jobs' : '/api/fact-check/jobs';
         const response = await fetch(endpoint, {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
@@ -344,7 +348,8 @@ const ChatInterface = {
           throw new Error(errorText || 'Network response was not ok');
         }
         
-        const result = await response.json();
+        const job = await response.json();
+        const result = await this.waitForJob(job);
         this.messages.push({
           type: 'bot',
           content: result.explanation || 'Fact checking complete',
@@ -359,8 +364,67 @@ const ChatInterface = {
         });
       } finally {
         this.loading = false;
+        this.progressText = '';
       }
     },
+    waitForJob(job) {
+      // Follow the job's progress events; polls its status if streaming is unavailable
+      const stepLabels = {
+        analyze_input: 'Analyzing input',
+        check_facts: 'Checking facts',
+        translate_facts: 'Translating results'
+      };
+      this.progressText = 'Queued';
+
+      return new Promise((resolve, reject) => {
+        const poll = async () => {
+          try {
+            const response = await fetch(job.status_url);
+            if (!response.ok) {
+              throw new Error(await response.text() || 'Network response was not ok');
+            }
+            const status = await response.json();
+            if (status.status === 'done') {
+              resolve(status.result);
+            } else if (status.status === 'failed') {
+              reject(new Error(status.error || 'Fact check failed'));
+            } else {
+              const running = status.steps.filter(step => step.status === 'started').pop();
+              if (running) this.progressText = stepLabels[running.step] || running.step;
+              setTimeout(poll, 2000);
+            }
+          } catch (error) {
+            reject(error);
+          }
+        };
+
+        if (!window.EventSource) {
+          poll();
+          return;
+        }
+
+        const events = new EventSource(job.events_url);
+        events.addEventListener('progress', (event) => {
+          const step = JSON.parse(event.data);
+          if (step.status === 'started') {
+            this.progressText = stepLabels[step.step] || step.step;
+          }
+        });
+        events.addEventListener('result', (event) => {
+          events.close();
+          resolve(JSON.parse(event.data));
+        });
+        events.addEventListener('error', (event) => {
+          events.close();
+          if (event.data) {
+            reject(new Error(JSON.parse(event.data).error));
+          } else {
+            // Connection lost: keep following the job by polling
+            poll();
+          }
+        });
+      });
+    },
     showLanguageMenu(source, isVerified, event) {
       if (!isVerified) return;
       